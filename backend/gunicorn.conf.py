@@ -0,0 +1,28 @@
+# backend/gunicorn.conf.py
+"""
+Gunicorn configuration (startup.txt: gunicorn -c gunicorn.conf.py main:app)
+
+With preload_app the master imports main:app, the ML stack, the model and the
+fighter snapshot once; workers fork from it and share that memory
+copy-on-write, so respawning a worker does not re-import or re-unpickle
+anything. DB connections and the scheduler are created per worker after fork
+(the scheduler starts from the app's startup event, which runs in the worker).
+"""
+import os
+
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") != "0"
+
+
+def when_ready(server):
+    if preload_app:
+        from src.preload import warm
+        warm()
+        server.log.info("Preloaded model and fighter snapshot in master")
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from src.preload import after_fork
+        after_fork()
@@ -1,20 +1,37 @@
 # backend/main.py
-from fastapi import FastAPI, Query, Body
+from src import startup_timeline  # First, so every import below can be timed
+from fastapi import FastAPI, Query, Body, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from src.fight_model import calculate_exchange_probabilities
 from src.simulate_fight import simulate_fight
-from src.ufc_scraper import get_upcoming_event_links, get_completed_event_links, get_fight_card, is_event_ongoing, check_event_completion_status
+from src.ufc_scraper import get_upcoming_event_links, get_completed_event_links, get_cached_event_page, is_event_ongoing, check_event_completion_status
 from src.fighter_scraper import scrape_fighter_stats, save_fighter_to_db
-from src.db import SessionLocal, Fighter, ModelPrediction, FightResult
-from src.ensemble_predict import get_ensemble_prediction
+from src.db import (
+    SessionLocal, Fighter, ModelPrediction, FightResult, ModelPerformanceStats, UNKNOWN_PREDICTION_TIMESTAMP,
+    ensure_db,
+)
+from src.model_performance import pending_stats_query, recent_results_query, resolve_predictions
+from src.azure_config import ensure_directories
+from src.db_async import get_async_session
+from src.fighter_store import get_fighter_store
+from src.fighter_search import get_fighter_search
+from src.db_engine import RequestStatementTimeoutMiddleware
+from src.http_cache import ResponseCacheMiddleware
+from src.fighter_stats import FighterStats
+from src.shared_snapshot import SharedSnapshot
+from src.ensemble_predict import get_ensemble_prediction, get_card_predictions
+from src.host_limits import host_slot
 from src.ufc_scheduler import start_scheduler, stop_scheduler, get_scheduler
-from types import SimpleNamespace
 from bs4 import BeautifulSoup
-from sqlalchemy import func, or_, and_
+from sqlalchemy import func, or_, and_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, date, timedelta
+from concurrent.futures import ThreadPoolExecutor
 import requests
 import re
+import base64
 import json
 import os
 import traceback
@@ -26,13 +43,14 @@ load_dotenv()
 # Configure logging
 logger = logging.getLogger(__name__)
 
-def to_stats_obj(d):
-    return SimpleNamespace(**d)
-
 app = FastAPI()
+# Inside CORS, so 304s get the CORS headers too
+app.add_middleware(ResponseCacheMiddleware)
+# Outside the cache, whose validators query the database too
+app.add_middleware(RequestStatementTimeoutMiddleware)
 
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "*").split(",")
-print("ALLOWED_ORIGINS =", allowed_origins)
+logger.info(f"ALLOWED_ORIGINS = {allowed_origins}")
 
 app.add_middleware(
     CORSMiddleware,
@@ -40,7 +58,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
+app.add_middleware(startup_timeline.FirstRequestMiddleware)
 
 def name_to_slug(name: str) -> str:
     return name.lower().replace(" ", "-")
@@ -67,33 +87,6 @@ def _format_event_date(value):
     except Exception:
         return str(value)
 
-def _get_prediction_event_info(db, fighter_a: str, fighter_b: str):
-    result = (
-        db.query(FightResult.event, FightResult.event_date)
-        .filter(
-            or_(
-                and_(
-                    FightResult.fighter_name == fighter_a,
-                    FightResult.opponent_name == fighter_b,
-                ),
-                and_(
-                    FightResult.fighter_name == fighter_b,
-                    FightResult.opponent_name == fighter_a,
-                ),
-            )
-        )
-        .order_by(FightResult.id.desc())
-        .first()
-    )
-
-    if result:
-        return {
-            "event": result.event,
-            "event_date": _format_event_date(result.event_date),
-        }
-
-    return {"event": None, "event_date": None}
-
 def get_fighter_image_url(name: str) -> str | None:
     slug = name_to_slug(name)
     url = f"https://www.ufc.com/athlete/{slug}"
@@ -136,14 +129,45 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "message": "UFC Fight Simulator API is running"}
+    from src.ml.model_registry import get_registry
+    from src.db_engine import pool_stats
+    from src.db_async import async_pool_stats
+    return {
+        "status": "healthy",
+        "message": "UFC Fight Simulator API is running",
+        "model_version": get_registry().version,
+        "db_pool": pool_stats(),
+        "async_db_pool": async_pool_stats()
+    }
+
+FIGHTERS_MAX_PAGE_SIZE = 1000
+SEARCH_MAX_RESULTS = 50
+
 
 @app.get("/fighters")
-def list_fighters():
-    db = SessionLocal()
-    fighters = db.query(Fighter).order_by(Fighter.name).all()
-    db.close()
-    return [{"name": f.name, "image": f.image_url} for f in fighters]
+async def list_fighters(
+    limit: int | None = Query(None, ge=1, le=FIGHTERS_MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+):
+    """Every fighter sorted by name, or one page of them when limit is given (ETag/304 via src/http_cache.py)"""
+    listing = await get_fighter_store().alisting()
+    if limit is None:
+        return listing
+
+    end = offset + limit
+    return {
+        "fighters": listing[offset:end],
+        "total": len(listing),
+        "next_offset": end if end < len(listing) else None,
+    }
+
+@app.get("/fighters/search")
+def search_fighters(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=SEARCH_MAX_RESULTS),
+):
+    """Autocomplete: prefix and fuzzy matches on names and nicknames, best first"""
+    return get_fighter_search().search(q, limit)
 
 @app.get("/simulate/{event_id}")
 def simulate_event(event_id: str):
@@ -154,8 +178,8 @@ def simulate_event(event_id: str):
     with open(json_path, "r") as file:
         data = json.load(file)
 
-    stats_A = to_stats_obj(data["FighterA"])
-    stats_B = to_stats_obj(data["FighterB"])
+    stats_A = FighterStats.from_dict(data["FighterA"])
+    stats_B = FighterStats.from_dict(data["FighterB"])
 
     name_A = stats_A.name
     name_B = stats_B.name
@@ -169,228 +193,296 @@ def simulate_event(event_id: str):
         "results": results,
     }
 
-@app.get("/events")
-def list_upcoming_events():
+EVENTS_CACHE_TTL_ENV = "EVENTS_CACHE_TTL_SECONDS"
+EVENTS_CACHE_STALE_ENV = "EVENTS_CACHE_STALE_SECONDS"
+EVENT_STATUS_CONCURRENCY_ENV = "EVENT_STATUS_CONCURRENCY"
+
+
+def _latest_event_dates(titles):
+    """{event title: event_date} from each event's newest fight result, in one query"""
+    if not titles:
+        return {}
     db = SessionLocal()
     try:
-        # Get events from both upcoming and completed pages (for today's events)
-        raw_events = get_upcoming_event_links()
-        # Also check completed events from the last 3 days to catch recent/ongoing events
-        completed_recent = get_completed_event_links(days_back=3)
-        # Merge and deduplicate by URL
-        seen_urls = {e["url"] for e in raw_events}
-        for e in completed_recent:
-            if e["url"] not in seen_urls:
-                raw_events.append(e)
-                seen_urls.add(e["url"])
-        
-        ongoing_events = []
-        upcoming_events = []
-
-        for e in raw_events:
-            event_id = e["url"].split("/")[-1]
-            event_url = e["url"]
-            has_any_results, all_fights_complete, total_fights = check_event_completion_status(event_url)
-
-            event_date = (
-                db.query(FightResult.event_date)
-                .filter(
-                    FightResult.event == e["title"],
-                    FightResult.event_date.isnot(None),
-                )
-                .order_by(FightResult.id.desc())
-                .first()
-            )
-
-            event_date_value = event_date[0] if event_date else None
-
-            iso_date = None
-            display_date = None
-            event_date_obj_for_comparison = None
-
-            # Try to get date from database first
-            if event_date_value:
-                iso_date = _format_event_date(event_date_value)
-                display_date = event_date_value
+        rows = db.execute(
+            select(FightResult.event, FightResult.event_date)
+            .where(FightResult.event.in_(titles), FightResult.event_date.is_not(None))
+            .order_by(FightResult.id)
+        )
+        # Later rows overwrite earlier ones, so each event keeps its newest date
+        return {row.event: row.event_date for row in rows}
+    finally:
+        db.close()
+
+
+def _build_event_list():
+    """Ongoing and upcoming events with their status, scraped from ufcstats.com (served through _events_cache)"""
+    # Get events from both upcoming and completed pages (for today's events); also check
+    # completed events from the last 3 days to catch recent/ongoing events
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        upcoming = pool.submit(get_upcoming_event_links)
+        completed = pool.submit(get_completed_event_links, days_back=3)
+        raw_events = upcoming.result()
+        completed_recent = completed.result()
+    # Merge and deduplicate by URL
+    seen_urls = {e["url"] for e in raw_events}
+    for e in completed_recent:
+        if e["url"] not in seen_urls:
+            raw_events.append(e)
+            seen_urls.add(e["url"])
+
+    # One event page per event; a few at a time to stay polite to ufcstats.com
+    concurrency = max(int(os.getenv(EVENT_STATUS_CONCURRENCY_ENV, "4")), 1)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        statuses = list(pool.map(check_event_completion_status, [e["url"] for e in raw_events]))
+    event_dates = _latest_event_dates([e["title"] for e in raw_events])
+
+    ongoing_events = []
+    upcoming_events = []
+
+    for e, (has_any_results, all_fights_complete, total_fights) in zip(raw_events, statuses):
+        event_id = e["url"].split("/")[-1]
+        event_url = e["url"]
+
+        event_date_value = event_dates.get(e["title"])
+
+        iso_date = None
+        display_date = None
+        event_date_obj_for_comparison = None
+
+        # Try to get date from database first
+        if event_date_value:
+            iso_date = _format_event_date(event_date_value)
+            display_date = event_date_value
+            try:
+                event_date_obj_for_comparison = datetime.strptime(iso_date, "%Y-%m-%d").date()
+            except (ValueError, AttributeError):
+                pass
+        # Fallback to scraped date (datetime object)
+        elif e.get("date") and isinstance(e.get("date"), datetime):
+            event_date_obj_for_comparison = e.get("date").date()
+            iso_date = e.get("date").strftime("%Y-%m-%d")
+            display_date = e.get("date")
+        # Fallback to scraped date_text (string)
+        elif e.get("date_text"):
+            fallback_date = _format_event_date(e["date_text"])
+            if fallback_date:
+                iso_date = fallback_date
+                display_date = e.get("date_text")
                 try:
                     event_date_obj_for_comparison = datetime.strptime(iso_date, "%Y-%m-%d").date()
                 except (ValueError, AttributeError):
                     pass
-            # Fallback to scraped date (datetime object)
-            elif e.get("date") and isinstance(e.get("date"), datetime):
-                event_date_obj_for_comparison = e.get("date").date()
-                iso_date = e.get("date").strftime("%Y-%m-%d")
-                display_date = e.get("date")
-            # Fallback to scraped date_text (string)
-            elif e.get("date_text"):
-                fallback_date = _format_event_date(e["date_text"])
-                if fallback_date:
-                    iso_date = fallback_date
-                    display_date = e.get("date_text")
-                    try:
-                        event_date_obj_for_comparison = datetime.strptime(iso_date, "%Y-%m-%d").date()
-                    except (ValueError, AttributeError):
-                        pass
-
-            # Format display date string
-            if isinstance(display_date, datetime):
-                display_date_str = display_date.strftime("%b %d, %Y")
-            elif display_date is not None:
-                display_date_str = str(display_date)
-            else:
-                display_date_str = None
-
-            # Check if event is happening today or yesterday (even if no results yet)
-            # Events from yesterday might still be processing results
-            is_recent = False
-            today = date.today()
-            yesterday = today - timedelta(days=1)
-            if event_date_obj_for_comparison:
-                is_today = event_date_obj_for_comparison == today
-                is_yesterday = event_date_obj_for_comparison == yesterday
-                is_recent = is_today or is_yesterday
-            else:
-                logger.warning(f"Event: {e['title']}, Could not parse date. event_date_value: {event_date_value}, scraped date: {e.get('date')}, date_text: {e.get('date_text')}")
 
-            # Event is ongoing only if it's recent (today/yesterday) AND not all fights are complete
-            # Once all fights have results, the event is completed and no longer ongoing
-            is_ongoing = is_recent and not all_fights_complete
+        # Format display date string
+        if isinstance(display_date, datetime):
+            display_date_str = display_date.strftime("%b %d, %Y")
+        elif display_date is not None:
+            display_date_str = str(display_date)
+        else:
+            display_date_str = None
+
+        # Check if event is happening today or yesterday (even if no results yet)
+        # Events from yesterday might still be processing results
+        is_recent = False
+        today = date.today()
+        yesterday = today - timedelta(days=1)
+        if event_date_obj_for_comparison:
+            is_today = event_date_obj_for_comparison == today
+            is_yesterday = event_date_obj_for_comparison == yesterday
+            is_recent = is_today or is_yesterday
+        else:
+            logger.warning(f"Event: {e['title']}, Could not parse date. event_date_value: {event_date_value}, scraped date: {e.get('date')}, date_text: {e.get('date_text')}")
+
+        # Event is ongoing only if it's recent (today/yesterday) AND not all fights are complete
+        # Once all fights have results, the event is completed and no longer ongoing
+        is_ongoing = is_recent and not all_fights_complete
+        
+        # Filter out completed events that are not in the future
+        # Only show events that are ongoing (recent and incomplete) or upcoming (future)
+        should_filter = False
+        if event_date_obj_for_comparison:
+            is_future = event_date_obj_for_comparison > today
+            is_past = event_date_obj_for_comparison < today
             
-            # Filter out completed events that are not in the future
-            # Only show events that are ongoing (recent and incomplete) or upcoming (future)
-            should_filter = False
-            if event_date_obj_for_comparison:
-                is_future = event_date_obj_for_comparison > today
-                is_past = event_date_obj_for_comparison < today
-                
-                # Filter out if:
-                # 1. Not future AND all fights complete (definitely completed)
-                # 2. Past (before yesterday) AND has any results (old completed events)
-                #    Note: We don't filter yesterday's events here because they might still be ongoing
-                if not is_future and all_fights_complete:
-                    should_filter = True
-                elif is_past and not is_recent and has_any_results:
-                    # If event is in the past (before yesterday) and has results, it's likely completed
-                    # (even if we couldn't count all fights correctly)
-                    # But don't filter recent events (yesterday/today) as they might still be ongoing
-                    should_filter = True
-            elif all_fights_complete:
-                # If we can't parse the date but all fights are complete, filter it out
+            # Filter out if:
+            # 1. Not future AND all fights complete (definitely completed)
+            # 2. Past (before yesterday) AND has any results (old completed events)
+            #    Note: We don't filter yesterday's events here because they might still be ongoing
+            if not is_future and all_fights_complete:
                 should_filter = True
-            elif has_any_results and not is_recent:
-                # If event has results but isn't recent and we can't parse date, filter it out
-                # (safer to hide events with results that aren't recent)
+            elif is_past and not is_recent and has_any_results:
+                # If event is in the past (before yesterday) and has results, it's likely completed
+                # (even if we couldn't count all fights correctly)
+                # But don't filter recent events (yesterday/today) as they might still be ongoing
                 should_filter = True
-            
-            # Skip events that are completed and not in the future
-            if should_filter:
-                logger.info(f"Filtering out completed event: {e['title']} (date: {event_date_obj_for_comparison or 'unknown'}, all_complete: {all_fights_complete}, has_results: {has_any_results}, total_fights: {total_fights})")
-                continue
+        elif all_fights_complete:
+            # If we can't parse the date but all fights are complete, filter it out
+            should_filter = True
+        elif has_any_results and not is_recent:
+            # If event has results but isn't recent and we can't parse date, filter it out
+            # (safer to hide events with results that aren't recent)
+            should_filter = True
+        
+        # Skip events that are completed and not in the future
+        if should_filter:
+            logger.info(f"Filtering out completed event: {e['title']} (date: {event_date_obj_for_comparison or 'unknown'}, all_complete: {all_fights_complete}, has_results: {has_any_results}, total_fights: {total_fights})")
+            continue
+
+        event_data = {
+            "id": event_id,
+            "name": e["title"],
+            "url": event_url,
+            "status": "ongoing" if is_ongoing else "upcoming",
+            "event_date": iso_date,
+            "event_date_display": display_date_str,
+        }
 
-            event_data = {
-                "id": event_id,
-                "name": e["title"],
-                "url": event_url,
-                "status": "ongoing" if is_ongoing else "upcoming",
-                "event_date": iso_date,
-                "event_date_display": display_date_str,
-            }
+        if is_ongoing:
+            ongoing_events.append(event_data)
+        else:
+            upcoming_events.append(event_data)
+
+    return ongoing_events + upcoming_events
 
-            if is_ongoing:
-                ongoing_events.append(event_data)
-            else:
-                upcoming_events.append(event_data)
 
-        return ongoing_events + upcoming_events
+# Shared by all workers; rebuilt at most once per TTL, served stale while it refreshes
+_events_cache = SharedSnapshot(
+    "events_snapshot",
+    _build_event_list,
+    ttl=int(os.getenv(EVENTS_CACHE_TTL_ENV, "300")),
+    stale=int(os.getenv(EVENTS_CACHE_STALE_ENV, "3600")),
+)
+
+
+@app.get("/events")
+def list_upcoming_events():
+    try:
+        return _events_cache.get()
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        db.close()
+
+SCRAPE_CONCURRENCY_ENV = "SCRAPE_CONCURRENCY"
+
+
+def _scrape_new_fighter(name, profile_url):
+    """ufcstats.com stats plus the ufc.com headshot of a fighter we don't have yet (None if incomplete)"""
+    with host_slot(profile_url):
+        stats = scrape_fighter_stats(name, profile_url)
+    if stats:
+        with host_slot("https://www.ufc.com"):
+            image_url = get_fighter_image_url(name)
+        if image_url:
+            stats["image_url"] = image_url
+    return stats
+
+
+def _load_card_fighters(card):
+    """{name: FighterStats} for everyone on the card, scraping missing fighters in parallel"""
+    store = get_fighter_store()
+    fighters = {}
+    missing = {}
+    for fight in card:
+        for name, url in ((fight["fighter_a"], fight["url_a"]), (fight["fighter_b"], fight["url_b"])):
+            stats = store.get(name)
+            if stats:
+                fighters[name] = stats
+            else:
+                missing[name] = url
+    if not missing:
+        return fighters
+
+    concurrency = max(int(os.getenv(SCRAPE_CONCURRENCY_ENV, "8")), 1)
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(missing))) as pool:
+        scraped = list(pool.map(_scrape_new_fighter, missing, missing.values()))
+    for name, stats in zip(missing, scraped):
+        if stats:
+            save_fighter_to_db(stats)
+    for name in missing:
+        stats = store.get(name)
+        if stats:
+            fighters[name] = stats
+    return fighters
+
+
+def _card_fight_result(name_a, name_b, f1, f2, model, prediction):
+    if model == "sim":
+        P_A, P_B, P_neutral = calculate_exchange_probabilities(f1, f2)
+        results = simulate_fight(P_A, P_B, P_neutral, 5, name_A=name_a, name_B=name_b)
+        return {
+            "fighters": [{"name": name_a, "image": f1.image_url}, {"name": name_b, "image": f2.image_url}],
+            "model": "sim",
+            "probabilities": {"P_A": P_A, "P_B": P_B, "P_neutral": P_neutral},
+            "results": results
+        }
+
+    fight_data = {
+        "fighters": [
+            {"name": name_a, "image": f1.image_url},
+            {"name": name_b, "image": f2.image_url}
+        ],
+        "model": model,
+        "results": {
+            name_a: prediction["fighter_a_win_prob"],
+            name_b: prediction["fighter_b_win_prob"],
+            "Draw": 100.0 - prediction["fighter_a_win_prob"] - prediction["fighter_b_win_prob"]
+        }
+    }
+
+    # Add penalty score and diffs for ML and Ensemble models
+    if "penalty_score" in prediction:
+        fight_data["penalty_score"] = prediction["penalty_score"]
+    if "diffs" in prediction:
+        fight_data["diffs"] = prediction["diffs"]
+    return fight_data
+
 
 @app.get("/simulate-event/{event_id}")
 def simulate_full_event(event_id: str, model: str = Query("ensemble", enum=["sim", "ml", "ensemble"])):
     event_url = f"http://ufcstats.com/event-details/{event_id}"
-    try:
-        response = requests.get(event_url)
-        soup = BeautifulSoup(response.text, "html.parser")
-        title_tag = soup.find("h2", class_="b-content__title")
-        event_title = title_tag.get_text(strip=True) if title_tag else f"Event ID {event_id}"
-    except:
-        event_title = f"Event ID {event_id}"
-
-    card = get_fight_card(event_url)
+    # Title and card come from the same fetch of the event page
+    page = get_cached_event_page(event_url)
+    event_title = page["title"] or f"Event ID {event_id}"
+    card = page["fights"]
     if not card:
         return {"error": f"No fight card found at {event_url}"}
 
-    db = SessionLocal()
-    fight_results = []
+    fighters = _load_card_fighters(card)
+    scored = [
+        fight for fight in card
+        if fight["fighter_a"] in fighters and fight["fighter_b"] in fighters
+    ]
+
+    # All bouts go through the ML model in one batch; fall back to one at a time
+    # so a single bad bout only fails itself
+    predictions = {}
+    if model != "sim" and scored:
+        pairs = [(fight["fighter_a"], fight["fighter_b"]) for fight in scored]
+        try:
+            predictions = dict(zip(pairs, get_card_predictions(pairs, model)))
+        except Exception as e:
+            logger.warning(f"Batched scoring failed for {event_url}, scoring bouts one by one: {e}")
 
+    fight_results = []
     for fight in card:
         name_a = fight["fighter_a"]
         name_b = fight["fighter_b"]
-        url_a = fight["url_a"]
-        url_b = fight["url_b"]
-
-        f1 = db.query(Fighter).filter(Fighter.name == name_a).first()
-        if not f1:
-            stats = scrape_fighter_stats(name_a, url_a)
-            if stats:
-                image_url = get_fighter_image_url(name_a)
-                if image_url:
-                    stats["image_url"] = image_url
-                save_fighter_to_db(stats)
-                f1 = db.query(Fighter).filter(Fighter.name == name_a).first()
-
-        f2 = db.query(Fighter).filter(Fighter.name == name_b).first()
-        if not f2:
-            stats = scrape_fighter_stats(name_b, url_b)
-            if stats:
-                image_url = get_fighter_image_url(name_b)
-                if image_url:
-                    stats["image_url"] = image_url
-                save_fighter_to_db(stats)
-                f2 = db.query(Fighter).filter(Fighter.name == name_b).first()
+        f1 = fighters.get(name_a)
+        f2 = fighters.get(name_b)
 
         if f1 and f2:
             try:
-                if model == "sim":
-                    P_A, P_B, P_neutral = calculate_exchange_probabilities(f1, f2)
-                    results = simulate_fight(P_A, P_B, P_neutral, 5, name_A=name_a, name_B=name_b)
-                    fight_results.append({
-                        "fighters": [{"name": name_a, "image": f1.image_url}, {"name": name_b, "image": f2.image_url}],
-                        "model": "sim",
-                        "probabilities": {"P_A": P_A, "P_B": P_B, "P_neutral": P_neutral},
-                        "results": results
-                    })
-                else:
-                    results = get_ensemble_prediction(name_a, name_b, model, log_to_db=False)
-                    fight_data = {
-                        "fighters": [
-                            {"name": name_a, "image": f1.image_url},
-                            {"name": name_b, "image": f2.image_url}
-                        ],
-                        "model": model,
-                        "results": {
-                            name_a: results["fighter_a_win_prob"],
-                            name_b: results["fighter_b_win_prob"],
-                            "Draw": 100.0 - results["fighter_a_win_prob"] - results["fighter_b_win_prob"]
-                        }
-                    }
-                    
-                    # Add penalty score and diffs for ML and Ensemble models
-                    if "penalty_score" in results:
-                        fight_data["penalty_score"] = results["penalty_score"]
-                    if "diffs" in results:
-                        fight_data["diffs"] = results["diffs"]
-                    
-                    fight_results.append(fight_data)
-
+                prediction = None
+                if model != "sim":
+                    prediction = predictions.get((name_a, name_b))
+                    if prediction is None:
+                        prediction = get_ensemble_prediction(name_a, name_b, model, log_to_db=False)
+                fight_results.append(_card_fight_result(name_a, name_b, f1, f2, model, prediction))
             except Exception as e:
                 fight_results.append({"fighters": [name_a, name_b], "error": str(e)})
         else:
             fight_results.append({"fighters": [name_a, name_b], "error": "Missing fighter stats"})
 
-    db.close()
     return {"event": event_title, "model": model, "fights": fight_results}
 
 class CustomSimRequest(BaseModel):
@@ -399,18 +491,21 @@ class CustomSimRequest(BaseModel):
     model: str = "ensemble"
 
 @app.post("/simulate-custom")
-def simulate_custom_fight(req: CustomSimRequest):
-    db = SessionLocal()
+async def simulate_custom_fight(req: CustomSimRequest):
     name_a = req.fighter_a.strip()
     name_b = req.fighter_b.strip()
     model = req.model
-    f1 = db.query(Fighter).filter(Fighter.name == name_a).first()
-    f2 = db.query(Fighter).filter(Fighter.name == name_b).first()
-    db.close()
+    store = get_fighter_store()
+    f1 = await store.aget(name_a)
+    f2 = await store.aget(name_b)
 
     if not f1 or not f2:
         return {"error": "One or both fighters not found in the database."}
 
+    # Simulation and ML scoring are CPU-bound; keep them off the event loop
+    return await run_in_threadpool(_run_custom_simulation, name_a, name_b, model, f1, f2)
+
+def _run_custom_simulation(name_a, name_b, model, f1, f2):
     try:
         if model == "sim":
             P_A, P_B, P_neutral = calculate_exchange_probabilities(f1, f2)
@@ -469,108 +564,188 @@ def refresh_fighter_images():
 
 
 @app.get("/model-performance")
-def get_model_performance():
+async def get_model_performance(db: AsyncSession = Depends(get_async_session)):
     """Get overall model performance statistics"""
-    db = SessionLocal()
-    
-    try:
-        # Get all predictions with their results
-        predictions = db.query(ModelPrediction).all()
-        
-        # Calculate overall stats
-        total_predictions = len(predictions)
-        predictions_with_results = [p for p in predictions if p.actual_winner is not None]
-        correct_predictions = [p for p in predictions_with_results if p.correct is True]
-        
-        overall_accuracy = (len(correct_predictions) / len(predictions_with_results) * 100) if predictions_with_results else 0
-        
-        # Get recent performance (last 10 completed predictions)
-        recent_predictions = [p for p in predictions_with_results][-10:] if predictions_with_results else []
-        recent_correct = [p for p in recent_predictions if p.correct is True]
-        recent_accuracy = (len(recent_correct) / len(recent_predictions) * 100) if recent_predictions else 0
-        
-        # Calculate average confidence (using highest probability from each prediction)
-        predictions_with_confidence = [p for p in predictions if p.fighter_a_prob is not None and p.fighter_b_prob is not None]
-        if predictions_with_confidence:
-            total_confidence = sum(max(p.fighter_a_prob, p.fighter_b_prob) for p in predictions_with_confidence)
-            avg_confidence = total_confidence / len(predictions_with_confidence)
-        else:
-            avg_confidence = 0
-        
-        # Break down by model
-        model_breakdown = {}
-        for model in ["ml", "ensemble", "sim"]:
-            model_predictions = [p for p in predictions if p.model == model]
-            model_with_results = [p for p in model_predictions if p.actual_winner is not None]
-            model_correct = [p for p in model_with_results if p.correct is True]
-            
-            model_breakdown[model] = {
-                "total": len(model_predictions),
-                "total_with_results": len(model_with_results),
-                "correct": len(model_correct),
-                "accuracy": round((len(model_correct) / len(model_with_results) * 100), 1) if model_with_results else 0
-            }
-        
-        # Find best performing model (after model_breakdown is calculated)
-        best_model = "ensemble"  # default
-        best_accuracy = 0
-        for model_name, stats in model_breakdown.items():
-            if stats["total_with_results"] >= 3 and stats["accuracy"] > best_accuracy:  # At least 3 results for meaningful comparison
-                best_model = model_name
-                best_accuracy = stats["accuracy"]
-        
-        return {
-            "overall_accuracy": round(overall_accuracy, 1),
-            "total_predictions": total_predictions,
-            "predictions_with_results": len(predictions_with_results),
-            "correct_predictions": len(correct_predictions),
-            "recent_accuracy": round(recent_accuracy, 1),
-            "recent_predictions_count": len(recent_predictions),
-            "best_model": best_model,
-            "best_model_accuracy": round(best_accuracy, 1),
-            "avg_confidence": round(avg_confidence, 1),
-            "model_breakdown": model_breakdown
+    # Resolved predictions are counted as they are resolved (src/model_performance.py);
+    # only pending ones are aggregated here, in SQL
+    resolved = {s.model: s for s in (await db.execute(select(ModelPerformanceStats))).scalars()}
+    pending = {row.model: row for row in await db.execute(pending_stats_query())}
+    recent_predictions = (await db.execute(recent_results_query(10))).scalars().all()
+
+    def resolved_total(column, model=None):
+        rows = resolved.values() if model is None else [resolved[model]] if model in resolved else []
+        return sum(getattr(s, column) for s in rows)
+
+    def pending_total(column, model=None):
+        rows = pending.values() if model is None else [pending[model]] if model in pending else []
+        return sum(getattr(row, column) for row in rows)
+
+    # Calculate overall stats
+    predictions_with_results = resolved_total("resolved")
+    correct_predictions = resolved_total("correct")
+    total_predictions = predictions_with_results + pending_total("total")
+
+    overall_accuracy = (correct_predictions / predictions_with_results * 100) if predictions_with_results else 0
+
+    # Get recent performance (last 10 completed predictions)
+    recent_correct = [c for c in recent_predictions if c is True]
+    recent_accuracy = (len(recent_correct) / len(recent_predictions) * 100) if recent_predictions else 0
+
+    # Calculate average confidence (using highest probability from each prediction)
+    confidence_count = resolved_total("confidence_count") + pending_total("confidence_count")
+    if confidence_count:
+        avg_confidence = (resolved_total("confidence_sum") + pending_total("confidence_sum")) / confidence_count
+    else:
+        avg_confidence = 0
+
+    # Break down by model
+    model_breakdown = {}
+    for model in ["ml", "ensemble", "sim"]:
+        model_with_results = resolved_total("resolved", model)
+        model_correct = resolved_total("correct", model)
+
+        model_breakdown[model] = {
+            "total": model_with_results + pending_total("total", model),
+            "total_with_results": model_with_results,
+            "correct": model_correct,
+            "accuracy": round((model_correct / model_with_results * 100), 1) if model_with_results else 0
         }
-    
-    finally:
-        db.close()
+
+    # Find best performing model (after model_breakdown is calculated)
+    best_model = "ensemble"  # default
+    best_accuracy = 0
+    for model_name, stats in model_breakdown.items():
+        if stats["total_with_results"] >= 3 and stats["accuracy"] > best_accuracy:  # At least 3 results for meaningful comparison
+            best_model = model_name
+            best_accuracy = stats["accuracy"]
+
+    return {
+        "overall_accuracy": round(overall_accuracy, 1),
+        "total_predictions": total_predictions,
+        "predictions_with_results": predictions_with_results,
+        "correct_predictions": correct_predictions,
+        "recent_accuracy": round(recent_accuracy, 1),
+        "recent_predictions_count": len(recent_predictions),
+        "best_model": best_model,
+        "best_model_accuracy": round(best_accuracy, 1),
+        "avg_confidence": round(avg_confidence, 1),
+        "model_breakdown": model_breakdown
+    }
+
+
+DETAILED_PAGE_SIZE = 50
+DETAILED_MAX_PAGE_SIZE = 200
+
+
+def _encode_prediction_cursor(timestamp, prediction_id):
+    # An empty timestamp stands for a row without one (see UNKNOWN_PREDICTION_TIMESTAMP)
+    raw = f"{timestamp.isoformat() if timestamp else ''}|{prediction_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_prediction_cursor(cursor):
+    timestamp, prediction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+    if not timestamp:
+        return UNKNOWN_PREDICTION_TIMESTAMP, int(prediction_id)
+    return datetime.fromisoformat(timestamp), int(prediction_id)
 
 
 @app.get("/model-performance/detailed")
-def get_detailed_performance():
-    """Get detailed list of all predictions with results"""
-    db = SessionLocal()
-    
-    try:
-        predictions = db.query(ModelPrediction).order_by(ModelPrediction.timestamp.desc()).all()
-        
-        detailed_results = []
-        for pred in predictions:
-            event_info = _get_prediction_event_info(db, pred.fighter_a, pred.fighter_b)
-            detailed_results.append({
-                "id": pred.id,
-                "fighter_a": pred.fighter_a,
-                "fighter_b": pred.fighter_b,
-                "model": pred.model,
-                "predicted_winner": pred.predicted_winner,
-                "actual_winner": pred.actual_winner,
-                "correct": pred.correct,
-                "fighter_a_prob": pred.fighter_a_prob,
-                "fighter_b_prob": pred.fighter_b_prob,
-                "penalty_score": pred.penalty_score,
-                "timestamp": pred.timestamp.isoformat() if pred.timestamp else None,
-                "has_result": pred.actual_winner is not None,
-                "event": event_info["event"],
-                "event_date": event_info["event_date"],
-            })
-        
-        return {
-            "predictions": detailed_results,
-            "total_count": len(detailed_results)
+async def get_detailed_performance(
+    db: AsyncSession = Depends(get_async_session),
+    limit: int = Query(DETAILED_PAGE_SIZE, ge=1, description=f"Page size (at most {DETAILED_MAX_PAGE_SIZE})"),
+    cursor: str = Query(None, description="next_cursor from the previous page"),
+    model: str = Query(None, enum=["sim", "ml", "ensemble"]),
+    resolved: bool = Query(None, description="Only predictions with (true) or without (false) a result"),
+    date_from: date = Query(None, description="Predictions made on or after this date"),
+    date_to: date = Query(None, description="Predictions made on or before this date"),
+):
+    """Get a page of predictions, newest first, with the event each matchup was decided at"""
+    limit = min(limit, DETAILED_MAX_PAGE_SIZE)
+
+    filters = []
+    if model:
+        filters.append(ModelPrediction.model == model)
+    if resolved is not None:
+        filters.append(ModelPrediction.actual_winner.is_not(None) if resolved else ModelPrediction.actual_winner.is_(None))
+    if date_from:
+        filters.append(ModelPrediction.timestamp >= datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        filters.append(ModelPrediction.timestamp < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+
+    page_filters = list(filters)
+    if cursor:
+        try:
+            after_timestamp, after_id = _decode_prediction_cursor(cursor)
+        except Exception:
+            return {"error": "Invalid cursor"}
+        # Keyset on the (timestamp, id) sort order: no OFFSET scan, stable under inserts
+        page_filters.append(tuple_(ModelPrediction.timestamp, ModelPrediction.id) < tuple_(after_timestamp, after_id))
+
+    # Newest fight result of the matchup (either order), looked up only for the rows on this page
+    latest_result_id = (
+        select(func.max(FightResult.id))
+        .where(or_(
+            and_(FightResult.fighter_name == ModelPrediction.fighter_a, FightResult.opponent_name == ModelPrediction.fighter_b),
+            and_(FightResult.fighter_name == ModelPrediction.fighter_b, FightResult.opponent_name == ModelPrediction.fighter_a),
+        ))
+        .correlate(ModelPrediction)
+        .scalar_subquery()
+    )
+    page = (
+        select(
+            ModelPrediction.id, ModelPrediction.fighter_a, ModelPrediction.fighter_b, ModelPrediction.model,
+            ModelPrediction.predicted_winner, ModelPrediction.actual_winner, ModelPrediction.correct,
+            ModelPrediction.fighter_a_prob, ModelPrediction.fighter_b_prob, ModelPrediction.penalty_score,
+            ModelPrediction.timestamp, latest_result_id.label("result_id"),
+        )
+        .where(*page_filters)
+        .order_by(ModelPrediction.timestamp.desc(), ModelPrediction.id.desc())
+        .limit(limit + 1)
+        .subquery()
+    )
+    rows = (await db.execute(
+        select(page, FightResult.event, FightResult.event_date)
+        .outerjoin(FightResult, FightResult.id == page.c.result_id)
+        .order_by(page.c.timestamp.desc(), page.c.id.desc())
+    )).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    detailed_results = [
+        {
+            "id": row.id,
+            "fighter_a": row.fighter_a,
+            "fighter_b": row.fighter_b,
+            "model": row.model,
+            "predicted_winner": row.predicted_winner,
+            "actual_winner": row.actual_winner,
+            "correct": row.correct,
+            "fighter_a_prob": row.fighter_a_prob,
+            "fighter_b_prob": row.fighter_b_prob,
+            "penalty_score": row.penalty_score,
+            "timestamp": (
+                row.timestamp.isoformat()
+                if row.timestamp and row.timestamp != UNKNOWN_PREDICTION_TIMESTAMP else None
+            ),
+            "has_result": row.actual_winner is not None,
+            "event": row.event,
+            "event_date": _format_event_date(row.event_date),
         }
-    
-    finally:
-        db.close()
+        for row in rows
+    ]
+
+    # Counted on the first page only; later pages keep the client's total
+    total_count = None
+    if not cursor:
+        total_count = (await db.execute(select(func.count()).select_from(ModelPrediction).where(*filters))).scalar_one()
+
+    return {
+        "predictions": detailed_results,
+        "total_count": total_count,
+        "next_cursor": _encode_prediction_cursor(rows[-1].timestamp, rows[-1].id) if has_more else None,
+        "has_more": has_more,
+    }
 
 
 @app.post("/update-fight-result")
@@ -590,11 +765,8 @@ def update_fight_result(
             ((ModelPrediction.fighter_a == fighter_b) & (ModelPrediction.fighter_b == fighter_a))
         ).all()
         
-        updated_count = 0
-        for pred in predictions:
-            pred.actual_winner = actual_winner
-            pred.correct = (pred.predicted_winner == actual_winner)
-            updated_count += 1
+        resolve_predictions(db, [(pred, actual_winner) for pred in predictions])
+        updated_count = len(predictions)
         
         # Note: We don't create new FightResult records here since the existing
         # scraping system handles that table with its own schema
@@ -614,15 +786,21 @@ def update_fight_result(
     finally:
         db.close()
 
-# Scheduler startup and shutdown events
+# Startup (explicit initialization, nothing is set up on import) and shutdown events
 @app.on_event("startup")
 async def startup_event():
-    """Start the UFC scheduler when the app starts"""
+    """Create data directories and the database schema, then start the UFC scheduler"""
+    with startup_timeline.step("init_db"):
+        ensure_directories()
+        ensure_db()
     try:
-        start_scheduler()
+        with startup_timeline.step("start_scheduler"):
+            start_scheduler()
         print("UFC Scheduler started")
     except Exception as e:
         print(f"Failed to start scheduler: {e}")
+    startup_timeline.mark("startup_complete")
+    startup_timeline.stop_import_timing()
 
 @app.on_event("shutdown")
 async def shutdown_event():
@@ -798,4 +976,11 @@ if os.getenv("ENVIRONMENT", "production").lower() != "production":
         except Exception as e:
             return {"error": str(e), "traceback": traceback.format_exc()}
 
+    @app.get("/debug/startup")
+    def get_startup_timeline(top: int = Query(25, ge=1, le=500)):
+        """Startup timeline of the worker serving this request: steps, marks and slowest imports"""
+        return startup_timeline.report(top)
+
 # Scheduler API functions
+
+startup_timeline.mark("app_imported")
@@ -1,10 +1,17 @@
 # backend/src/azure_config.py
 """
 Azure-compatible configuration for file paths and directories
+
+Nothing runs on import: directories are created when a path is first asked for
+(or by ensure_directories() at app startup).
 """
+import logging
 import os
+from functools import lru_cache
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 def get_data_directory():
     """Get the appropriate data directory based on environment"""
     if is_azure_environment():
@@ -27,31 +34,40 @@ def get_model_path():
         # Local development - use existing location
         return "src/ml/fight_predictor.pkl"
 
+def get_dataset_dir():
+    """Get the columnar training dataset directory"""
+    data_dir = get_data_directory()
+    return f"{data_dir}/training_dataset"
+
 def get_dataset_path():
-    """Get the training dataset path"""
+    """Get the training dataset CSV export path"""
     data_dir = get_data_directory()
     return f"{data_dir}/training_dataset.csv"
 
+def get_trial_cache_path():
+    """Get the hyperparameter trial cache path"""
+    data_dir = get_data_directory()
+    return f"{data_dir}/hyperparam_trials.json"
+
 def get_database_path():
     """Get the SQLite database path for local development"""
     # Always prioritize the environment variable (production/Supabase)
     db_url = os.getenv("DATABASE_URL")
     if db_url:
-        print(f"Using DATABASE_URL: {db_url[:50]}...")  # Only show first 50 chars for security
         return db_url
     
     # Local development fallback
     if not is_azure_environment():
         data_dir = get_data_directory()
         local_path = f"sqlite:///./{data_dir}/fighter_stats.db"
-        print(f"Using local SQLite: {local_path}")
+        logger.info(f"Using local SQLite: {local_path}")
         return local_path
     else:
-        print("ERROR: No DATABASE_URL found in Azure environment!")
         raise ValueError("DATABASE_URL environment variable is required in production")
 
+@lru_cache(maxsize=None)
 def is_azure_environment():
-    """Check if running in Azure App Service"""
+    """Check if running in Azure App Service (evaluated once per process)"""
     # Check multiple Azure environment indicators
     azure_indicators = [
         os.getenv("WEBSITE_SITE_NAME"),  # Azure App Service
@@ -69,10 +85,10 @@ def is_azure_environment():
     
     is_azure = any(indicator for indicator in azure_indicators if indicator) or any(azure_paths)
     
-    # Debug logging
-    print(f"Azure detection - WEBSITE_SITE_NAME: {os.getenv('WEBSITE_SITE_NAME')}")
-    print(f"Azure detection - Current working dir: {os.getcwd() if hasattr(os, 'getcwd') else 'unknown'}")
-    print(f"Azure detection - Is Azure: {is_azure}")
+    logger.debug(
+        f"Azure detection - WEBSITE_SITE_NAME: {os.getenv('WEBSITE_SITE_NAME')}, "
+        f"cwd: {os.getcwd() if hasattr(os, 'getcwd') else 'unknown'}, is Azure: {is_azure}"
+    )
     
     return is_azure
 
@@ -84,6 +100,3 @@ def ensure_directories():
     # Create model directory for local development
     if not is_azure_environment():
         os.makedirs("src/ml", exist_ok=True)
-
-# Initialize on import
-ensure_directories()
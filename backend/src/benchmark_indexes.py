@@ -0,0 +1,147 @@
+"""
+Benchmark the hot prediction/fight result queries before and after the
+index migrations (0002 onwards).
+
+Seeds a throwaway SQLite database (100k predictions by default), drops the
+query indexes to mimic a pre-migration deployment, times each query, applies
+the migrations and times them again.
+
+    python -m src.benchmark_indexes [--predictions 100000] [--repeat 50]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+MODELS = ("ml", "ensemble", "sim")
+
+
+def _seed(engine, n_predictions, n_fighters):
+    from src.db import FightResult, ModelPrediction, make_pair_key
+
+    rng = random.Random(42)
+    fighters = [f"Fighter {i}" for i in range(n_fighters)]
+    start = datetime(2015, 1, 1)
+    predictions, results = [], []
+    seen = set()
+    while len(predictions) < n_predictions:
+        a, b = rng.sample(fighters, 2)
+        key = make_pair_key(a, b)
+        if key in seen:
+            continue
+        seen.add(key)
+        ts = start + timedelta(minutes=rng.randrange(10 * 365 * 24 * 60))
+        resolved = rng.random() < 0.9
+        for model in MODELS:
+            predictions.append({
+                "fighter_a": a, "fighter_b": b, "pair_key": key, "model": model,
+                "predicted_winner": a, "actual_winner": a if resolved else None,
+                "correct": True if resolved else None, "fighter_a_prob": 55.0, "fighter_b_prob": 45.0,
+                "timestamp": ts,
+            })
+        if resolved:
+            event = f"UFC {len(results) // 24}"
+            results.append({"fighter_name": a, "opponent_name": b, "result": "win", "event": event})
+            results.append({"fighter_name": b, "opponent_name": a, "result": "loss", "event": event})
+    predictions = predictions[:n_predictions]
+
+    with engine.begin() as conn:
+        conn.execute(ModelPrediction.__table__.insert(), predictions)
+        conn.execute(FightResult.__table__.insert(), results)
+    return predictions, results
+
+
+def _queries(predictions, results):
+    """(label, SQL, params) for the filters the API and scheduler run most"""
+    from sqlalchemy import text
+
+    rng = random.Random(7)
+    p = rng.choice(predictions)
+    r = rng.choice(results)
+    since = datetime(2024, 1, 1)
+    return [
+        ("prediction by fighters+model",
+         text("SELECT id FROM model_predictions WHERE fighter_a = :a AND fighter_b = :b AND model = :m"),
+         {"a": p["fighter_a"], "b": p["fighter_b"], "m": p["model"]}),
+        ("pending predictions for a model",
+         text("SELECT id FROM model_predictions WHERE actual_winner IS NULL AND model = :m"),
+         {"m": "ml"}),
+        ("resolved since last retrain",
+         text("SELECT count(*) FROM model_predictions WHERE actual_winner IS NOT NULL AND timestamp > :t"),
+         {"t": since}),
+        ("latest predictions page",
+         text("SELECT id FROM model_predictions ORDER BY timestamp DESC LIMIT 50"),
+         {}),
+        ("fight result by matchup",
+         text("SELECT id FROM fight_results WHERE fighter_name = :a AND opponent_name = :b ORDER BY id DESC LIMIT 1"),
+         {"a": r["fighter_name"], "b": r["opponent_name"]}),
+        ("fight results for an event",
+         text("SELECT id FROM fight_results WHERE event = :e"),
+         {"e": r["event"]}),
+    ]
+
+
+def _time_queries(engine, queries, repeat):
+    timings = {}
+    with engine.connect() as conn:
+        for label, sql, params in queries:
+            conn.execute(sql, params).fetchall()  # warm the page cache
+            start = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(sql, params).fetchall()
+            timings[label] = (time.perf_counter() - start) / repeat * 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--predictions", type=int, default=100_000)
+    parser.add_argument("--fighters", type=int, default=3000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ufc-index-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    from sqlalchemy import text
+    from src.db import FightResult, ModelPrediction, init_db
+    from src.db_engine import get_engine
+    from src.migrations import run_migrations
+
+    engine = get_engine()
+    init_db()
+
+    # Roll the database back to its pre-migration shape: only the pair-key index
+    # from 0001, later migrations not recorded
+    with engine.begin() as conn:
+        for table in (ModelPrediction.__table__, FightResult.__table__):
+            for index in table.indexes:
+                if index.name != "uq_prediction_pair_model":
+                    conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        conn.execute(text("DELETE FROM schema_migrations WHERE version <> '0001_prediction_pair_key'"))
+
+    print(f"Seeding {args.predictions} predictions into {workdir} ...")
+    predictions, results = _seed(engine, args.predictions, args.fighters)
+    queries = _queries(predictions, results)
+
+    before = _time_queries(engine, queries, args.repeat)
+    start = time.perf_counter()
+    applied = run_migrations(engine)
+    migrate_s = time.perf_counter() - start
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+    after = _time_queries(engine, queries, args.repeat)
+
+    print(f"Applied {', '.join(applied) or 'nothing'} in {migrate_s:.2f}s")
+    print(f"{'query':<36}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for label, _, _ in queries:
+        speedup = before[label] / after[label] if after[label] else float("inf")
+        print(f"{label:<36}{before[label]:>12.3f}{after[label]:>12.3f}{speedup:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,24 @@
-from sqlalchemy import create_engine, Column, String, Float, DateTime, Integer, Date, Boolean, func
+from sqlalchemy import Column, String, Float, DateTime, Integer, Date, Boolean, Index, LargeBinary, or_, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
 from datetime import datetime, date
 import os
+import threading
 from dotenv import load_dotenv
+from src.names import make_norm_pair
+from src.db_engine import get_engine
 
 load_dotenv()
 
-# Use Azure-compatible database URL
-DATABASE_URL = os.getenv("DATABASE_URL")
-if DATABASE_URL is None:
-    # Local development fallback
-    from src.azure_config import get_database_path
-    DATABASE_URL = get_database_path()
 
-print(f"Main DB - Using database: {DATABASE_URL[:50] if DATABASE_URL else 'None'}...")
+class _SharedEngineSession(Session):
+    """Session on the shared engine (see src/db_engine.py), resolved when opened rather than at import"""
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def __init__(self, bind=None, **kwargs):
+        super().__init__(bind=bind or get_engine(), **kwargs)
+
+
+SessionLocal = sessionmaker(class_=_SharedEngineSession, autocommit=False, autoflush=False)
 Base = declarative_base()
 
 class Fighter(Base):
@@ -29,6 +27,7 @@ class Fighter(Base):
     name = Column(String, primary_key=True, index=True)
     profile_url = Column(String, nullable=False)
     image_url = Column(String, nullable=True)
+    nickname = Column(String, nullable=True)
     slpm = Column(Float)
     str_acc = Column(Float)
     str_def = Column(Float)
@@ -38,20 +37,65 @@ class Fighter(Base):
     sub_avg = Column(Float)
     last_updated = Column(DateTime, default=datetime.utcnow)
 
-    # Physical/statistical attributes
-    height = Column(Integer, nullable=True)   # in inches
-    weight = Column(Integer, nullable=True)   # in lbs
-    reach = Column(Integer, nullable=True)    # in inches
+    # Physical/statistical attributes, as displayed on UFCStats (e.g. 5' 11", 155 lbs., 72")
+    height = Column(String, nullable=True)
+    weight = Column(String, nullable=True)
+    reach = Column(String, nullable=True)
+    # Parsed once at scrape time (src/physical.py); what predictions and datasets read
+    height_in = Column(Float, nullable=True)
+    weight_lbs = Column(Float, nullable=True)
+    reach_in = Column(Float, nullable=True)
     stance = Column(String, nullable=True)
     dob = Column(Date, nullable=True)
 
 
+PAIR_KEY_SEPARATOR = "|"
+
+# Sorts before every real prediction, so undated legacy rows page last
+UNKNOWN_PREDICTION_TIMESTAMP = datetime(1970, 1, 1)
+
+
+def make_pair_key(fighter_a: str, fighter_b: str) -> str:
+    """Order-independent key for a matchup, so A vs B and B vs A are the same fight"""
+    first, second = sorted((fighter_a, fighter_b))
+    return f"{first}{PAIR_KEY_SEPARATOR}{second}"
+
+
+def _default_pair_key(context):
+    params = context.get_current_parameters()
+    return make_pair_key(params["fighter_a"], params["fighter_b"])
+
+
+def _default_pair_norm(context):
+    params = context.get_current_parameters()
+    return make_norm_pair(params["fighter_a"], params["fighter_b"])
+
+
 class ModelPrediction(Base):
     __tablename__ = "model_predictions"
+    __table_args__ = (
+        # One prediction per matchup and model; the natural key for upserts
+        Index("uq_prediction_pair_model", "pair_key", "model", unique=True),
+        Index("ix_predictions_fighters_model", "fighter_a", "fighter_b", "model"),
+        # Pending predictions are the working set of the scheduler jobs
+        Index(
+            "ix_predictions_pending", "model", "timestamp",
+            sqlite_where=text("actual_winner IS NULL"),
+            postgresql_where=text("actual_winner IS NULL"),
+        ),
+        Index("ix_predictions_timestamp", "timestamp"),
+        # Keyset pagination of /model-performance/detailed on (timestamp, id)
+        Index("ix_predictions_timestamp_id", "timestamp", "id"),
+        Index("ix_predictions_resolved", "actual_winner", "timestamp"),
+        Index("ix_predictions_pair_norm", "pair_norm"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     fighter_a = Column(String, nullable=False)
     fighter_b = Column(String, nullable=False)
+    pair_key = Column(String, nullable=True, default=_default_pair_key)
+    # Normalized pair (see src.names) for matching scraped results to predictions
+    pair_norm = Column(String, nullable=True, default=_default_pair_norm)
     model = Column(String, nullable=False)  # "ml", "ensemble", or "sim"
     predicted_winner = Column(String, nullable=False)
     actual_winner = Column(String, nullable=True)
@@ -64,11 +108,19 @@ class ModelPrediction(Base):
     height_diff = Column(Integer, nullable=True)
     reach_diff = Column(Integer, nullable=True)
     age_diff = Column(Integer, nullable=True)
+    # Legacy rows without one are backfilled with UNKNOWN_PREDICTION_TIMESTAMP (migration 0011)
     timestamp = Column(DateTime, default=datetime.utcnow)
 
 
 class FightResult(Base):
     __tablename__ = "fight_results"
+    __table_args__ = (
+        # One row per bout and side; the natural key for upserts (NULL events never conflict)
+        # Also serves (fighter_name, opponent_name) lookups as its prefix
+        Index("uq_fight_results_bout", "fighter_name", "opponent_name", "event", unique=True),
+        Index("ix_fight_results_event", "event"),
+        Index("ix_fight_results_updated_at", "updated_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     fighter_name = Column(String, nullable=False)  # Main fighter
@@ -79,6 +131,8 @@ class FightResult(Base):
     time = Column(String, nullable=True)
     event = Column(String, nullable=True)
     event_date = Column(String, nullable=True)  # Keep as string to match existing
+    # Bumped whenever an upsert rewrites the row, so the incremental dataset build relabels it
+    updated_at = Column(DateTime, nullable=True, default=datetime.utcnow)
 
 
 class SchedulerMetadata(Base):
@@ -89,8 +143,71 @@ class SchedulerMetadata(Base):
     updated_at = Column(DateTime, default=datetime.utcnow)
 
 
-# Create all tables
-Base.metadata.create_all(bind=engine)
+class ModelPerformanceStats(Base):
+    """Lifetime per-model counters of resolved predictions (see src/model_performance.py)"""
+    __tablename__ = "model_performance_stats"
+
+    model = Column(String, primary_key=True)
+    resolved = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)  # Sum of max(fighter_a_prob, fighter_b_prob)
+    confidence_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class PredictionArchiveBatch(Base):
+    """Cold storage for predictions moved out of model_predictions (see src/prediction_archive.py)"""
+    __tablename__ = "prediction_archive_batches"
+
+    id = Column(Integer, primary_key=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+    # "resolved", "expired" (pending past the cutoff) or "duplicate" (lost a pair_key dedupe)
+    reason = Column(String, nullable=False)
+    first_timestamp = Column(DateTime, nullable=True)
+    last_timestamp = Column(DateTime, nullable=True)
+    row_count = Column(Integer, nullable=False)
+    encoding = Column(String, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+
+
+class ArchivedPredictionStats(Base):
+    """Per-model counters of archived predictions, so lifetime stats survive archiving"""
+    __tablename__ = "archived_prediction_stats"
+
+    model = Column(String, primary_key=True)
+    resolved = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
+    confidence_sum = Column(Float, nullable=False, default=0.0)  # Sum of max(fighter_a_prob, fighter_b_prob)
+    confidence_count = Column(Integer, nullable=False, default=0)
+    expired = Column(Integer, nullable=False, default=0)  # Pending predictions archived unresolved
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+def init_db(bind=None):
+    """Create missing tables and apply pending schema migrations"""
+    from src.migrations import run_migrations
+
+    bind = bind or get_engine()
+    Base.metadata.create_all(bind=bind)
+    run_migrations(bind)
+
+
+_db_ready = False
+_db_ready_lock = threading.Lock()
+
+
+def ensure_db():
+    """
+    init_db() once per process. Called explicitly at app startup (and by the
+    preload hook, so forked workers inherit the flag) and by the CLI scripts,
+    instead of as a side effect of importing this module.
+    """
+    global _db_ready
+    if not _db_ready:
+        with _db_ready_lock:
+            if not _db_ready:
+                init_db()
+                _db_ready = True
 
 
 def log_prediction(
@@ -105,22 +222,20 @@ def log_prediction(
     weight_diff: int = None,
     height_diff: int = None,
     reach_diff: int = None,
-    age_diff: int = None,
-    allow_duplicates: bool = False
+    age_diff: int = None
 ):
     """Log a model prediction to the database with duplicate prevention"""
     db = SessionLocal()
     try:
-        # Check for existing prediction unless duplicates are explicitly allowed
-        if not allow_duplicates:
-            existing = db.query(ModelPrediction).filter(
-                ((ModelPrediction.fighter_a == fighter_a) & (ModelPrediction.fighter_b == fighter_b) & (ModelPrediction.model == model)) |
-                ((ModelPrediction.fighter_a == fighter_b) & (ModelPrediction.fighter_b == fighter_a) & (ModelPrediction.model == model))
-            ).first()
-            
-            if existing:
-                print(f"Prediction already exists for {fighter_a} vs {fighter_b} ({model}), skipping...")
-                return existing.id
+        # uq_prediction_pair_model allows one prediction per matchup and model
+        existing = db.query(ModelPrediction).filter(
+            ModelPrediction.pair_key == make_pair_key(fighter_a, fighter_b),
+            ModelPrediction.model == model
+        ).first()
+
+        if existing:
+            print(f"Prediction already exists for {fighter_a} vs {fighter_b} ({model}), skipping...")
+            return existing.id
         
         # Ensure all numeric values are native Python types (not numpy)
         def safe_convert_float(value):
@@ -164,6 +279,208 @@ def log_prediction(
         db.close()
 
 
+PREDICTION_UPDATE_COLUMNS = (
+    "fighter_a", "fighter_b", "pair_norm", "predicted_winner", "fighter_a_prob", "fighter_b_prob", "draw_prob",
+    "penalty_score", "weight_diff", "height_diff", "reach_diff", "age_diff", "timestamp",
+)
+PREDICTION_FLOAT_COLUMNS = ("fighter_a_prob", "fighter_b_prob", "draw_prob", "penalty_score")
+PREDICTION_INT_COLUMNS = ("weight_diff", "height_diff", "reach_diff", "age_diff")
+
+
+def _dialect_insert(bind, model):
+    """Dialect-specific INSERT that supports ON CONFLICT"""
+    if bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif bind.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Bulk upsert is not supported on {bind.dialect.name}")
+    return insert(model)
+
+
+def _increment_counters(db, model, rows, columns):
+    """Upsert counter rows keyed by their primary key, adding to the stored values on conflict"""
+    table = model.__table__
+    insert = _dialect_insert(db.get_bind(), model).values(rows)
+    set_ = {column: table.c[column] + insert.excluded[column] for column in columns}
+    set_["updated_at"] = insert.excluded.updated_at
+    db.execute(insert.on_conflict_do_update(index_elements=[c.name for c in table.primary_key], set_=set_))
+
+
+def log_predictions_bulk(predictions, overwrite: bool = False, db: Session = None) -> int:
+    """
+    Write many predictions in a single transaction with INSERT ... ON CONFLICT on
+    the (pair_key, model) natural key.
+
+    Args:
+        predictions: Dicts with log_prediction's fields (fighter_a, fighter_b, model,
+            predicted_winner and optional probabilities/diffs)
+        overwrite: Update existing pending predictions for the same matchup and model
+            (used when regenerating after a retrain). Resolved predictions are never
+            touched. When False, existing predictions are left as they are.
+        db: Session to write in; the caller then owns the commit. Without one, a
+            session is opened and committed here.
+
+    Returns:
+        Number of rows inserted or updated
+    """
+    now = datetime.utcnow()
+    rows = {}
+    for p in predictions:
+        row = {
+            "fighter_a": p["fighter_a"],
+            "fighter_b": p["fighter_b"],
+            "pair_key": make_pair_key(p["fighter_a"], p["fighter_b"]),
+            "pair_norm": make_norm_pair(p["fighter_a"], p["fighter_b"]),
+            "model": p["model"],
+            "predicted_winner": p["predicted_winner"],
+            "timestamp": p.get("timestamp") or now,
+        }
+        # Ensure all numeric values are native Python types (not numpy)
+        for column in PREDICTION_FLOAT_COLUMNS:
+            row[column] = float(p[column]) if p.get(column) is not None else None
+        for column in PREDICTION_INT_COLUMNS:
+            row[column] = int(p[column]) if p.get(column) is not None else None
+        # Last write wins within a batch, like it would across separate calls
+        rows[(row["pair_key"], row["model"])] = row
+    if not rows:
+        return 0
+
+    own_session = db is None
+    if own_session:
+        db = SessionLocal()
+    try:
+        stmt = _dialect_insert(db.get_bind(), ModelPrediction)
+        if overwrite:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["pair_key", "model"],
+                set_={column: stmt.excluded[column] for column in PREDICTION_UPDATE_COLUMNS},
+                where=ModelPrediction.actual_winner.is_(None),
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=["pair_key", "model"])
+        # RETURNING yields one row per inserted/updated prediction; skipped conflicts return nothing
+        written = len(db.execute(stmt.returning(ModelPrediction.id), list(rows.values())).all())
+        if own_session:
+            db.commit()
+        return written
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        if own_session:
+            db.close()
+
+
+FIGHT_RESULT_KEY = ("fighter_name", "opponent_name", "event")
+FIGHT_RESULT_UPDATE_COLUMNS = ("result", "method", "round", "time", "event_date")
+FIGHT_RESULT_BATCH_SIZE = 500
+INVERSE_RESULTS = {"win": "loss", "loss": "win"}
+
+
+def _serialize_event_date(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d")
+    if isinstance(value, date):
+        return value.strftime("%Y-%m-%d")
+    return str(value)
+
+
+def _normalize_round(value):
+    if value is None:
+        return None
+    try:
+        return int(str(value).strip() or 0)
+    except (ValueError, TypeError):
+        return None
+
+
+def _fight_result_row(fight):
+    result = fight.get("result")
+    return {
+        "fighter_name": fight["fighter_name"],
+        "opponent_name": fight["opponent_name"],
+        "result": result.lower() if result else "win",
+        "method": fight.get("method"),
+        "round": _normalize_round(fight.get("round")),
+        "time": fight.get("time"),
+        "event": fight.get("event"),
+        "event_date": _serialize_event_date(fight.get("event_date")),
+    }
+
+
+def _mirror_fight_result(row):
+    """The same bout seen from the opponent's side"""
+    return {
+        **row,
+        "fighter_name": row["opponent_name"],
+        "opponent_name": row["fighter_name"],
+        "result": INVERSE_RESULTS.get(row["result"], row["result"]),
+    }
+
+
+def upsert_fight_results(db: Session, fights, both_sides: bool = True, batch_size: int = FIGHT_RESULT_BATCH_SIZE) -> int:
+    """
+    Insert or update many fight results, keyed on (fighter_name, opponent_name, event).
+
+    Args:
+        db: Session to write in; the caller owns the commit
+        fights: Dicts with fighter_name, opponent_name, result and optional event,
+            event_date, method, round, time
+        both_sides: Also write each bout from the opponent's side (win <-> loss)
+        batch_size: Rows per INSERT ... ON CONFLICT statement
+
+    Rows without an event cannot use the unique key (NULLs never conflict), so
+    they fall back to replacing the matching NULL-event row. Rows whose values
+    are unchanged are left alone, so updated_at only moves on real rewrites.
+
+    Returns:
+        Number of fight_results rows written
+    """
+    now = datetime.utcnow()
+    rows = {}
+    for fight in fights:
+        row = {**_fight_result_row(fight), "updated_at": now}
+        sides = (row, _mirror_fight_result(row)) if both_sides else (row,)
+        for side in sides:
+            # Last write wins; a batch may not touch the same key twice on Postgres
+            rows[tuple(side[k] for k in FIGHT_RESULT_KEY)] = side
+
+    keyed = [row for row in rows.values() if row["event"] is not None]
+    unkeyed = [row for row in rows.values() if row["event"] is None]
+
+    table = FightResult.__table__
+    stmt = _dialect_insert(db.get_bind(), FightResult)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(FIGHT_RESULT_KEY),
+        set_={column: stmt.excluded[column] for column in FIGHT_RESULT_UPDATE_COLUMNS + ("updated_at",)},
+        where=or_(*(
+            table.c[column].is_distinct_from(stmt.excluded[column]) for column in FIGHT_RESULT_UPDATE_COLUMNS
+        )),
+    )
+    for i in range(0, len(keyed), batch_size):
+        # executemany: Postgres folds each batch into one multi-row INSERT (insertmanyvalues)
+        db.execute(stmt, keyed[i:i + batch_size])
+
+    for row in unkeyed:
+        existing = db.query(FightResult).filter(
+            FightResult.fighter_name == row["fighter_name"],
+            FightResult.opponent_name == row["opponent_name"],
+            FightResult.event.is_(None),
+        )
+        current = existing.with_entities(*(getattr(FightResult, c) for c in FIGHT_RESULT_UPDATE_COLUMNS)).all()
+        if current == [tuple(row[c] for c in FIGHT_RESULT_UPDATE_COLUMNS)]:
+            continue
+        existing.delete(synchronize_session=False)
+        db.add(FightResult(**row))
+    if unkeyed:
+        db.flush()
+
+    return len(rows)
+
+
 def upsert_fight_result(
     db: Session,
     *,
@@ -175,54 +492,19 @@ def upsert_fight_result(
     method: str | None = None,
     round: str | None = None,
     time: str | None = None,
-) -> FightResult:
-    """Replace any existing fight result for the given matchup/event with the new data."""
-
-    def serialize_event_date(value):
-        if value is None:
-            return None
-        if isinstance(value, datetime):
-            return value.strftime("%Y-%m-%d")
-        if isinstance(value, date):
-            return value.strftime("%Y-%m-%d")
-        return str(value)
-
-    def normalize_round(value):
-        if value is None:
-            return None
-        try:
-            return int(str(value).strip() or 0)
-        except (ValueError, TypeError):
-            return None
-
-    normalized_result = result.lower() if result else None
-    normalized_event_date = serialize_event_date(event_date)
-    normalized_round = normalize_round(round)
-
-    delete_query = db.query(FightResult).filter(
-        FightResult.fighter_name == fighter_name,
-        FightResult.opponent_name == opponent_name,
-    )
-    if event is None:
-        delete_query = delete_query.filter(FightResult.event.is_(None))
-    else:
-        delete_query = delete_query.filter(FightResult.event == event)
-    if normalized_result:
-        delete_query = delete_query.filter(FightResult.result == normalized_result)
-    delete_query.delete(synchronize_session=False)
-    db.flush()
-
-    next_id = (db.query(func.max(FightResult.id)).scalar() or 0) + 1
-    fight = FightResult(
-        id=next_id,
-        fighter_name=fighter_name,
-        opponent_name=opponent_name,
-        result=normalized_result or "win",
-        method=method,
-        round=normalized_round,
-        time=time,
-        event=event,
-        event_date=normalized_event_date,
+) -> None:
+    """Replace any existing fight result for the given matchup/event with the new data (one side only)."""
+    upsert_fight_results(
+        db,
+        [{
+            "fighter_name": fighter_name,
+            "opponent_name": opponent_name,
+            "result": result,
+            "event": event,
+            "event_date": event_date,
+            "method": method,
+            "round": round,
+            "time": time,
+        }],
+        both_sides=False,
     )
-    db.add(fight)
-    return fight
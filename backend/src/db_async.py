@@ -0,0 +1,115 @@
+"""
+Async session layer for the read-heavy API endpoints.
+
+Sync handlers run in anyio's threadpool (40 threads by default), so concurrent
+requests queued behind it even when the database was idle. Endpoints that only
+read use an AsyncSession instead: the query awaits on the event loop and the
+number of requests in flight is bounded by the connection pool, not by threads.
+
+Same database and tuning as src/db_engine.py, through the asyncio drivers
+(aiosqlite locally, asyncpg for Supabase). The sync engine stays for the
+scheduler, scrapers and ML code.
+"""
+import os
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from src.db_engine import (
+    DEFAULT_POOL_RECYCLE_SECONDS,
+    POOL_RECYCLE_ENV,
+    _PoolCounters,
+    _configure_postgres,
+    _configure_sqlite,
+    _postgres_pool_sizes,
+    get_database_url,
+    pool_stats,
+)
+
+# Supabase's transaction pooler (port 6543) can't keep asyncpg's prepared statements
+PGBOUNCER_ENV = "DB_PGBOUNCER"
+SUPABASE_TRANSACTION_POOLER_PORT = 6543
+
+
+def get_async_database_url(url):
+    """(async URL, connect_args) for a sync DATABASE_URL"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite"), {}
+    if backend in ("postgres", "postgresql"):
+        # asyncpg takes ssl as a connect argument, not libpq's sslmode parameter
+        query = dict(url.query)
+        connect_args = {"timeout": 10}
+        sslmode = query.pop("sslmode", None)
+        if sslmode and sslmode != "disable":
+            connect_args["ssl"] = sslmode
+        pgbouncer = os.getenv(PGBOUNCER_ENV)
+        if pgbouncer is None:
+            pgbouncer = "1" if url.port == SUPABASE_TRANSACTION_POOLER_PORT else "0"
+        if pgbouncer == "1":
+            query["prepared_statement_cache_size"] = "0"
+            connect_args["statement_cache_size"] = 0
+        return url.set(drivername="postgresql+asyncpg", query=query), connect_args
+    raise ValueError(f"No async driver configured for {backend} URLs")
+
+
+def create_async_db_engine(url=None):
+    """Async engine for url (DATABASE_URL by default) with the same per-backend tuning as the sync one"""
+    async_url, connect_args = get_async_database_url(url or get_database_url())
+    if async_url.get_backend_name() == "sqlite":
+        engine = create_async_engine(async_url, connect_args=connect_args)
+        _configure_sqlite(engine.sync_engine, in_memory=async_url.database in (None, "", ":memory:"))
+    else:
+        pool_size, max_overflow = _postgres_pool_sizes()
+        engine = create_async_engine(
+            async_url,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=True,
+            pool_recycle=int(os.getenv(POOL_RECYCLE_ENV, DEFAULT_POOL_RECYCLE_SECONDS)),
+            pool_use_lifo=True,
+            connect_args=connect_args,
+        )
+        _configure_postgres(engine.sync_engine)
+    counters = _PoolCounters()
+    counters.attach(engine.sync_engine)
+    engine.sync_engine.info_counters = counters
+    return engine
+
+
+_async_engine = None
+AsyncSessionLocal = async_sessionmaker(expire_on_commit=False)
+
+
+def get_async_engine():
+    """The shared async engine, created on first use (inside a worker, after any fork)"""
+    global _async_engine
+    if _async_engine is None:
+        _async_engine = create_async_db_engine()
+        AsyncSessionLocal.configure(bind=_async_engine)
+    return _async_engine
+
+
+def async_session():
+    """New AsyncSession on the shared engine; use as `async with async_session() as session`"""
+    get_async_engine()
+    return AsyncSessionLocal()
+
+
+async def get_async_session():
+    """FastAPI dependency: one AsyncSession per request, always closed"""
+    async with async_session() as session:
+        yield session
+
+
+def dispose_after_fork():
+    """Forget connections inherited from a parent process without closing them"""
+    if _async_engine is not None:
+        _async_engine.sync_engine.dispose(close=False)
+
+
+def async_pool_stats():
+    if _async_engine is None:
+        return None
+    return pool_stats(_async_engine.sync_engine)
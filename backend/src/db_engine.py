@@ -0,0 +1,220 @@
+"""
+The process-wide SQLAlchemy engine, tuned per backend.
+
+The API, the scheduler (including its APScheduler job store) and the dataset
+builder all share the engine from get_engine(), so each process has one
+connection pool instead of three.
+
+Postgres (Supabase): a fixed pool sized so every gunicorn worker together
+stays within DB_MAX_CONNECTIONS, pre-ping so connections dropped by the pooler
+are replaced instead of failing a request, periodic recycling, and a
+server-side statement timeout for API requests. The timeout is set with
+SET LOCAL at the start of each transaction begun while
+RequestStatementTimeoutMiddleware is serving a request, so it holds behind
+Supabase's transaction pooler and never applies to scheduler jobs, migrations
+or dataset builds.
+
+SQLite: WAL so readers don't block the writer (API reads while a scheduler job
+writes), synchronous=NORMAL (safe with WAL), a memory-mapped read path and a
+busy timeout so concurrent writers wait instead of raising "database is locked".
+"""
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+# Total connections all web workers of one deployment may hold (Supabase plan limit minus headroom)
+MAX_CONNECTIONS_ENV = "DB_MAX_CONNECTIONS"
+DEFAULT_MAX_CONNECTIONS = 20
+POOL_SIZE_ENV = "DB_POOL_SIZE"
+MAX_OVERFLOW_ENV = "DB_MAX_OVERFLOW"
+POOL_RECYCLE_ENV = "DB_POOL_RECYCLE_SECONDS"
+DEFAULT_POOL_RECYCLE_SECONDS = 1800
+STATEMENT_TIMEOUT_ENV = "DB_STATEMENT_TIMEOUT_MS"
+DEFAULT_STATEMENT_TIMEOUT_MS = 30000
+
+SQLITE_BUSY_TIMEOUT_ENV = "SQLITE_BUSY_TIMEOUT_MS"
+DEFAULT_SQLITE_BUSY_TIMEOUT_MS = 5000
+SQLITE_MMAP_SIZE_ENV = "SQLITE_MMAP_SIZE"
+DEFAULT_SQLITE_MMAP_SIZE = 256 * 1024 * 1024
+
+
+def get_database_url():
+    url = os.getenv("DATABASE_URL")
+    if url is None:
+        # Local development fallback
+        from src.azure_config import get_database_path
+        url = get_database_path()
+    return url
+
+
+def _postgres_pool_sizes():
+    """(pool_size, max_overflow) so that workers * (size + overflow) fits the connection budget"""
+    workers = max(int(os.getenv("WEB_CONCURRENCY", "4")), 1)
+    budget = int(os.getenv(MAX_CONNECTIONS_ENV, DEFAULT_MAX_CONNECTIONS))
+    per_worker = max(budget // workers, 2)
+    pool_size = int(os.getenv(POOL_SIZE_ENV, max(per_worker // 2, 1)))
+    max_overflow = int(os.getenv(MAX_OVERFLOW_ENV, max(per_worker - pool_size, 0)))
+    return pool_size, max_overflow
+
+
+# Statement timeout (ms) for transactions begun in the current context; None for no limit
+_statement_timeout_ms = ContextVar("statement_timeout_ms", default=None)
+
+
+@contextmanager
+def statement_timeout(timeout_ms):
+    """Apply timeout_ms to transactions begun inside the block (None lifts it)"""
+    token = _statement_timeout_ms.set(timeout_ms)
+    try:
+        yield
+    finally:
+        _statement_timeout_ms.reset(token)
+
+
+class RequestStatementTimeoutMiddleware:
+    """Pure ASGI middleware applying DB_STATEMENT_TIMEOUT_MS to queries run while serving a request"""
+
+    def __init__(self, app, timeout_ms=None):
+        self.app = app
+        if timeout_ms is None:
+            timeout_ms = int(os.getenv(STATEMENT_TIMEOUT_ENV, DEFAULT_STATEMENT_TIMEOUT_MS))
+        self.timeout_ms = timeout_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        # Context variables reach sync endpoints too: the threadpool copies the context
+        with statement_timeout(self.timeout_ms):
+            await self.app(scope, receive, send)
+
+
+def _configure_postgres(engine):
+    @event.listens_for(engine, "begin")
+    def _set_statement_timeout(conn):
+        timeout_ms = _statement_timeout_ms.get()
+        if timeout_ms:
+            # psycopg opens the transaction on this first statement, so SET LOCAL
+            # covers exactly this transaction (session-level SET does not survive
+            # a transaction pooler handing out a different server connection)
+            cursor = conn.connection.cursor()
+            try:
+                cursor.execute(f"SET LOCAL statement_timeout = {int(timeout_ms)}")
+            finally:
+                cursor.close()
+
+
+def _configure_sqlite(engine, in_memory):
+    busy_timeout = int(os.getenv(SQLITE_BUSY_TIMEOUT_ENV, DEFAULT_SQLITE_BUSY_TIMEOUT_MS))
+    mmap_size = int(os.getenv(SQLITE_MMAP_SIZE_ENV, DEFAULT_SQLITE_MMAP_SIZE))
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(f"PRAGMA busy_timeout = {busy_timeout}")
+            if not in_memory:
+                cursor.execute("PRAGMA journal_mode = WAL")
+                cursor.execute("PRAGMA synchronous = NORMAL")
+                cursor.execute(f"PRAGMA mmap_size = {mmap_size}")
+        finally:
+            cursor.close()
+
+
+class _PoolCounters:
+    """Lifetime pool counters; many connects relative to checkouts means connection churn"""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidated = 0
+
+    def attach(self, engine):
+        @event.listens_for(engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            self.connects += 1
+
+        @event.listens_for(engine, "checkout")
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.checkouts += 1
+
+        @event.listens_for(engine, "invalidate")
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            self.invalidated += 1
+
+
+def create_db_engine(url=None):
+    """Engine for url (DATABASE_URL by default) with the backend-specific pool and session settings"""
+    url = url or get_database_url()
+    if url.startswith("sqlite"):
+        in_memory = url in ("sqlite://", "sqlite:///:memory:")
+        engine = create_engine(url, connect_args={"check_same_thread": False})
+        _configure_sqlite(engine, in_memory)
+    else:
+        pool_size, max_overflow = _postgres_pool_sizes()
+        engine = create_engine(
+            url,
+            poolclass=QueuePool,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=True,
+            pool_recycle=int(os.getenv(POOL_RECYCLE_ENV, DEFAULT_POOL_RECYCLE_SECONDS)),
+            pool_use_lifo=True,  # Lets idle connections past pool_size age out
+            connect_args={"connect_timeout": 10},
+        )
+        _configure_postgres(engine)
+    counters = _PoolCounters()
+    counters.attach(engine)
+    engine.info_counters = counters
+    return engine
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """The shared engine, created on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = create_db_engine()
+    return _engine
+
+
+def dispose_after_fork():
+    """Forget connections inherited from a parent process without closing them"""
+    if _engine is not None:
+        _engine.dispose(close=False)
+
+
+def disable_statement_timeout(conn):
+    """Lift the statement timeout for the current transaction (long batch reads such as dataset builds)"""
+    if conn.dialect.name == "postgresql":
+        conn.exec_driver_sql("SET LOCAL statement_timeout = 0")
+
+
+def pool_stats(engine=None):
+    """Current pool usage and lifetime counters, for the status endpoints"""
+    engine = engine or get_engine()
+    pool = engine.pool
+    stats = {"backend": engine.dialect.name, "pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+        })
+    counters = getattr(engine, "info_counters", None)
+    if counters is not None:
+        stats.update({
+            "connects": counters.connects,
+            "checkouts": counters.checkouts,
+            "invalidated": counters.invalidated,
+        })
+    return stats
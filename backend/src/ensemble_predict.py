@@ -1,111 +1,225 @@
-from src.ml.ml_predict import predict_fight_outcome
+from src.ml.ml_predict import predict_fight_outcome, predict_fight_outcomes
 from src.simulate_fight import simulate_fight
 from src.fight_model import calculate_exchange_probabilities
-from src.db import SessionLocal, Fighter, log_prediction
+from src.db import log_prediction, log_predictions_bulk
+from src.fighter_store import get_fighter_store
+
+MODEL_TYPES = ("ml", "ensemble", "sim")
+
+
+def _run_ml(fighter_a: str, fighter_b: str):
+    """ML component: the full predict_fight_outcome result plus the 0-1 probability for fighter A"""
+    ml_result = predict_fight_outcome(fighter_a, fighter_b)
+    return ml_result, ml_result["fighter_a_win_prob"] / 100  # Convert to 0-1
+
+
+def _run_sim(fighter_a: str, fighter_b: str, sim_runs: int):
+    """Simulation component: 0-1 probability for fighter A, or None if either fighter is unknown"""
+    store = get_fighter_store()
+    f1 = store.get(fighter_a)
+    f2 = store.get(fighter_b)
+    if not f1 or not f2:
+        return None
+
+    # Calculate probabilities for simulation
+    P_A, P_B, P_neutral = calculate_exchange_probabilities(f1, f2)
+
+    # Run fight simulation
+    sim_result = simulate_fight(P_A, P_B, P_neutral, num_rounds=5, name_A=fighter_a, name_B=fighter_b, num_simulations=sim_runs)
+    return sim_result[fighter_a] / 100  # Convert to 0-1
+
+
+def _blend(ml_prob: float, sim_prob: float):
+    """Confidence-weighted ensemble of the ML and simulation probabilities"""
+    # Calculate confidence scores for each model
+    def calculate_confidence(prob):
+        """Calculate confidence based on how far from 0.5 (neutral) the probability is"""
+        return abs(prob - 0.5) * 2  # Scale to 0-1 range
+
+    ml_confidence = calculate_confidence(ml_prob)
+    sim_confidence = calculate_confidence(sim_prob)
+
+    if ml_confidence + sim_confidence > 0:
+        # Weight models by their confidence levels
+        ml_weight = ml_confidence / (ml_confidence + sim_confidence)
+        sim_weight = sim_confidence / (ml_confidence + sim_confidence)
+
+        # Apply base weights adjusted by confidence
+        base_ml_weight = 0.6  # Favor ML model slightly
+        base_sim_weight = 0.4
+
+        # Combine base weights with confidence weights
+        final_ml_weight = (base_ml_weight + ml_weight) / 2
+        final_sim_weight = (base_sim_weight + sim_weight) / 2
+
+        # Normalize weights
+        total_weight = final_ml_weight + final_sim_weight
+        final_ml_weight /= total_weight
+        final_sim_weight /= total_weight
+
+        return final_ml_weight * ml_prob + final_sim_weight * sim_prob
+
+    # Fallback to simple average if both models are uncertain
+    return 0.5
+
+
+def _pct(prob):
+    return round(prob * 100, 1) if prob is not None else None
+
+
+def prediction_row(result):
+    """Turn a prediction result into the row log_prediction/log_predictions_bulk store"""
+    uses_ml = result["model"] != "sim"
+    diffs = result.get("diffs") or {}
+
+    def ml_only(value):
+        return value if uses_ml else None
+
+    return {
+        "fighter_a": result["fighter_a"],
+        "fighter_b": result["fighter_b"],
+        "model": result["model"],
+        "predicted_winner": result["fighter_a"] if result["fighter_a_win_prob"] > 50 else result["fighter_b"],
+        "fighter_a_prob": float(result["fighter_a_win_prob"]),
+        "fighter_b_prob": float(result["fighter_b_win_prob"]),
+        "draw_prob": 0.0,  # Current models don't predict draws
+        "penalty_score": ml_only(result.get("penalty_score")),
+        "weight_diff": ml_only(diffs.get("weight_diff")),
+        "height_diff": ml_only(diffs.get("height_diff")),
+        "reach_diff": ml_only(diffs.get("reach_diff")),
+        "age_diff": ml_only(diffs.get("age_diff")),
+    }
+
+
+def _build_result(fighter_a, fighter_b, model_type, final_prob, ml_result, ml_prob, sim_prob, ensemble_prob):
+    """Shape one model's output"""
+    ml_result = ml_result or {}
+    return {
+        "fighter_a": fighter_a,
+        "fighter_b": fighter_b,
+        "model": model_type,
+        "fighter_a_win_prob": round(final_prob * 100, 1),
+        "fighter_b_win_prob": round((1 - final_prob) * 100, 1),
+        "ml_win_prob": _pct(ml_prob),
+        "sim_win_prob": _pct(sim_prob),
+        "ensemble_win_prob": _pct(ensemble_prob),
+        "penalty_score": ml_result.get("penalty_score", None),
+        "diffs": ml_result.get("diffs", {})
+    }
+
 
 def get_ensemble_prediction(fighter_a: str, fighter_b: str, model_type: str = "ensemble", sim_runs: int = 1000, log_to_db: bool = True):
     """
     Get ensemble prediction for two fighters.
-    
+
+    Only the components the requested model needs are evaluated: "ml" skips the
+    simulation and "sim" skips the ML model. Component probabilities that were not
+    computed are returned as None.
+
     Args:
         fighter_a: Name of first fighter
-        fighter_b: Name of second fighter  
+        fighter_b: Name of second fighter
         model_type: Type of model to use ("ml", "ensemble", or "sim")
         sim_runs: Number of simulation runs for simulation component
         log_to_db: Whether to log the prediction to the database (True for scheduled/automatic predictions, False for custom simulations)
-    
+
     Returns:
         Dictionary containing prediction results and probabilities
     """
-    # Run ML model
-    ml_result = predict_fight_outcome(fighter_a, fighter_b)
-    ml_prob = ml_result["fighter_a_win_prob"] / 100  # Convert to 0-1
-
-    # Get fighter data for simulation
-    db = SessionLocal()
-    f1 = db.query(Fighter).filter(Fighter.name == fighter_a).first()
-    f2 = db.query(Fighter).filter(Fighter.name == fighter_b).first()
-    db.close()
-
-    if f1 and f2:
-        # Calculate probabilities for simulation
-        P_A, P_B, P_neutral = calculate_exchange_probabilities(f1, f2)
-        
-        # Run fight simulation
-        sim_result = simulate_fight(P_A, P_B, P_neutral, num_rounds=5, name_A=fighter_a, name_B=fighter_b, num_simulations=sim_runs)
-        sim_prob = sim_result[fighter_a] / 100  # Convert to 0-1
+    ml_result = None
+    if model_type != "sim":
+        ml_result = predict_fight_outcome(fighter_a, fighter_b)
+
+    result = _predict_with(fighter_a, fighter_b, model_type, ml_result, sim_runs)
+
+    # Log prediction to database (only if requested)
+    if log_to_db and model_type in MODEL_TYPES:
+        log_prediction(**prediction_row(result))
+
+    return result
+
+
+def get_card_predictions(pairs, model_type: str = "ensemble", sim_runs: int = 1000):
+    """
+    get_ensemble_prediction (without logging) for every bout of a card.
+
+    The ML model scores all bouts in one batch (predict_fight_outcomes); the
+    simulation still runs per bout.
+
+    Args:
+        pairs: (fighter_a, fighter_b) tuples; both fighters must be known
+        model_type: Type of model to use ("ml", "ensemble", or "sim")
+        sim_runs: Number of simulation runs for simulation component
+
+    Returns:
+        One result per pair, in order
+    """
+    if model_type != "sim":
+        ml_results = predict_fight_outcomes(pairs)
     else:
-        # Fallback if fighters not found
-        sim_prob = 0.5
+        ml_results = [None] * len(pairs)
+    return [
+        _predict_with(fighter_a, fighter_b, model_type, ml_result, sim_runs)
+        for (fighter_a, fighter_b), ml_result in zip(pairs, ml_results)
+    ]
+
+
+def _predict_with(fighter_a, fighter_b, model_type, ml_result, sim_runs):
+    """Finish a prediction from an already computed ML result (None for "sim")"""
+    ml_prob = sim_prob = ensemble_prob = None
+    if ml_result is not None:
+        ml_prob = ml_result["fighter_a_win_prob"] / 100  # Convert to 0-1
+
+    if model_type != "ml":
+        sim_prob = _run_sim(fighter_a, fighter_b, sim_runs)
+        if sim_prob is None:
+            if model_type == "sim":
+                raise ValueError("One or both fighters not found.")
+            # Fallback if fighters not found
+            sim_prob = 0.5
 
-    # Calculate confidence scores for each model
-    def calculate_confidence(prob):
-        """Calculate confidence based on how far from 0.5 (neutral) the probability is"""
-        return abs(prob - 0.5) * 2  # Scale to 0-1 range
-    
-    ml_confidence = calculate_confidence(ml_prob)
-    sim_confidence = calculate_confidence(sim_prob)
-    
     # Blend predictions based on model type
     if model_type == "ml":
         final_prob = ml_prob
     elif model_type == "sim":
         final_prob = sim_prob
     else:
-        # Confidence-weighted ensemble
-        if ml_confidence + sim_confidence > 0:
-            # Weight models by their confidence levels
-            ml_weight = ml_confidence / (ml_confidence + sim_confidence)
-            sim_weight = sim_confidence / (ml_confidence + sim_confidence)
-            
-            # Apply base weights adjusted by confidence
-            base_ml_weight = 0.6  # Favor ML model slightly
-            base_sim_weight = 0.4
-            
-            # Combine base weights with confidence weights
-            final_ml_weight = (base_ml_weight + ml_weight) / 2
-            final_sim_weight = (base_sim_weight + sim_weight) / 2
-            
-            # Normalize weights
-            total_weight = final_ml_weight + final_sim_weight
-            final_ml_weight /= total_weight
-            final_sim_weight /= total_weight
-            
-            final_prob = final_ml_weight * ml_prob + final_sim_weight * sim_prob
-        else:
-            # Fallback to simple average if both models are uncertain
-            final_prob = 0.5
-
-    # Determine predicted winner
-    predicted_winner = fighter_a if final_prob > 0.5 else fighter_b
-    
-    # Log prediction to database (only if requested)
-    if log_to_db and model_type in ["ml", "ensemble", "sim"]:
-        diffs = ml_result.get("diffs", {})
-        log_prediction(
-            fighter_a=fighter_a,
-            fighter_b=fighter_b,
-            model=model_type,
-            predicted_winner=predicted_winner,
-            fighter_a_prob=float(round(final_prob * 100, 1)),
-            fighter_b_prob=float(round((1 - final_prob) * 100, 1)),
-            draw_prob=0.0,  # Current models don't predict draws
-            penalty_score=float(ml_result.get("penalty_score")) if ml_result.get("penalty_score") is not None and model_type != "sim" else None,
-            weight_diff=int(diffs.get("weight_diff")) if diffs.get("weight_diff") is not None and model_type != "sim" else None,
-            height_diff=int(diffs.get("height_diff")) if diffs.get("height_diff") is not None and model_type != "sim" else None,
-            reach_diff=int(diffs.get("reach_diff")) if diffs.get("reach_diff") is not None and model_type != "sim" else None,
-            age_diff=int(diffs.get("age_diff")) if diffs.get("age_diff") is not None and model_type != "sim" else None
-        )
+        final_prob = ensemble_prob = _blend(ml_prob, sim_prob)
 
-    return {
-        "fighter_a": fighter_a,
-        "fighter_b": fighter_b,
-        "model": model_type,
-        "fighter_a_win_prob": round(final_prob * 100, 1),
-        "fighter_b_win_prob": round((1 - final_prob) * 100, 1),
-        "ml_win_prob": round(ml_prob * 100, 1),
-        "sim_win_prob": round(sim_prob * 100, 1),
-        "ensemble_win_prob": round(final_prob * 100, 1),
-        "penalty_score": ml_result.get("penalty_score", None),
-        "diffs": ml_result.get("diffs", {})
+    return _build_result(fighter_a, fighter_b, model_type, final_prob, ml_result, ml_prob, sim_prob, ensemble_prob)
+
+
+def get_all_predictions(fighter_a: str, fighter_b: str, sim_runs: int = 1000, log_to_db: bool = True):
+    """
+    Get the ml, sim and ensemble predictions for a bout in one pass.
+
+    The ML model and the simulation each run once and all three outputs are
+    derived from them, instead of calling get_ensemble_prediction per model.
+
+    Pass log_to_db=False and hand prediction_row() of each result to
+    log_predictions_bulk to write a whole card in one transaction.
+
+    Returns:
+        Dictionary mapping model type ("ml", "ensemble", "sim") to the same result
+        dictionary get_ensemble_prediction returns for that model
+    """
+    ml_result, ml_prob = _run_ml(fighter_a, fighter_b)
+    sim_prob = _run_sim(fighter_a, fighter_b, sim_runs)
+    if sim_prob is None:
+        raise ValueError("One or both fighters not found.")
+    ensemble_prob = _blend(ml_prob, sim_prob)
+
+    final_probs = {"ml": ml_prob, "ensemble": ensemble_prob, "sim": sim_prob}
+    results = {
+        model_type: _build_result(
+            fighter_a, fighter_b, model_type, final_probs[model_type],
+            ml_result, ml_prob, sim_prob, ensemble_prob
+        )
+        for model_type in MODEL_TYPES
     }
+
+    # All three rows go in one transaction
+    if log_to_db:
+        log_predictions_bulk([prediction_row(r) for r in results.values()])
+
+    return results
@@ -1,6 +1,9 @@
 import requests
 from bs4 import BeautifulSoup
 from src.db import Fighter, SessionLocal
+from src.fighter_store import get_fighter_store
+from src.fighter_search import get_fighter_search
+from src.physical import parse_physical
 from datetime import datetime
 
 def parse_dob(text):
@@ -53,6 +56,11 @@ def scrape_fighter_stats(name: str, profile_url: str):
                 details["dob"] = text.split(":")[-1].strip()
         return details
 
+    def extract_nickname():
+        nickname_tag = soup.find("p", class_="b-content__Nickname")
+        nickname = nickname_tag.get_text(strip=True) if nickname_tag else ""
+        return nickname or None
+
     def extract_image_url():
         img_tag = soup.find("img", class_="c-hero__image")
         return img_tag["src"] if img_tag and img_tag.get("src") else None
@@ -64,6 +72,7 @@ def scrape_fighter_stats(name: str, profile_url: str):
             "name": name,
             "profile_url": profile_url,
             "image_url": extract_image_url(),
+            "nickname": extract_nickname(),
             "slpm": extract_stat("SLpM"),
             "str_acc": extract_stat("Str. Acc"),
             "str_def": extract_stat("Str. Def"),
@@ -74,6 +83,7 @@ def scrape_fighter_stats(name: str, profile_url: str):
             "height": profile["height"],
             "weight": profile["weight"],
             "reach": profile["reach"],
+            **parse_physical(profile["height"], profile["weight"], profile["reach"]),
             "stance": profile["stance"],
             "dob": parse_dob(profile["dob"]),
             "last_updated": datetime.utcnow()
@@ -95,9 +105,14 @@ def save_fighter_to_db(fighter_data):
     existing = db.query(Fighter).filter(Fighter.name == fighter_data["name"]).first()
 
     if existing:
+        changed = False
         for key, value in fighter_data.items():
             if hasattr(existing, key) and value and getattr(existing, key) != value:
                 setattr(existing, key, value)
+                changed = True
+        if changed:
+            # Lets fighter snapshots and the incremental dataset build see the update
+            existing.last_updated = datetime.utcnow()
         db.commit()
         print(f"🔁 Updated {fighter_data['name']}.")
     else:
@@ -106,3 +121,5 @@ def save_fighter_to_db(fighter_data):
         db.commit()
         print(f"{fighter.name} added to DB.")
     db.close()
+    get_fighter_store().invalidate(fighter_data["name"])
+    get_fighter_search().invalidate()
@@ -0,0 +1,259 @@
+"""
+In-memory fighter search for autocomplete (/fighters/search).
+
+Names and nicknames are folded (accents stripped, lowercased, punctuation
+dropped) so "jiri" finds "Jiří Procházka". Two indexes are kept over the folded
+text:
+
+- a prefix trie of name and nickname words: every query word must prefix some
+  word of the fighter ("jon jo" finds "Jon Jones"), in any order;
+- a trigram index for typos and fuzzy matches ("khabib nurmagomedv"), scored by
+  trigram overlap (Jaccard) and used when prefix matches don't fill the page.
+
+Results are ranked exact name, name prefix, name words, nickname, then fuzzy;
+ties go to the shorter name. Like the fighter store, the index checks the
+table's row count and newest last_updated at most every
+FIGHTER_STORE_REFRESH_SECONDS and only indexes rows changed since the last
+check; a full rebuild happens only when rows disappeared.
+"""
+import os
+import threading
+import time
+import unicodedata
+from collections import Counter
+
+from sqlalchemy import func, select
+
+from src.fighter_store import DEFAULT_REFRESH_SECONDS, REFRESH_SECONDS_ENV
+
+DEFAULT_LIMIT = 10
+FUZZY_MIN_SIMILARITY = 0.3
+
+# Rank tiers, best first
+EXACT, NAME_PREFIX, NAME_WORDS, NICKNAME, FUZZY = range(5)
+
+
+def fold(text):
+    """Lowercase ASCII-ish form of text for matching: accents stripped, punctuation as spaces"""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    cleaned = "".join(c if c.isalnum() else " " for c in stripped.casefold())
+    return " ".join(cleaned.split())
+
+
+def trigrams(folded):
+    """Trigrams of folded text, padded so word starts and ends count"""
+    padded = f"  {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class _TrieNode:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children = {}
+        self.ids = set()  # Every fighter with a word passing through this node
+
+
+class _Trie:
+    def __init__(self):
+        self.root = _TrieNode()
+
+    def add(self, word, fighter_id):
+        node = self.root
+        for char in word:
+            node = node.children.setdefault(char, _TrieNode())
+            node.ids.add(fighter_id)
+
+    def remove(self, word, fighter_id):
+        node = self.root
+        for char in word:
+            node = node.children.get(char)
+            if node is None:
+                return
+            node.ids.discard(fighter_id)
+
+    def prefixed(self, prefix):
+        """Ids with a word starting with prefix"""
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return node.ids
+
+
+class _Entry:
+    __slots__ = ("name", "image", "nickname", "folded_name", "folded_nickname", "grams")
+
+    def __init__(self, name, image, nickname):
+        self.name = name
+        self.image = image
+        self.nickname = nickname
+        self.folded_name = fold(name)
+        self.folded_nickname = fold(nickname)
+        self.grams = trigrams(self.folded_name)
+        if self.folded_nickname:
+            self.grams |= trigrams(self.folded_nickname)
+
+
+class FighterSearchIndex:
+    def __init__(self, refresh_seconds=None):
+        if refresh_seconds is None:
+            refresh_seconds = float(os.getenv(REFRESH_SECONDS_ENV, DEFAULT_REFRESH_SECONDS))
+        self.refresh_seconds = refresh_seconds
+        self._entries = {}  # id -> _Entry
+        self._ids = {}  # name -> id
+        self._next_id = 0
+        self._names = _Trie()
+        self._nicknames = _Trie()
+        self._grams = {}  # trigram -> ids
+        self._revision = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    # Index maintenance
+
+    def add(self, name, image=None, nickname=None):
+        """Index a fighter, replacing what was indexed under the same name"""
+        with self._lock:
+            self._add(name, image, nickname)
+
+    def _add(self, name, image, nickname):
+        fighter_id = self._ids.get(name)
+        if fighter_id is not None:
+            current = self._entries[fighter_id]
+            if current.image == image and current.nickname == nickname:
+                return
+            self._remove(fighter_id)
+        else:
+            fighter_id = self._ids[name] = self._next_id
+            self._next_id += 1
+        entry = self._entries[fighter_id] = _Entry(name, image, nickname)
+        for word in entry.folded_name.split():
+            self._names.add(word, fighter_id)
+        for word in entry.folded_nickname.split():
+            self._nicknames.add(word, fighter_id)
+        for gram in entry.grams:
+            self._grams.setdefault(gram, set()).add(fighter_id)
+
+    def _remove(self, fighter_id):
+        entry = self._entries.pop(fighter_id)
+        for word in entry.folded_name.split():
+            self._names.remove(word, fighter_id)
+        for word in entry.folded_nickname.split():
+            self._nicknames.remove(word, fighter_id)
+        for gram in entry.grams:
+            self._grams[gram].discard(fighter_id)
+
+    def _clear(self):
+        self._entries, self._ids, self._next_id = {}, {}, 0
+        self._names, self._nicknames, self._grams = _Trie(), _Trie(), {}
+
+    def refresh(self, force=False):
+        """Index fighters added or changed since the last refresh"""
+        from src.db import Fighter
+        from src.db_engine import get_engine
+
+        table = Fighter.__table__
+        with self._lock:
+            with get_engine().connect() as conn:
+                revision = tuple(conn.execute(
+                    select(func.count(table.c.name), func.max(table.c.last_updated))
+                ).one())
+                if force or self._revision is None or self._revision[1] is None or revision[0] < self._revision[0]:
+                    self._clear()
+                    query = select(table.c.name, table.c.image_url, table.c.nickname)
+                elif revision != self._revision:
+                    query = select(table.c.name, table.c.image_url, table.c.nickname).where(
+                        table.c.last_updated >= self._revision[1]
+                    )
+                else:
+                    query = None
+                if query is not None:
+                    for name, image, nickname in conn.execute(query):
+                        self._add(name, image, nickname)
+                if len(self._entries) != revision[0]:
+                    # The incremental fetch missed rows (e.g. last_updated set by hand)
+                    self._clear()
+                    for name, image, nickname in conn.execute(
+                        select(table.c.name, table.c.image_url, table.c.nickname)
+                    ):
+                        self._add(name, image, nickname)
+            self._revision = revision
+            self._next_check = time.monotonic() + self.refresh_seconds
+
+    def invalidate(self):
+        """Make the next search re-check the table (used after local writes)"""
+        self._next_check = 0.0
+
+    def _maybe_refresh(self):
+        if self._revision is None or time.monotonic() >= self._next_check:
+            self.refresh()
+
+    # Search
+
+    def _word_matches(self, trie, words):
+        """Ids where every query word prefixes some indexed word"""
+        matched = None
+        for word in words:
+            ids = trie.prefixed(word)
+            matched = set(ids) if matched is None else matched & ids
+            if not matched:
+                return set()
+        return matched or set()
+
+    def _fuzzy(self, folded):
+        """{id: Jaccard similarity of trigrams} for fighters above FUZZY_MIN_SIMILARITY"""
+        query_grams = trigrams(folded)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._grams.get(gram, ()))
+        scores = {}
+        for fighter_id, count in shared.items():
+            similarity = count / (len(query_grams) + len(self._entries[fighter_id].grams) - count)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                scores[fighter_id] = similarity
+        return scores
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """[{"name", "image", "nickname"}] best matches first"""
+        self._maybe_refresh()
+        folded = fold(query)
+        if not folded:
+            return []
+        words = folded.split()
+        with self._lock:
+            ranked = {}
+            for fighter_id in self._word_matches(self._names, words):
+                entry = self._entries[fighter_id]
+                if entry.folded_name == folded:
+                    tier = EXACT
+                elif entry.folded_name.startswith(folded):
+                    tier = NAME_PREFIX
+                else:
+                    tier = NAME_WORDS
+                ranked[fighter_id] = (tier, 0.0)
+            for fighter_id in self._word_matches(self._nicknames, words):
+                ranked.setdefault(fighter_id, (NICKNAME, 0.0))
+            if len(ranked) < limit:
+                for fighter_id, similarity in self._fuzzy(folded).items():
+                    ranked.setdefault(fighter_id, (FUZZY, -similarity))
+            entries = self._entries
+            best = sorted(
+                ranked,
+                key=lambda i: (ranked[i][0], ranked[i][1], len(entries[i].name), entries[i].name),
+            )[:limit]
+            return [
+                {"name": entries[i].name, "image": entries[i].image, "nickname": entries[i].nickname}
+                for i in best
+            ]
+
+
+_index = FighterSearchIndex()
+
+
+def get_fighter_search():
+    return _index
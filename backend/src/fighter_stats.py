@@ -0,0 +1,94 @@
+"""
+Immutable per-fighter stats used by the simulation, the ML model and the API.
+
+FighterStats carries only the columns those paths read, with physical
+attributes already numeric (see src/physical.py). Instances are plain values:
+they hold no session, can't go stale when a session closes, and are safe to
+share between threads and requests (the fighter store hands out the same
+instances to everyone).
+"""
+from sqlalchemy import select
+
+
+class FighterStats:
+    __slots__ = (
+        "name", "image_url", "stance", "dob",
+        "slpm", "str_acc", "str_def", "td_avg", "td_acc", "td_def", "sub_avg",
+        "height_in", "weight_lbs", "reach_in",
+    )
+
+    def __init__(self, name, image_url=None, stance=None, dob=None,
+                 slpm=None, str_acc=None, str_def=None, td_avg=None, td_acc=None, td_def=None, sub_avg=None,
+                 height_in=None, weight_lbs=None, reach_in=None):
+        _set = object.__setattr__
+        _set(self, "name", name)
+        _set(self, "image_url", image_url)
+        _set(self, "stance", stance)
+        _set(self, "dob", dob)
+        _set(self, "slpm", slpm)
+        _set(self, "str_acc", str_acc)
+        _set(self, "str_def", str_def)
+        _set(self, "td_avg", td_avg)
+        _set(self, "td_acc", td_acc)
+        _set(self, "td_def", td_def)
+        _set(self, "sub_avg", sub_avg)
+        _set(self, "height_in", height_in)
+        _set(self, "weight_lbs", weight_lbs)
+        _set(self, "reach_in", reach_in)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FighterStats is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("FighterStats is immutable")
+
+    @classmethod
+    def from_row(cls, row):
+        """From a result row of fighter_stats_query() (or any mapping with the same keys)"""
+        row = row._mapping if hasattr(row, "_mapping") else row
+        return cls(**{field: row[field] for field in cls.__slots__})
+
+    @classmethod
+    def from_dict(cls, data):
+        """From a loose dict such as the stored event JSON files; unknown keys are ignored"""
+        return cls(**{field: data.get(field) for field in cls.__slots__})
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def _values(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, FighterStats):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        return f"FighterStats(name={self.name!r}, slpm={self.slpm!r}, str_acc={self.str_acc!r})"
+
+    def __reduce__(self):
+        return (FighterStats, self._values())
+
+
+def fighter_stats_columns():
+    """The fighters table columns backing FighterStats, in field order"""
+    from src.db import Fighter
+    return [Fighter.__table__.c[field] for field in FighterStats.__slots__]
+
+
+def fighter_stats_query(names=None):
+    """Column-only select of FighterStats fields, optionally for some fighters"""
+    from src.db import Fighter
+    query = select(*fighter_stats_columns())
+    if names is not None:
+        query = query.where(Fighter.name.in_(list(names)))
+    return query
+
+
+def load_fighter_stats(db, names=None):
+    """{name: FighterStats} from one query on a session or connection"""
+    return {row.name: FighterStats.from_row(row) for row in db.execute(fighter_stats_query(names))}
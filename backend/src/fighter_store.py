@@ -0,0 +1,376 @@
+"""
+Read-only, in-process snapshot of the fighters table.
+
+All numeric stats are held as NumPy columns (struct of arrays, one float64
+column per stat, NaN for NULL) with a name -> row index dict, so a lookup is a
+dict hit plus a few array reads and never touches the database. Lookups return
+immutable FighterStats (src/fighter_stats.py) loaded by a column-only query.
+
+Loaded once (in the gunicorn master when preloading, so workers share it
+copy-on-write) and checked at most every FIGHTER_STORE_REFRESH_SECONDS against
+the table's row count and newest last_updated. When that moved, only rows with
+last_updated at or after the previous watermark are fetched and merged; a full
+reload happens only when rows disappeared.
+
+With FIGHTER_STORE_SNAPSHOT_DIR set, whichever process loads from the database
+publishes the numeric columns as a .npy file; other workers at the same
+revision memory-map it read-only instead of querying, so every worker shares one
+copy through the page cache. Fighters missing from the snapshot (e.g. just
+scraped by another worker) are read through from the DB.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+from sqlalchemy import func, select
+
+from src.fighter_stats import FighterStats, fighter_stats_columns, fighter_stats_query
+
+REFRESH_SECONDS_ENV = "FIGHTER_STORE_REFRESH_SECONDS"
+DEFAULT_REFRESH_SECONDS = 30
+SNAPSHOT_DIR_ENV = "FIGHTER_STORE_SNAPSHOT_DIR"
+SNAPSHOT_MANIFEST = "fighters.json"
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_DATE = date(1970, 1, 1)
+
+
+def _fighters_table():
+    from src.db import Fighter
+    return Fighter.__table__
+
+
+@lru_cache(maxsize=None)
+def _column_layout():
+    """(numeric fields, string fields) of FighterStats; dob is stored as a number"""
+    numeric, strings = [], []
+    for column in fighter_stats_columns():
+        python_type = column.type.python_type
+        if python_type in (float, int, date, datetime):
+            numeric.append(column.name)
+        else:
+            strings.append(column.name)
+    return tuple(numeric), tuple(strings)
+
+
+def _encode(value):
+    if value is None:
+        return np.nan
+    if isinstance(value, datetime):
+        return (value - _EPOCH).total_seconds()
+    if isinstance(value, date):
+        return float((value - _EPOCH_DATE).days)
+    return float(value)
+
+
+@lru_cache(maxsize=None)
+def _decoder(column):
+    """Inverse of _encode for a numeric column (None when the float is the value)"""
+    python_type = _fighters_table().columns[column].type.python_type
+    if python_type is datetime:
+        return lambda v: _EPOCH + timedelta(seconds=float(v))
+    if python_type is date:
+        return lambda v: _EPOCH_DATE + timedelta(days=int(v))
+    if python_type is int:
+        return int
+    return None
+
+
+def _revision_key(revision):
+    count, newest = revision
+    return [count, newest.isoformat() if newest else None]
+
+
+class _Snapshot:
+    """One immutable version of the table; the store swaps whole snapshots"""
+    __slots__ = ("numeric", "columns", "strings", "index", "listing", "listing_tag", "revision", "decoders", "records")
+
+    def __init__(self, numeric, columns, strings, revision):
+        self.numeric = numeric  # (rows, columns) float64, column-major so each column is contiguous
+        self.columns = columns  # numeric column name -> position
+        self.strings = strings  # string column name -> list
+        self.index = {name: i for i, name in enumerate(strings["name"])}
+        self.listing = [
+            {"name": name, "image": image}
+            for name, image in sorted(zip(strings["name"], strings["image_url"]))
+        ]
+        # Content hash of the listing, used as its ETag
+        self.listing_tag = hashlib.sha1(
+            json.dumps(self.listing, separators=(",", ":")).encode("utf-8")
+        ).hexdigest()[:20]
+        self.revision = revision
+        # (column, decoder) in numeric column order; None for plain floats
+        self.decoders = [(column, _decoder(column)) for column in sorted(columns, key=columns.get)]
+        self.records = {}
+
+    @classmethod
+    def from_rows(cls, rows, revision):
+        numeric_names, string_names = _column_layout()
+        numeric = np.empty((len(rows), len(numeric_names)), dtype=np.float64, order="F")
+        for j, column in enumerate(numeric_names):
+            numeric[:, j] = [_encode(row[column]) for row in rows]
+        strings = {column: [row[column] for row in rows] for column in string_names}
+        return cls(numeric, {c: j for j, c in enumerate(numeric_names)}, strings, revision)
+
+    def merge(self, rows, revision):
+        """New snapshot with rows (changed or new fighters) applied on top of this one"""
+        update = _Snapshot.from_rows(rows, revision)
+        numeric = np.array(self.numeric, order="F")
+        strings = {column: list(values) for column, values in self.strings.items()}
+        new_rows = []
+        for i, name in enumerate(update.strings["name"]):
+            position = self.index.get(name)
+            if position is None:
+                new_rows.append(i)
+                continue
+            numeric[position] = update.numeric[i]
+            for column, values in strings.items():
+                values[position] = update.strings[column][i]
+        if new_rows:
+            numeric = np.asfortranarray(np.vstack([numeric, update.numeric[new_rows]]))
+            for column, values in strings.items():
+                values.extend(update.strings[column][i] for i in new_rows)
+        return _Snapshot(numeric, self.columns, strings, revision)
+
+    def record(self, position):
+        """FighterStats for one row (built once per snapshot, then shared)"""
+        record = self.records.get(position)
+        if record is None:
+            record = self.records[position] = self._materialize(position)
+        return record
+
+    def _materialize(self, position):
+        values = {column: column_values[position] for column, column_values in self.strings.items()}
+        for (column, decode), value in zip(self.decoders, self.numeric[position].tolist()):
+            if value != value:  # NaN
+                values[column] = None
+            else:
+                values[column] = decode(value) if decode else value
+        return FighterStats(**values)
+
+
+class FighterStore:
+    def __init__(self, refresh_seconds=None, snapshot_dir=None):
+        if refresh_seconds is None:
+            refresh_seconds = float(os.getenv(REFRESH_SECONDS_ENV, DEFAULT_REFRESH_SECONDS))
+        self.refresh_seconds = refresh_seconds
+        self.snapshot_dir = snapshot_dir if snapshot_dir is not None else os.getenv(SNAPSHOT_DIR_ENV)
+        self._snapshot = None
+        self._extra = {}  # Read-through records for fighters newer than the snapshot
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    # Refresh planning shared by the sync and async paths
+
+    def _revision_query(self):
+        table = _fighters_table()
+        return select(func.count(table.c.name), func.max(table.c.last_updated))
+
+    def _plan(self, revision, force):
+        """What to do for a table revision: None, "snapshot", "incremental" or "full" (with its query)"""
+        current = self._snapshot
+        if not force and current is not None and current.revision == revision:
+            return None, None
+        if self._published_revision() == _revision_key(revision):
+            return "snapshot", None
+        table = _fighters_table()
+        watermark = current.revision[1] if current is not None else None
+        if force or watermark is None or revision[0] < current.revision[0]:
+            return "full", fighter_stats_query()
+        return "incremental", fighter_stats_query().where(table.c.last_updated >= watermark)
+
+    def _apply(self, mode, rows, revision):
+        """Swap in the new snapshot; returns False if an incremental merge didn't add up"""
+        if mode == "snapshot":
+            snapshot = self._load_published(revision)
+            if snapshot is None:
+                return False
+        elif mode == "incremental":
+            snapshot = self._snapshot.merge(rows, revision)
+            if len(snapshot.index) != revision[0]:
+                return False
+        else:
+            snapshot = _Snapshot.from_rows(rows, revision)
+        # Swap whole objects so concurrent readers never see a half-built snapshot
+        self._snapshot = snapshot
+        self._extra = {}
+        if mode != "snapshot":
+            self._publish(snapshot)
+        return True
+
+    def refresh(self, force=False):
+        """Bring the snapshot up to date with the fighters table"""
+        from src.db_engine import get_engine
+
+        with self._lock:
+            with get_engine().connect() as conn:
+                revision = tuple(conn.execute(self._revision_query()).one())
+                mode, query = self._plan(revision, force)
+                if mode is not None:
+                    rows = conn.execute(query).mappings().all() if query is not None else None
+                    if not self._apply(mode, rows, revision):
+                        rows = conn.execute(fighter_stats_query()).mappings().all()
+                        self._apply("full", rows, revision)
+            self._next_check = time.monotonic() + self.refresh_seconds
+
+    async def arefresh(self, force=False):
+        """refresh() through the async engine, without blocking the event loop"""
+        from src.db_async import get_async_engine
+
+        # Claim the check up front so concurrent requests don't all query the revision
+        self._next_check = time.monotonic() + self.refresh_seconds
+        async with get_async_engine().connect() as conn:
+            revision = tuple((await conn.execute(self._revision_query())).one())
+            mode, query = self._plan(revision, force)
+            if mode is not None:
+                rows = (await conn.execute(query)).mappings().all() if query is not None else None
+                if not self._apply(mode, rows, revision):
+                    rows = (await conn.execute(fighter_stats_query())).mappings().all()
+                    self._apply("full", rows, revision)
+
+    def _needs_refresh(self):
+        return self._snapshot is None or time.monotonic() >= self._next_check
+
+    def _maybe_refresh(self):
+        if self._needs_refresh():
+            self.refresh()
+
+    # Memory-mapped snapshot shared between workers
+
+    def _published_revision(self):
+        if not self.snapshot_dir:
+            return None
+        try:
+            with open(os.path.join(self.snapshot_dir, SNAPSHOT_MANIFEST)) as f:
+                return json.load(f)["revision"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _publish(self, snapshot):
+        if not self.snapshot_dir:
+            return
+        try:
+            os.makedirs(self.snapshot_dir, exist_ok=True)
+            token = f"{os.getpid()}-{time.time_ns()}"
+            array_name = f"fighters-{token}.npy"
+            np.save(os.path.join(self.snapshot_dir, array_name), snapshot.numeric)
+            manifest = {
+                "revision": _revision_key(snapshot.revision),
+                "array": array_name,
+                "columns": snapshot.columns,
+                "strings": snapshot.strings,
+            }
+            fd, tmp_path = tempfile.mkstemp(dir=self.snapshot_dir, suffix=".json.tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(manifest, f)
+            os.replace(tmp_path, os.path.join(self.snapshot_dir, SNAPSHOT_MANIFEST))
+            # Arrays still mapped by other workers stay valid after unlinking
+            for name in os.listdir(self.snapshot_dir):
+                if name.startswith("fighters-") and name.endswith(".npy") and name != array_name:
+                    os.remove(os.path.join(self.snapshot_dir, name))
+        except OSError as e:
+            print(f"Could not publish fighter snapshot: {e}")
+
+    def _load_published(self, revision):
+        try:
+            with open(os.path.join(self.snapshot_dir, SNAPSHOT_MANIFEST)) as f:
+                manifest = json.load(f)
+            numeric_names, string_names = _column_layout()
+            if (manifest["revision"] != _revision_key(revision)
+                    or list(manifest["columns"]) != list(numeric_names)
+                    or list(manifest["strings"]) != list(string_names)):
+                return None
+            numeric = np.load(os.path.join(self.snapshot_dir, manifest["array"]), mmap_mode="r")
+        except (OSError, ValueError, KeyError):
+            return None
+        return _Snapshot(numeric, manifest["columns"], manifest["strings"], revision)
+
+    # Lookups
+
+    def get(self, name):
+        """FighterStats by exact name, or None"""
+        self._maybe_refresh()
+        snapshot = self._snapshot
+        position = snapshot.index.get(name)
+        if position is not None:
+            return snapshot.record(position)
+        record = self._extra.get(name)
+        if record is None:
+            record = self._read_through(name)
+        return record
+
+    def _read_through(self, name):
+        from src.db_engine import get_engine
+
+        with get_engine().connect() as conn:
+            row = conn.execute(fighter_stats_query([name])).first()
+        if row is None:
+            return None
+        record = FighterStats.from_row(row)
+        self._extra[name] = record
+        return record
+
+    async def aget(self, name):
+        """get() for async endpoints"""
+        if self._needs_refresh():
+            await self.arefresh()
+        snapshot = self._snapshot
+        position = snapshot.index.get(name)
+        if position is not None:
+            return snapshot.record(position)
+        record = self._extra.get(name)
+        if record is None:
+            from src.db_async import get_async_engine
+
+            async with get_async_engine().connect() as conn:
+                row = (await conn.execute(fighter_stats_query([name]))).first()
+            if row is None:
+                return None
+            record = FighterStats.from_row(row)
+            self._extra[name] = record
+        return record
+
+    def index_of(self, name):
+        """Row of a fighter in column() arrays, or None"""
+        self._maybe_refresh()
+        return self._snapshot.index.get(name)
+
+    def column(self, name):
+        """Read-only float64 array of one numeric column (NaN for NULL), indexed by index_of()"""
+        self._maybe_refresh()
+        snapshot = self._snapshot
+        return snapshot.numeric[:, snapshot.columns[name]]
+
+    def invalidate(self, name):
+        """Make the next lookup re-check the table (used after local writes)"""
+        self._extra.pop(name, None)
+        self._next_check = 0.0
+
+    def listing(self):
+        """[{"name", "image"}] for every fighter, sorted by name"""
+        self._maybe_refresh()
+        return self._snapshot.listing
+
+    async def alisting(self):
+        """listing() for async endpoints"""
+        return (await self.atagged_listing())[1]
+
+    async def atagged_listing(self):
+        """(content hash, listing) of the same snapshot"""
+        if self._needs_refresh():
+            await self.arefresh()
+        snapshot = self._snapshot
+        return snapshot.listing_tag, snapshot.listing
+
+
+_store = FighterStore()
+
+
+def get_fighter_store():
+    return _store
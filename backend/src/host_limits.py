@@ -0,0 +1,34 @@
+"""
+Per-host concurrency limits for scraping in parallel.
+
+Callers fan out over a thread pool but take a slot for the host they are about
+to hit, so ufcstats.com and ufc.com each see at most SCRAPE_HOST_CONCURRENCY
+requests at a time no matter how many threads are scraping.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+HOST_CONCURRENCY_ENV = "SCRAPE_HOST_CONCURRENCY"
+DEFAULT_HOST_CONCURRENCY = 4
+
+_slots = {}
+_lock = threading.Lock()
+
+
+def _semaphore(host):
+    with _lock:
+        semaphore = _slots.get(host)
+        if semaphore is None:
+            limit = max(int(os.getenv(HOST_CONCURRENCY_ENV, DEFAULT_HOST_CONCURRENCY)), 1)
+            semaphore = _slots[host] = threading.BoundedSemaphore(limit)
+        return semaphore
+
+
+@contextmanager
+def host_slot(url):
+    """Hold one of the host's request slots for the duration of the block"""
+    host = (urlsplit(url).hostname or url).removeprefix("www.")
+    with _semaphore(host):
+        yield
@@ -0,0 +1,180 @@
+"""
+HTTP caching for the read-heavy GET endpoints (ETag, If-None-Match, Cache-Control).
+
+ResponseCacheMiddleware is pure ASGI, like startup_timeline.FirstRequestMiddleware.
+For each endpoint in POLICIES it adds a strong ETag and that endpoint's
+Cache-Control header to successful responses, and answers a matching
+If-None-Match with 304 Not Modified.
+
+Where the inputs of a response are cheap to identify, a validator computes its
+version before the endpoint runs, and a match skips the endpoint entirely. A
+validator returns None when the response must not be cached at all:
+
+- /fighters: the fighter snapshot's content hash;
+- /simulate-event/{id}: the event card hash, the served model's fingerprint
+  and the stats of every fighter on the card; None while any of them is
+  missing, so the next request retries the scrape.
+
+Other endpoints (/events, /model-performance) are already served from caches
+or counters, so their ETag is a hash of the body. Bodies carrying an error
+anywhere (a top-level {"error": ...} or a failed bout on a card) are never
+given caching headers.
+"""
+import hashlib
+import json
+import logging
+import re
+from urllib.parse import parse_qs
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+logger = logging.getLogger(__name__)
+
+
+class CachePolicy:
+    """Caching rules for one path pattern; validator(match, query) returns a version string, or None to not cache"""
+
+    def __init__(self, pattern, cache_control, validator=None):
+        self.pattern = re.compile(pattern)
+        self.cache_control = cache_control
+        self.validator = validator
+
+
+def _digest(*parts):
+    return hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8")).hexdigest()[:32]
+
+
+def has_error(body):
+    """True if a JSON body has an "error" key at any depth.
+
+    Inside a JSON string the quotes around a literal "error" are escaped, so
+    the unescaped form can only be an object key.
+    """
+    return b'"error":' in body
+
+
+def etag_matches(if_none_match, etag):
+    """True if an If-None-Match header value already names etag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+
+
+async def _fighters_version(match, query):
+    from src.fighter_store import get_fighter_store
+
+    tag, _ = await get_fighter_store().atagged_listing()
+    return tag
+
+
+def _event_card_version_sync(event_id, model):
+    from src.fighter_store import get_fighter_store
+    from src.ufc_scraper import get_cached_event_page
+
+    page = get_cached_event_page(f"http://ufcstats.com/event-details/{event_id}")
+    store = get_fighter_store()
+    card = []
+    for fight in page["fights"]:
+        for name in (fight["fighter_a"], fight["fighter_b"]):
+            stats = store.get(name)
+            if stats is None:
+                # The endpoint scrapes missing fighters; if that fails the bout
+                # errors, and neither outcome should be cached under this card
+                return None
+            card.append([name, stats.to_dict()])
+    parts = [page["title"], json.dumps(card, default=str, sort_keys=True)]
+    if model != "sim":
+        from src.ml.model_registry import get_registry
+
+        parts.append(get_registry().fingerprint())
+    return _digest(*parts)
+
+
+async def _event_card_version(match, query):
+    model = query.get("model", ["ensemble"])[0]
+    return await run_in_threadpool(_event_card_version_sync, match["event_id"], model)
+
+
+POLICIES = [
+    CachePolicy(r"/fighters", "public, max-age=300", _fighters_version),
+    CachePolicy(r"/events", "public, max-age=60, stale-while-revalidate=300"),
+    CachePolicy(r"/simulate-event/(?P<event_id>[^/]+)", "public, max-age=300", _event_card_version),
+    CachePolicy(r"/model-performance", "public, max-age=30"),
+]
+
+
+class ResponseCacheMiddleware:
+    def __init__(self, app, policies=None):
+        self.app = app
+        self.policies = POLICIES if policies is None else policies
+
+    def _policy(self, path):
+        for policy in self.policies:
+            match = policy.pattern.fullmatch(path)
+            if match:
+                return policy, match
+        return None, None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+        policy, match = self._policy(scope["path"])
+        if policy is None:
+            return await self.app(scope, receive, send)
+
+        raw_query = scope.get("query_string", b"").decode("latin-1")
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        etag = None
+        if policy.validator is not None:
+            try:
+                version = await policy.validator(match, parse_qs(raw_query))
+            except Exception as e:
+                # Fall back to hashing whatever the endpoint returns
+                logger.warning(f"Cache validator for {scope['path']} failed: {e}")
+            else:
+                if version is None:
+                    return await self.app(scope, receive, send)
+                etag = f'"{_digest(scope["path"], raw_query, version)}"'
+            if etag is not None and etag_matches(if_none_match, etag):
+                return await self._not_modified(send, etag, policy)
+
+        # Buffer the (small, JSON) response so the headers can depend on its body
+        start = None
+        chunks = []
+
+        async def buffer(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            else:
+                await send(message)
+
+        await self.app(scope, receive, buffer)
+        body = b"".join(chunks)
+
+        if start["status"] == 200 and not has_error(body):
+            if etag is None:
+                etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+            if etag_matches(if_none_match, etag):
+                return await self._not_modified(send, etag, policy)
+            headers = MutableHeaders(scope=start)
+            headers["ETag"] = etag
+            headers["Cache-Control"] = policy.cache_control
+        await send(start)
+        await send({"type": "http.response.body", "body": body})
+
+    async def _not_modified(self, send, etag, policy):
+        await send({
+            "type": "http.response.start",
+            "status": 304,
+            "headers": [
+                (b"etag", etag.encode("latin-1")),
+                (b"cache-control", policy.cache_control.encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": b""})
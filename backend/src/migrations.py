@@ -0,0 +1,287 @@
+"""
+Minimal schema migrations for existing SQLite and Postgres databases.
+
+Base.metadata.create_all only creates missing tables; it never adds columns or
+indexes to tables that already exist. Each migration below is applied once and
+recorded in the schema_migrations table. Migrations must be idempotent (IF NOT
+EXISTS, checkfirst) so a fresh database, where create_all already built the
+final schema, just records them.
+"""
+import logging
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, bindparam, inspect, select, text
+from sqlalchemy.exc import IntegrityError
+
+logger = logging.getLogger(__name__)
+
+_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    _metadata,
+    Column("version", String, primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Serializes concurrent startups (several gunicorn workers) on Postgres
+PG_ADVISORY_LOCK_ID = 732_154_001
+
+
+def _create_indexes(conn, table, names):
+    """Create the named indexes declared on a model's table (compiled for the current dialect)"""
+    for index in table.indexes:
+        if index.name in names:
+            index.create(conn, checkfirst=True)
+
+
+def _dedupe_prediction_pair_keys(conn):
+    """
+    Set every model_predictions.pair_key to what make_pair_key computes, keeping
+    one prediction per (pair_key, model): resolved predictions win over pending
+    ones, then the newest row. The others are moved to the prediction archive
+    (reason "duplicate") rather than deleted.
+
+    Keys are computed in Python because SQL string comparison follows the
+    database collation, which can order names differently from sorted().
+    """
+    from src.db import PredictionArchiveBatch, make_pair_key
+    from src.prediction_archive import ARCHIVE_BATCH_SIZE, _batch_values
+
+    # Reflected, since later migrations add columns the model already declares
+    table = Table("model_predictions", MetaData(), autoload_with=conn)
+    columns = [column.name for column in table.columns]
+
+    groups = {}
+    rekeyed = {}
+    for id_, fighter_a, fighter_b, model, actual_winner, pair_key in conn.execute(select(
+        table.c.id, table.c.fighter_a, table.c.fighter_b, table.c.model, table.c.actual_winner, table.c.pair_key
+    )):
+        key = make_pair_key(fighter_a, fighter_b)
+        if key != pair_key:
+            rekeyed[id_] = key
+        groups.setdefault((key, model), []).append((actual_winner is not None, id_))
+
+    losers = sorted(id_ for ranked in groups.values() for _, id_ in sorted(ranked)[:-1])
+    now = datetime.utcnow()
+    for start in range(0, len(losers), ARCHIVE_BATCH_SIZE):
+        ids = losers[start:start + ARCHIVE_BATCH_SIZE]
+        rows = conn.execute(select(table).where(table.c.id.in_(ids)).order_by(table.c.id)).mappings().all()
+        conn.execute(PredictionArchiveBatch.__table__.insert().values(
+            **_batch_values(rows, columns, "duplicate", now)
+        ))
+        conn.execute(table.delete().where(table.c.id.in_(ids)))
+    if losers:
+        logger.warning(f"Archived {len(losers)} duplicate predictions while rebuilding pair keys")
+
+    # Losers are gone, so no survivor's new key can collide with another row
+    dropped = set(losers)
+    updates = [{"row_id": id_, "key": key} for id_, key in rekeyed.items() if id_ not in dropped]
+    if updates:
+        conn.execute(
+            table.update().where(table.c.id == bindparam("row_id")).values(pair_key=bindparam("key")),
+            updates,
+        )
+
+
+def _0001_prediction_pair_key(conn):
+    """
+    Add and backfill model_predictions.pair_key, archiving duplicate matchups so
+    the unique (pair_key, model) index can be built.
+    """
+    _add_column(conn, "model_predictions", "pair_key")
+    _dedupe_prediction_pair_keys(conn)
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_prediction_pair_model ON model_predictions (pair_key, model)"
+    ))
+
+
+def _0002_query_indexes(conn):
+    """Composite/partial indexes for the hot prediction and fight result filters"""
+    from src.db import FightResult, ModelPrediction
+
+    _create_indexes(conn, ModelPrediction.__table__, {
+        "ix_predictions_fighters_model", "ix_predictions_pending",
+        "ix_predictions_timestamp", "ix_predictions_resolved",
+    })
+    _create_indexes(conn, FightResult.__table__, {"ix_fight_results_event"})
+    # Superseded by uq_fight_results_bout in 0003, so no longer declared on the model
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_fight_results_pair ON fight_results (fighter_name, opponent_name)"
+    ))
+
+
+def _0003_fight_results_natural_key(conn):
+    """
+    Make (fighter_name, opponent_name, event) unique, keeping the newest row of any
+    duplicates, and let ids come from the database instead of max(id) + 1.
+    """
+    from src.db import FightResult
+
+    conn.execute(text("""
+        DELETE FROM fight_results
+        WHERE event IS NOT NULL AND EXISTS (
+            SELECT 1 FROM fight_results newer
+            WHERE newer.fighter_name = fight_results.fighter_name
+              AND newer.opponent_name = fight_results.opponent_name
+              AND newer.event = fight_results.event
+              AND newer.id > fight_results.id
+        )
+    """))
+    _create_indexes(conn, FightResult.__table__, {"uq_fight_results_bout"})
+    # The unique index's (fighter_name, opponent_name) prefix replaces it
+    conn.execute(text("DROP INDEX IF EXISTS ix_fight_results_pair"))
+
+    if conn.dialect.name == "postgresql":
+        # Rows written with explicit max(id) + 1 ids left the sequence behind (or the
+        # table was imported without one); point it past the current maximum
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence('fight_results', 'id')")).scalar()
+        if sequence is None:
+            sequence = "fight_results_id_seq"
+            conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {sequence} OWNED BY fight_results.id"))
+            conn.execute(text(f"ALTER TABLE fight_results ALTER COLUMN id SET DEFAULT nextval('{sequence}')"))
+        conn.execute(
+            text("SELECT setval(:seq, COALESCE((SELECT MAX(id) FROM fight_results), 0) + 1, false)"),
+            {"seq": sequence},
+        )
+
+
+def _add_column(conn, table, column, type_="VARCHAR"):
+    if column not in {c["name"] for c in inspect(conn).get_columns(table)}:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {type_}"))
+
+
+def _0004_normalized_names(conn):
+    """Add and backfill model_predictions.pair_norm (normalized in Python)"""
+    from src.db import ModelPrediction
+    from src.names import make_norm_pair
+
+    _add_column(conn, "model_predictions", "pair_norm")
+
+    predictions = conn.execute(
+        text("SELECT id, fighter_a, fighter_b FROM model_predictions WHERE pair_norm IS NULL")
+    ).all()
+    if predictions:
+        conn.execute(
+            text("UPDATE model_predictions SET pair_norm = :norm WHERE id = :id"),
+            [{"id": id_, "norm": make_norm_pair(a, b)} for id_, a, b in predictions],
+        )
+
+    _create_indexes(conn, ModelPrediction.__table__, {"ix_predictions_pair_norm"})
+
+
+def _0005_numeric_physical_attributes(conn):
+    """Add fighters.height_in/weight_lbs/reach_in and backfill them from the display strings"""
+    from src.physical import parse_physical
+
+    for column in ("height_in", "weight_lbs", "reach_in"):
+        _add_column(conn, "fighters", column, "FLOAT")
+
+    fighters = conn.execute(text(
+        "SELECT name, height, weight, reach FROM fighters "
+        "WHERE height_in IS NULL AND weight_lbs IS NULL AND reach_in IS NULL"
+    )).all()
+    rows = [
+        {"name": name, **parse_physical(height, weight, reach)}
+        for name, height, weight, reach in fighters
+    ]
+    rows = [r for r in rows if any(r[c] is not None for c in ("height_in", "weight_lbs", "reach_in"))]
+    if rows:
+        conn.execute(
+            text("UPDATE fighters SET height_in = :height_in, weight_lbs = :weight_lbs, reach_in = :reach_in "
+                 "WHERE name = :name"),
+            rows,
+        )
+
+
+def _0006_model_performance_stats(conn):
+    """Backfill model_performance_stats (created by create_all) from the predictions resolved so far"""
+    from src.model_performance import rebuild_model_performance_stats
+
+    rebuild_model_performance_stats(conn)
+
+
+def _0007_prediction_keyset_index(conn):
+    """(timestamp, id) index for the keyset-paginated predictions list"""
+    from src.db import ModelPrediction
+
+    _create_indexes(conn, ModelPrediction.__table__, {"ix_predictions_timestamp_id"})
+
+
+def _0008_fighter_nickname(conn):
+    """Add fighters.nickname (filled in as profiles are re-scraped)"""
+    _add_column(conn, "fighters", "nickname")
+
+
+def _0009_fight_results_updated_at(conn):
+    """Add fight_results.updated_at (NULL for rows written before it existed)"""
+    from src.db import FightResult
+
+    _add_column(conn, "fight_results", "updated_at", "TIMESTAMP")
+    _create_indexes(conn, FightResult.__table__, {"ix_fight_results_updated_at"})
+
+
+def _0010_python_pair_keys(conn):
+    """
+    Recompute pair keys that 0001 backfilled in SQL. On Postgres its comparison
+    followed the database collation, so some keys differ from make_pair_key's.
+    """
+    _dedupe_prediction_pair_keys(conn)
+
+
+def _0011_prediction_timestamps(conn):
+    """Backfill NULL model_predictions.timestamp, which the (timestamp, id) keyset can never reach"""
+    from src.db import UNKNOWN_PREDICTION_TIMESTAMP, ModelPrediction
+
+    # Through the DateTime column type, so SQLite stores it in the format the keyset compares against
+    table = ModelPrediction.__table__
+    count = conn.execute(
+        table.update().where(table.c.timestamp.is_(None)).values(timestamp=UNKNOWN_PREDICTION_TIMESTAMP)
+    ).rowcount
+    if count:
+        logger.info(f"Backfilled {count} predictions without a timestamp")
+
+
+# (version, migration) in the order they must run; never reorder or rename
+MIGRATIONS = [
+    ("0001_prediction_pair_key", _0001_prediction_pair_key),
+    ("0002_query_indexes", _0002_query_indexes),
+    ("0003_fight_results_natural_key", _0003_fight_results_natural_key),
+    ("0004_normalized_names", _0004_normalized_names),
+    ("0005_numeric_physical_attributes", _0005_numeric_physical_attributes),
+    ("0006_model_performance_stats", _0006_model_performance_stats),
+    ("0007_prediction_keyset_index", _0007_prediction_keyset_index),
+    ("0008_fighter_nickname", _0008_fighter_nickname),
+    ("0009_fight_results_updated_at", _0009_fight_results_updated_at),
+    ("0010_python_pair_keys", _0010_python_pair_keys),
+    ("0011_prediction_timestamps", _0011_prediction_timestamps),
+]
+
+
+def applied_migrations(bind):
+    _metadata.create_all(bind=bind)
+    with bind.connect() as conn:
+        return {row.version for row in conn.execute(select(schema_migrations.c.version))}
+
+
+def run_migrations(bind):
+    """Apply pending migrations, each in its own transaction. Returns the versions applied."""
+    _metadata.create_all(bind=bind)
+    applied = []
+    for version, migrate in MIGRATIONS:
+        try:
+            with bind.begin() as conn:
+                if bind.dialect.name == "postgresql":
+                    conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": PG_ADVISORY_LOCK_ID})
+                done = conn.execute(
+                    select(schema_migrations.c.version).where(schema_migrations.c.version == version)
+                ).first()
+                if done:
+                    continue
+                logger.info(f"Applying schema migration {version}")
+                migrate(conn)
+                conn.execute(schema_migrations.insert().values(version=version, applied_at=datetime.utcnow()))
+                applied.append(version)
+        except IntegrityError:
+            # Another process recorded the same migration first (SQLite has no advisory lock)
+            logger.info(f"Schema migration {version} was applied concurrently")
+    return applied
@@ -0,0 +1,26 @@
+import numpy as np
+
+
+class OOFCalibratedClassifier:
+    """
+    Binary classifier fitted on the full dataset with an isotonic calibrator
+    learned from out-of-fold probabilities.
+
+    Exposes the subset of the sklearn classifier API used by ml_predict
+    (predict_proba, predict, classes_, feature_names_in_).
+    """
+
+    def __init__(self, estimator, calibrator):
+        self.estimator = estimator
+        self.calibrator = calibrator
+        self.classes_ = getattr(estimator, "classes_", np.array([0, 1]))
+        if hasattr(estimator, "feature_names_in_"):
+            self.feature_names_in_ = estimator.feature_names_in_
+
+    def predict_proba(self, X):
+        raw = self.estimator.predict_proba(X)[:, 1]
+        calibrated = np.clip(self.calibrator.predict(raw), 0.0, 1.0)
+        return np.column_stack([1.0 - calibrated, calibrated])
+
+    def predict(self, X):
+        return self.classes_[(self.predict_proba(X)[:, 1] >= 0.5).astype(int)]
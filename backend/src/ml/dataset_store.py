@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from src.azure_config import get_dataset_dir, get_dataset_path
+
+FEATURES_FILE = "features.npy"
+LABELS_FILE = "labels.npy"
+ROW_IDS_FILE = "row_ids.npy"
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+
+
+def _hash_arrays(columns, X, y):
+    digest = hashlib.sha256()
+    digest.update(",".join(columns).encode("utf-8"))
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()
+
+
+def _atomic_save_npy(path, array):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def save_dataset(df, directory=None, label_column="label", id_column=None, extra=None):
+    """
+    Write a feature DataFrame as a typed columnar artifact:
+
+        features.npy  - float32 feature matrix (rows x features), memory-mappable
+        labels.npy    - int8 label vector
+        row_ids.npy   - int64 source row ids (only when id_column is given)
+        manifest.json - column names, shape, a content hash of the arrays and
+                        any `extra` metadata (e.g. an incremental-build watermark)
+
+    Returns the manifest dict.
+    """
+    if directory is None:
+        directory = get_dataset_dir()
+    os.makedirs(directory, exist_ok=True)
+
+    columns = [str(c) for c in df.columns if c not in (label_column, id_column)]
+    X = np.ascontiguousarray(df[columns].to_numpy(dtype=np.float32))
+    X += 0.0  # Fold -0.0 into 0.0 so equal datasets hash equally
+    y = df[label_column].to_numpy(dtype=np.int8)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "columns": columns,
+        "label": label_column,
+        "rows": int(X.shape[0]),
+        "dtype": "float32",
+        "sha256": _hash_arrays(columns, X, y),
+        "created_at": datetime.utcnow().isoformat(),
+        **(extra or {}),
+    }
+
+    _atomic_save_npy(os.path.join(directory, FEATURES_FILE), X)
+    _atomic_save_npy(os.path.join(directory, LABELS_FILE), y)
+    if id_column is not None:
+        _atomic_save_npy(os.path.join(directory, ROW_IDS_FILE), df[id_column].to_numpy(dtype=np.int64))
+
+    # Manifest goes last so readers never see a manifest describing missing arrays
+    manifest_path = os.path.join(directory, MANIFEST_FILE)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    return manifest
+
+
+def load_manifest(directory=None):
+    if directory is None:
+        directory = get_dataset_dir()
+    with open(os.path.join(directory, MANIFEST_FILE), "r") as f:
+        return json.load(f)
+
+
+def load_dataset(directory=None, mmap=True):
+    """
+    Load (X, y, manifest) from a columnar dataset directory.
+
+    With mmap=True the feature matrix is a read-only np.memmap, so loading is
+    O(1) regardless of dataset size and pages are read on demand.
+    """
+    if directory is None:
+        directory = get_dataset_dir()
+    manifest = load_manifest(directory)
+    mmap_mode = "r" if mmap else None
+    X = np.load(os.path.join(directory, FEATURES_FILE), mmap_mode=mmap_mode)
+    y = np.load(os.path.join(directory, LABELS_FILE), mmap_mode=mmap_mode)
+
+    if X.shape != (manifest["rows"], len(manifest["columns"])) or y.shape[0] != manifest["rows"]:
+        raise ValueError(f"Dataset at {directory} does not match its manifest (rebuild it with build_dataset)")
+    return X, y, manifest
+
+
+def load_row_ids(directory=None):
+    """Source row ids aligned with the feature matrix, or None if the dataset has none"""
+    if directory is None:
+        directory = get_dataset_dir()
+    path = os.path.join(directory, ROW_IDS_FILE)
+    return np.load(path) if os.path.exists(path) else None
+
+
+def load_dataset_frame(directory=None, mmap=True):
+    """Load (X DataFrame, y Series, manifest) backed by the memory-mapped arrays without copying"""
+    X, y, manifest = load_dataset(directory, mmap=mmap)
+    X_df = pd.DataFrame(X, columns=manifest["columns"], copy=False)
+    y_series = pd.Series(y, name=manifest["label"], copy=False)
+    return X_df, y_series, manifest
+
+
+def export_csv(directory=None, csv_path=None):
+    """Export a columnar dataset to CSV (same layout build_dataset used to write)"""
+    if csv_path is None:
+        csv_path = get_dataset_path()
+    X_df, y, _ = load_dataset_frame(directory)
+    df = X_df.copy()
+    df[y.name] = y
+    df.to_csv(csv_path, index=False)
+    print(f"Dataset exported to {csv_path}")
+    return csv_path
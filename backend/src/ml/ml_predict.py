@@ -1,81 +1,60 @@
 import pandas as pd
 import numpy as np
-import joblib
-import os
-from src.azure_config import get_model_path
+from src.fighter_store import get_fighter_store
+from src.ml.model_registry import get_registry
 
 def load_model():
-    """Load the ML model with Azure-compatible path"""
-    model_path = get_model_path()
-    try:
-        return joblib.load(model_path)
-    except FileNotFoundError:
-        # Fallback to local path for development
-        if os.path.exists("src/ml/fight_predictor.pkl"):
-            return joblib.load("src/ml/fight_predictor.pkl")
-        else:
-            raise FileNotFoundError(f"Model not found at {model_path} or src/ml/fight_predictor.pkl")
-
-# Load model on import
-model = load_model()
-
-def predict_fight_outcome(name_a, name_b):
-    from src.db import SessionLocal, Fighter
-
-    # Reload model in case it was retrained
-    global model
-    model = load_model()
+    """Return the served model; the registry hot-swaps it when a new version is promoted"""
+    return get_registry().get_model()
+
+def safe(val):
+    return float(val) if val is not None else 0.0
+
+def compute_age(dob):
+    if not dob:
+        return 0
+    from datetime import date
+    today = date.today()
+    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
+
+def compute_mismatch_penalty(weight_diff, height_diff, reach_diff):
+    """Returns a penalty score between 0 and 1 based on mismatch severity."""
+    abs_w = abs(weight_diff)
+    abs_h = abs(height_diff)
+    abs_r = abs(reach_diff)
+
+    mismatch_score = (
+        (abs_w / 100) * 0.5 +   # weight → up to 0.5
+        (abs_h / 10) * 0.3 +    # height → up to 0.3
+        (abs_r / 15) * 0.2      # reach  → up to 0.2
+    )
+    return min(mismatch_score, 1.0)
 
-    db = SessionLocal()
-    f1 = db.query(Fighter).filter(Fighter.name == name_a).first()
-    f2 = db.query(Fighter).filter(Fighter.name == name_b).first()
-    db.close()
-
-    if not f1 or not f2:
-        raise ValueError("One or both fighters not found.")
-
-    def safe(val):
-        return float(val) if val is not None else 0.0
-
-    def height_inches(h):
-        if not h or "'" not in h:
-            return 0
-        parts = h.strip().split("'")
-        return int(parts[0]) * 12 + int(parts[1].strip('" ')) if len(parts) == 2 else 0
-
-    def weight_lbs(w):
-        return int(w.replace("lbs.", "").strip()) if w and "lbs." in w else 0
-
-    def reach_inches(r):
-        return int(r.replace('"', '').strip()) if r and '"' in r else 0
-
-    def compute_age(dob):
-        if not dob:
-            return 0
-        from datetime import date
-        today = date.today()
-        return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-
-    def compute_mismatch_penalty(weight_diff, height_diff, reach_diff):
-        """Returns a penalty score between 0 and 1 based on mismatch severity."""
-        abs_w = abs(weight_diff)
-        abs_h = abs(height_diff)
-        abs_r = abs(reach_diff)
-
-        mismatch_score = (
-            (abs_w / 100) * 0.5 +   # weight → up to 0.5
-            (abs_h / 10) * 0.3 +    # height → up to 0.3
-            (abs_r / 15) * 0.2      # reach  → up to 0.2
-        )
-        return min(mismatch_score, 1.0)
-
-    # Compute raw values
-    f1_height = height_inches(f1.height)
-    f2_height = height_inches(f2.height)
-    f1_weight = weight_lbs(f1.weight)
-    f2_weight = weight_lbs(f2.weight)
-    f1_reach = reach_inches(f1.reach)
-    f2_reach = reach_inches(f2.reach)
+def get_model_features(model):
+    """Feature columns the model was trained on (None if it doesn't record them)"""
+    # Handle both regular models and calibrated models
+    # CalibratedClassifierCV wraps the base estimator, so we need to access it
+    if hasattr(model, 'base_estimator'):
+        # CalibratedClassifierCV - get feature names from base estimator
+        base_model = model.base_estimator
+        if hasattr(base_model, 'feature_names_in_'):
+            return base_model.feature_names_in_
+        elif hasattr(model, 'feature_names_in_'):
+            return model.feature_names_in_
+    elif hasattr(model, 'feature_names_in_'):
+        # Regular XGBoost model
+        return model.feature_names_in_
+    return None
+
+def build_features(f1, f2, model_features):
+    """Feature dict for one bout plus the (weight, height, reach, age) diffs"""
+    # Physical attributes are parsed at scrape time; unknown values count as 0
+    f1_height = safe(f1.height_in)
+    f2_height = safe(f2.height_in)
+    f1_weight = safe(f1.weight_lbs)
+    f2_weight = safe(f2.weight_lbs)
+    f1_reach = safe(f1.reach_in)
+    f2_reach = safe(f2.reach_in)
 
     height_diff = f1_height - f2_height
     weight_diff = f1_weight - f2_weight
@@ -158,22 +137,7 @@ def predict_fight_outcome(name_a, name_b):
     features["strike_grapple_ratio_diff"] = features["f1_strike_grapple_ratio"] - features["f2_strike_grapple_ratio"]
 
     # Add one-hot encoded stance features
-    # Handle both regular models and calibrated models
-    # CalibratedClassifierCV wraps the base estimator, so we need to access it
-    if hasattr(model, 'base_estimator'):
-        # CalibratedClassifierCV - get feature names from base estimator
-        base_model = model.base_estimator
-        if hasattr(base_model, 'feature_names_in_'):
-            model_features = base_model.feature_names_in_
-        elif hasattr(model, 'feature_names_in_'):
-            model_features = model.feature_names_in_
-        else:
-            # Fallback: use current features (for backward compatibility)
-            model_features = list(features.keys())
-    elif hasattr(model, 'feature_names_in_'):
-        # Regular XGBoost model
-        model_features = model.feature_names_in_
-    else:
+    if model_features is None:
         # Fallback: use current features (for backward compatibility)
         model_features = list(features.keys())
     
@@ -196,9 +160,11 @@ def predict_fight_outcome(name_a, name_b):
         if feature_name not in features:
             features[feature_name] = 0.0
 
-    # Build input for model
-    input_df = pd.DataFrame([features], columns=model_features)
-    model_prob = model.predict_proba(input_df)[0]  # [prob_fighter_b_win, prob_fighter_a_win]
+    return features, (weight_diff, height_diff, reach_diff, age_diff)
+
+def _outcome(name_a, name_b, model_prob, diffs):
+    """Apply the mismatch penalty to the model's [fighter_b, fighter_a] probabilities"""
+    weight_diff, height_diff, reach_diff, age_diff = diffs
 
     # Compute penalty
     penalty_score = compute_mismatch_penalty(weight_diff, height_diff, reach_diff)
@@ -234,3 +200,44 @@ def predict_fight_outcome(name_a, name_b):
             "age_diff": int(age_diff)
         }
     }
+
+def predict_fight_outcomes(pairs):
+    """
+    predict_fight_outcome for many bouts with a single predict_proba call.
+
+    Args:
+        pairs: (name_a, name_b) tuples
+
+    Returns:
+        One result per pair, in order
+    """
+    if not pairs:
+        return []
+    # Loaded on first use (or by the preload hook), not on import; picks up a
+    # newly promoted model (version is polled every few seconds, not per call)
+    model = load_model()
+    model_features = get_model_features(model)
+
+    store = get_fighter_store()
+    rows, diffs = [], []
+    for name_a, name_b in pairs:
+        f1 = store.get(name_a)
+        f2 = store.get(name_b)
+        if not f1 or not f2:
+            raise ValueError("One or both fighters not found.")
+        features, pair_diffs = build_features(f1, f2, model_features)
+        rows.append(features)
+        diffs.append(pair_diffs)
+
+    # Build input for model; one row per bout
+    columns = model_features if model_features is not None else list(rows[0].keys())
+    input_df = pd.DataFrame(rows, columns=columns)
+    model_probs = model.predict_proba(input_df)  # rows of [prob_fighter_b_win, prob_fighter_a_win]
+
+    return [
+        _outcome(name_a, name_b, model_prob, pair_diffs)
+        for (name_a, name_b), model_prob, pair_diffs in zip(pairs, model_probs, diffs)
+    ]
+
+def predict_fight_outcome(name_a, name_b):
+    return predict_fight_outcomes([(name_a, name_b)])[0]
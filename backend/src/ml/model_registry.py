@@ -0,0 +1,188 @@
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+import joblib
+import numpy as np
+
+from src.azure_config import get_model_path
+
+logger = logging.getLogger(__name__)
+
+MODEL_VERSION_KEY = "ml_model_version"
+LOCAL_FALLBACK_PATH = "src/ml/fight_predictor.pkl"
+POLL_SECONDS_ENV = "ML_MODEL_POLL_SECONDS"
+DEFAULT_POLL_SECONDS = 5
+
+
+def new_model_version():
+    """Sortable version id for a freshly trained model"""
+    return datetime.utcnow().strftime("%Y%m%dT%H%M%S")
+
+
+def get_staging_path(version, model_path=None):
+    """Versioned staging path next to the served model (same filesystem, so promotion is a rename)"""
+    model_path = model_path or get_model_path()
+    root, ext = os.path.splitext(model_path)
+    return f"{root}-{version}.staging{ext}"
+
+
+def validate_model(model_path, X_sample, min_cv_accuracy=None, metrics=None):
+    """
+    Sanity-check a trained model before it is promoted: it must unpickle, accept the
+    dataset's feature columns and return finite probabilities in [0, 1]. Returns a
+    list of problems (empty when the model is valid).
+    """
+    problems = []
+    try:
+        model = joblib.load(model_path)
+    except Exception as e:
+        return [f"model does not load: {e}"]
+
+    expected = list(getattr(model, "feature_names_in_", []))
+    if expected and expected != list(X_sample.columns):
+        problems.append("feature columns do not match the training dataset")
+
+    try:
+        proba = np.asarray(model.predict_proba(X_sample))
+        if proba.shape != (len(X_sample), 2):
+            problems.append(f"predict_proba returned shape {proba.shape}")
+        elif not np.isfinite(proba).all() or (proba < 0).any() or (proba > 1).any():
+            problems.append("predict_proba returned probabilities outside [0, 1]")
+    except Exception as e:
+        problems.append(f"predict_proba failed: {e}")
+
+    if min_cv_accuracy is not None and metrics and metrics.get("cv_accuracy", 0) < min_cv_accuracy:
+        problems.append(f"cv_accuracy {metrics.get('cv_accuracy')} below minimum {min_cv_accuracy}")
+    return problems
+
+
+def record_model_version(version, model_path, metrics=None):
+    """Persist the active model version so every worker can see what is being served"""
+    from src.db import SessionLocal, SchedulerMetadata
+
+    value = json.dumps({
+        "version": version,
+        "path": model_path,
+        "promoted_at": datetime.utcnow().isoformat(),
+        "cv_accuracy": (metrics or {}).get("cv_accuracy"),
+        "training_samples": (metrics or {}).get("training_samples"),
+    })
+    db = SessionLocal()
+    try:
+        row = db.query(SchedulerMetadata).filter(SchedulerMetadata.key == MODEL_VERSION_KEY).first()
+        if row:
+            row.value = value
+            row.updated_at = datetime.utcnow()
+        else:
+            db.add(SchedulerMetadata(key=MODEL_VERSION_KEY, value=value, updated_at=datetime.utcnow()))
+        db.commit()
+    finally:
+        db.close()
+
+
+def load_model_version():
+    """Return the recorded active model version dict, or None"""
+    from src.db import SessionLocal, SchedulerMetadata
+
+    db = SessionLocal()
+    try:
+        row = db.query(SchedulerMetadata).filter(SchedulerMetadata.key == MODEL_VERSION_KEY).first()
+        return json.loads(row.value) if row and row.value else None
+    finally:
+        db.close()
+
+
+def promote_model(staging_path, version, metrics=None, model_path=None):
+    """
+    Atomically replace the served model with a validated staging file.
+
+    os.replace is atomic on the same filesystem, so a worker loading the model path
+    sees either the old or the new file, never a partial write.
+    """
+    model_path = model_path or get_model_path()
+    os.replace(staging_path, model_path)
+    record_model_version(version, model_path, metrics)
+    logger.info(f"Promoted model version {version} to {model_path}")
+    return model_path
+
+
+class ModelRegistry:
+    """
+    Per-process holder of the served model.
+
+    Every gunicorn worker has its own registry. The model is unpickled once and
+    reused; at most every `poll_seconds` the registry reads the version record in
+    scheduler_metadata (and stats the model file, for models copied into place by
+    hand) and hot-swaps the model when either has changed. Requests in between
+    never touch the DB or the filesystem.
+    """
+
+    def __init__(self, model_path=None, poll_seconds=None):
+        self.model_path = model_path
+        if poll_seconds is None:
+            poll_seconds = float(os.getenv(POLL_SECONDS_ENV, DEFAULT_POLL_SECONDS))
+        self.poll_seconds = poll_seconds
+        self.version = None
+        self._model = None
+        self._signature = None
+        self._next_poll = 0.0
+        self._lock = threading.Lock()
+
+    def _resolve_path(self, recorded=None):
+        if recorded and recorded.get("path") and os.path.exists(recorded["path"]):
+            return recorded["path"]
+        path = self.model_path or get_model_path()
+        if not os.path.exists(path) and os.path.exists(LOCAL_FALLBACK_PATH):
+            # Fallback to local path for development
+            return LOCAL_FALLBACK_PATH
+        return path
+
+    def _poll(self):
+        try:
+            recorded = load_model_version()
+        except Exception as e:
+            # The DB being briefly unavailable must not take predictions down with it
+            logger.warning(f"Could not read model version record: {e}")
+            recorded = {"version": self.version} if self.version else None
+
+        path = self._resolve_path(recorded)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            if self._model is not None:
+                return
+            raise FileNotFoundError(f"Model not found at {path} or {LOCAL_FALLBACK_PATH}")
+
+        version = recorded.get("version") if recorded else None
+        signature = (version, path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if self._model is None or signature != self._signature:
+            self._model = joblib.load(path)
+            self._signature = signature
+            self.version = version
+            logger.info(f"Loaded ML model version {version or 'unversioned'} from {path}")
+
+    def get_model(self):
+        now = time.monotonic()
+        if self._model is None or now >= self._next_poll:
+            with self._lock:
+                if self._model is None or now >= self._next_poll:
+                    self._poll()
+                    self._next_poll = now + self.poll_seconds
+        return self._model
+
+    def fingerprint(self):
+        """Identifies the served model (version and file) for HTTP cache validators"""
+        self.get_model()
+        version, path, inode, mtime_ns, size = self._signature
+        return f"{version}:{os.path.basename(path)}:{inode}:{mtime_ns}:{size}"
+
+
+_registry = ModelRegistry()
+
+
+def get_registry():
+    return _registry
@@ -1,90 +1,84 @@
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine
+from sqlalchemy import text, bindparam, func, select
 import os
-from datetime import datetime, date
-import re
-from src.azure_config import get_dataset_path
+from datetime import date, datetime
+from src.azure_config import get_dataset_path, get_dataset_dir
+from src.ml.dataset_store import save_dataset, load_dataset, load_row_ids
 
-# Use the same database connection as the main app
-DATABASE_URL = os.getenv("DATABASE_URL")
-if DATABASE_URL is None:
-    # Local development fallback
-    from src.azure_config import get_database_path
-    DATABASE_URL = get_database_path()
+# Same shared engine as the main app, created on first use
+from src.db_engine import disable_statement_timeout, get_engine
 
-print(f"ML Dataset - Using database: {DATABASE_URL[:50] if DATABASE_URL else 'None'}...")
-engine = create_engine(DATABASE_URL)
+def compute_ages(dobs, today=None):
+    """Vectorized age in whole years from DOB values (date objects or YYYY-MM-DD strings)"""
+    today = today or date.today()
+    dob = pd.to_datetime(dobs, errors="coerce", format="mixed")
+    before_birthday = (dob.dt.month > today.month) | ((dob.dt.month == today.month) & (dob.dt.day > today.day))
+    return today.year - dob.dt.year - before_birthday.astype(float)
 
-def parse_height(s):
-    match = re.match(r"(\d+)' (\d+)", s)
-    return int(match.group(1)) * 12 + int(match.group(2)) if match else None
 
-def parse_weight(s):
-    return int(s.replace("lbs.", "").strip()) if s else None
+FEATURE_QUERY = """
+    SELECT
+        fr.id AS result_id,
+        f1.name AS fighter_name,
+        f2.name AS opponent_name,
+        fr.result,
 
-def parse_reach(s):
-    try:
-        return int(s.replace('"', "").strip()) if s and s != "--" else None
-    except ValueError:
-        return None
+        f1.slpm AS f1_slpm,
+        f1.str_acc AS f1_str_acc,
+        f1.str_def AS f1_str_def,
+        f1.td_avg AS f1_td_avg,
+        f1.td_acc AS f1_td_acc,
+        f1.td_def AS f1_td_def,
+        f1.sub_avg AS f1_sub_avg,
+        f1.height_in AS f1_height,
+        f1.weight_lbs AS f1_weight,
+        f1.reach_in AS f1_reach,
+        f1.stance AS f1_stance,
+        f1.dob AS f1_dob,
 
-def compute_age(dob):
-    if pd.isna(dob):
-        return None
-    if isinstance(dob, str):
-        try:
-            dob = datetime.strptime(dob.strip(), "%Y-%m-%d").date()
-        except ValueError:
-            return None
+        f2.slpm AS f2_slpm,
+        f2.str_acc AS f2_str_acc,
+        f2.str_def AS f2_str_def,
+        f2.td_avg AS f2_td_avg,
+        f2.td_acc AS f2_td_acc,
+        f2.td_def AS f2_td_def,
+        f2.sub_avg AS f2_sub_avg,
+        f2.height_in AS f2_height,
+        f2.weight_lbs AS f2_weight,
+        f2.reach_in AS f2_reach,
+        f2.stance AS f2_stance,
+        f2.dob AS f2_dob
+
+    FROM fight_results fr
+    JOIN fighters f1 ON fr.fighter_name = f1.name
+    JOIN fighters f2 ON fr.opponent_name = f2.name
+    WHERE fr.result IN ('win', 'loss')
+"""
+
+# Bump when feature engineering changes so stored datasets get rebuilt from scratch
+FEATURE_VERSION = 3
+
+# Fixed one-hot schema so every chunk (and every incremental build) yields the same
+# columns; stances outside this list fall into the *_stance_nan column
+STANCES = ["Open Stance", "Orthodox", "Sideways", "Southpaw", "Switch"]
+
+# Rows per streamed SQL chunk
+CHUNK_SIZE = 5000
+
+# Above this share of changed fighters (or rewritten result rows) a full rebuild
+# is cheaper than patching
+FULL_REBUILD_CHANGED_RATIO = 0.5
+
+
+def compute_features(df):
+    """Turn joined fight_results/fighters rows into model features (keeps result_id and label)"""
+    # Physical attributes come pre-parsed from the numeric columns (NULL -> NaN)
     today = date.today()
-    return today.year - dob.year - ((today.month, today.day) < (dob.month, dob.day))
-
-def build_dataset():
-    with engine.connect() as conn:
-        df = pd.read_sql("""
-            SELECT
-                f1.name AS fighter_name,
-                f2.name AS opponent_name,
-                fr.result,
-
-                f1.slpm AS f1_slpm,
-                f1.str_acc AS f1_str_acc,
-                f1.str_def AS f1_str_def,
-                f1.td_avg AS f1_td_avg,
-                f1.td_acc AS f1_td_acc,
-                f1.td_def AS f1_td_def,
-                f1.sub_avg AS f1_sub_avg,
-                f1.height AS f1_height,
-                f1.weight AS f1_weight,
-                f1.reach AS f1_reach,
-                f1.stance AS f1_stance,
-                f1.dob AS f1_dob,
-
-                f2.slpm AS f2_slpm,
-                f2.str_acc AS f2_str_acc,
-                f2.str_def AS f2_str_def,
-                f2.td_avg AS f2_td_avg,
-                f2.td_acc AS f2_td_acc,
-                f2.td_def AS f2_td_def,
-                f2.sub_avg AS f2_sub_avg,
-                f2.height AS f2_height,
-                f2.weight AS f2_weight,
-                f2.reach AS f2_reach,
-                f2.stance AS f2_stance,
-                f2.dob AS f2_dob
-
-            FROM fight_results fr
-            JOIN fighters f1 ON fr.fighter_name = f1.name
-            JOIN fighters f2 ON fr.opponent_name = f2.name
-            WHERE fr.result IN ('win', 'loss')
-        """, conn)
-
-    # Parse physical attributes
     for side in ["f1", "f2"]:
-        df[f"{side}_height"] = df[f"{side}_height"].apply(parse_height)
-        df[f"{side}_weight"] = df[f"{side}_weight"].apply(parse_weight)
-        df[f"{side}_reach"] = df[f"{side}_reach"].apply(parse_reach)
-        df[f"{side}_age"] = df[f"{side}_dob"].apply(compute_age)
+        for attr in ["height", "weight", "reach"]:
+            df[f"{side}_{attr}"] = df[f"{side}_{attr}"].astype(float)
+        df[f"{side}_age"] = compute_ages(df[f"{side}_dob"], today)
 
     # Compute difference features
     df["reach_diff"] = df["f1_reach"] - df["f2_reach"]
@@ -145,10 +139,12 @@ def build_dataset():
     df["strike_grapple_ratio_diff"] = df["f1_strike_grapple_ratio"] - df["f2_strike_grapple_ratio"]
 
     # One-hot encode stance combinations
+    for side in ["f1", "f2"]:
+        df[f"{side}_stance"] = pd.Categorical(df[f"{side}_stance"], categories=STANCES)
     df = pd.get_dummies(df, columns=["f1_stance", "f2_stance"], dummy_na=True)
 
     # Convert result to label
-    df["label"] = df["result"].apply(lambda r: 1 if r == "win" else 0)
+    df["label"] = (df["result"] == "win").astype(np.int8)
 
     # Drop raw attributes and unused columns
     df.drop(columns=[
@@ -159,13 +155,183 @@ def build_dataset():
     ], inplace=True)
 
     df.dropna(inplace=True)
-    
+
+    # Compact dtypes so accumulated chunks stay small
+    feature_columns = [c for c in df.columns if c not in ("label", "result_id")]
+    df[feature_columns] = df[feature_columns].astype(np.float32)
+    df["result_id"] = df["result_id"].astype(np.int64)
+    return df
+
+
+def _read_features(conn, condition, params, expanding=()):
+    """
+    Stream FEATURE_QUERY rows matching `condition` in CHUNK_SIZE chunks and featurise
+    each chunk as it arrives, so peak memory is one raw chunk plus the compact float32
+    features. Returns (features DataFrame, ids of every matched fight_results row).
+    """
+    query = text(FEATURE_QUERY + f" AND ({condition}) ORDER BY fr.id")
+    if expanding:
+        query = query.bindparams(*(bindparam(name, expanding=True) for name in expanding))
+
+    chunks = []
+    matched_ids = []
+    stream = conn.execution_options(stream_results=True)
+    for raw in pd.read_sql(query, stream, params=params, chunksize=CHUNK_SIZE):
+        matched_ids.append(raw["result_id"].to_numpy(dtype=np.int64))
+        chunks.append(compute_features(raw))
+
+    if not chunks:
+        chunks.append(compute_features(pd.read_sql(text(FEATURE_QUERY + " AND 1 = 0"), conn)))
+    features = pd.concat(chunks, ignore_index=True)
+    ids = np.concatenate(matched_ids) if matched_ids else np.empty(0, dtype=np.int64)
+    return features, ids
+
+
+def _fighter_versions(conn):
+    rows = conn.execute(text("SELECT name, last_updated FROM fighters")).fetchall()
+    return {name: str(updated) if updated is not None else None for name, updated in rows}
+
+
+def _results_revision(conn):
+    """Newest fight_results.updated_at (None while no row has one)"""
+    from src.db import FightResult
+
+    return conn.execute(select(func.max(FightResult.updated_at))).scalar()
+
+
+def _revised_result_ids(conn, since):
+    """Ids of fight_results rows rewritten after `since` (all stamped rows when None)"""
+    from src.db import FightResult
+
+    updated_at = FightResult.updated_at
+    condition = updated_at.is_not(None) if since is None else updated_at > since
+    return [int(i) for i in conn.execute(select(FightResult.id).where(condition)).scalars()]
+
+
+def _load_previous_build(dataset_dir):
+    """Return (X, y, row_ids, manifest) of the stored dataset if it can be extended incrementally"""
+    try:
+        X, y, manifest = load_dataset(dataset_dir, mmap=True)
+        row_ids = load_row_ids(dataset_dir)
+    except (OSError, ValueError) as e:
+        print(f"No reusable dataset at {dataset_dir} ({e}), doing a full build")
+        return None
+    if row_ids is None or manifest.get("feature_version") != FEATURE_VERSION or "watermark" not in manifest:
+        return None
+    if "results_updated_at" not in manifest["watermark"]:
+        # Built before results were revisioned; rewritten results can't be detected
+        return None
+    return X, y, row_ids, manifest
+
+
+def _incremental_rows(conn, previous, fighter_versions, max_result_id):
+    """
+    Compute features only for fight_results rows added or rewritten since the
+    watermark or whose fighters changed, and merge them into the stored dataset.
+    Returns the merged DataFrame, or None when a full rebuild is required.
+    """
+    X_old, y_old, ids_old, manifest = previous
+    watermark = manifest["watermark"]
+    seen_versions = watermark.get("fighter_versions", {})
+    changed = sorted(name for name, version in fighter_versions.items() if seen_versions.get(name) != version)
+    if fighter_versions and len(changed) > len(fighter_versions) * FULL_REBUILD_CHANGED_RATIO:
+        print(f"{len(changed)} of {len(fighter_versions)} fighters changed, doing a full build")
+        return None
+
+    condition = "fr.id > :last_id AND fr.id <= :max_id"
+    params = {"last_id": watermark["max_result_id"], "max_id": max_result_id}
+    expanding = ()
+    if changed:
+        condition = f"({condition}) OR fr.fighter_name IN :changed OR fr.opponent_name IN :changed"
+        params["changed"] = changed
+        expanding = ("changed",)
+    # Corrected results keep their id; relabel them (or drop them, e.g. win -> draw)
+    since = watermark["results_updated_at"]
+    revised = _revised_result_ids(conn, datetime.fromisoformat(since) if since else None)
+    if len(revised) > len(ids_old) * FULL_REBUILD_CHANGED_RATIO:
+        print(f"{len(revised)} of {len(ids_old)} results rewritten, doing a full build")
+        return None
+    if revised:
+        condition = f"({condition}) OR fr.id IN :revised"
+        params["revised"] = revised
+        expanding += ("revised",)
+    fresh, recomputed_ids = _read_features(conn, condition, params, expanding)
+
+    columns = manifest["columns"]
+    unknown = set(fresh.columns) - set(columns) - {"label", "result_id"}
+    if unknown:
+        print(f"New feature columns {sorted(unknown)}, doing a full build")
+        return None
+    fresh = fresh.reindex(columns=columns + ["label", "result_id"], fill_value=0)
+
+    # Drop rows that were recomputed and rows whose fight_results row no longer exists
+    live_ids = np.fromiter(conn.execute(text("SELECT id FROM fight_results")).scalars(), dtype=np.int64)
+    keep = np.isin(ids_old, live_ids) & ~np.isin(ids_old, recomputed_ids) & ~np.isin(ids_old, revised)
+
+    kept = pd.DataFrame(np.asarray(X_old[keep]), columns=columns)
+    kept["label"] = np.asarray(y_old[keep])
+    kept["result_id"] = ids_old[keep]
+    print(
+        f"Incremental build: kept {int(keep.sum())} rows, recomputed {len(recomputed_ids)} rows "
+        f"({len(changed)} changed fighters, {len(revised)} rewritten results)"
+    )
+
+    merged = pd.concat([kept, fresh], ignore_index=True)
+    return merged.sort_values("result_id", kind="stable").reset_index(drop=True)
+
+
+def build_dataset(export_csv=False, incremental=True):
+    """
+    Build the training dataset from fight results and write it as a columnar
+    artifact (see dataset_store). Pass export_csv=True to also write the CSV.
+
+    With incremental=True the stored dataset is extended instead of rebuilt: the
+    manifest records the highest processed fight_results.id, the newest
+    fight_results.updated_at and the last_updated value of every fighter, and
+    only new or rewritten rows and rows involving changed fighters are
+    recomputed. Rows are otherwise treated as immutable once written, so age
+    features keep the value they had when the row was built.
+    Returns the dataset directory.
+    """
+    dataset_dir = get_dataset_dir()
+    previous = _load_previous_build(dataset_dir) if incremental else None
+
+    with get_engine().connect() as conn:
+        # A full rebuild streams every fight; the API's statement timeout is too short for it
+        disable_statement_timeout(conn)
+        # Snapshot the watermark first; rows inserted while we build are picked up next run
+        max_result_id = conn.execute(text("SELECT MAX(id) FROM fight_results")).scalar() or 0
+        fighter_versions = _fighter_versions(conn)
+        results_updated_at = _results_revision(conn)
+
+        df = _incremental_rows(conn, previous, fighter_versions, max_result_id) if previous else None
+        mode = "incremental"
+        if df is None:
+            mode = "full"
+            df, _ = _read_features(conn, "fr.id <= :max_id", {"max_id": max_result_id})
+        del previous  # Release the memory map before the files are replaced
+
+    watermark = {
+        "max_result_id": int(max_result_id),
+        "results_updated_at": results_updated_at.isoformat() if results_updated_at else None,
+        "fighter_versions": fighter_versions,
+    }
+
     # Use Azure-compatible path
-    dataset_path = get_dataset_path()
-    df.to_csv(dataset_path, index=False)
-    print(f"Dataset written to {dataset_path}")
+    manifest = save_dataset(
+        df, dataset_dir, id_column="result_id",
+        extra={"feature_version": FEATURE_VERSION, "build_mode": mode, "watermark": watermark}
+    )
+    print(f"Dataset written to {dataset_dir} (sha256 {manifest['sha256'][:12]}, {mode} build)")
     print(f"Dataset shape: {df.shape}")
-    return dataset_path
+
+    if export_csv:
+        csv_path = get_dataset_path()
+        df.drop(columns=["result_id"]).to_csv(csv_path, index=False)
+        print(f"Dataset exported to {csv_path}")
+
+    return dataset_dir
 
 if __name__ == "__main__":
-    build_dataset()
+    import sys
+    build_dataset(export_csv="--csv" in sys.argv, incremental="--full" not in sys.argv)
@@ -0,0 +1,149 @@
+"""
+Out-of-process model retraining.
+
+The scheduler and API never train in the serving process: run_retrain() launches
+`python -m src.ml.retrain_worker` with a CPU cap, and the worker rebuilds the
+dataset, trains into a versioned staging file, validates it and promotes it with
+an atomic rename plus a version record in the DB. Serving workers pick the new
+model up through their ModelRegistry.
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "LOKY_MAX_CPU_COUNT")
+
+# Environment overrides
+MAX_CPUS_ENV = "RETRAIN_MAX_CPUS"
+TIMEOUT_ENV = "RETRAIN_TIMEOUT_SECONDS"
+MIN_CV_ACCURACY_ENV = "RETRAIN_MIN_CV_ACCURACY"
+DEFAULT_TIMEOUT_SECONDS = 3600
+DEFAULT_MIN_CV_ACCURACY = 0.5
+VALIDATION_SAMPLE_ROWS = 500
+
+
+def get_cpu_cap():
+    """CPU cap for retraining: RETRAIN_MAX_CPUS, or half the machine (at least one core)"""
+    value = os.getenv(MAX_CPUS_ENV)
+    if value:
+        return max(1, int(value))
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def _apply_cpu_cap(cpus):
+    """Pin this process (and the pool workers it forks) to `cpus` cores at low priority"""
+    if hasattr(os, "sched_setaffinity"):
+        available = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, available[:cpus])
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+def _retrain(version, cpus, force_full_dataset=False):
+    from src.azure_config import get_dataset_dir
+    from src.ml.dataset_store import load_dataset_frame
+    from src.ml.model_registry import get_staging_path, promote_model, validate_model
+    from src.ml.prepare_ml_dataset import build_dataset
+    from src.ml.train_model import train_model
+
+    dataset_dir = get_dataset_dir()
+    build_dataset(incremental=not force_full_dataset)
+    print("Dataset rebuilt with latest results")
+
+    staging_path = get_staging_path(version)
+    try:
+        metrics = train_model(dataset_path=dataset_dir, model_path=staging_path, n_jobs=cpus)
+
+        X, _, _ = load_dataset_frame(dataset_dir)
+        sample = X.iloc[:VALIDATION_SAMPLE_ROWS]
+        min_cv_accuracy = float(os.getenv(MIN_CV_ACCURACY_ENV, DEFAULT_MIN_CV_ACCURACY))
+        problems = validate_model(staging_path, sample, min_cv_accuracy=min_cv_accuracy, metrics=metrics)
+        if problems:
+            raise ValueError(f"Model {version} failed validation: {'; '.join(problems)}")
+
+        model_path = promote_model(staging_path, version, metrics)
+    finally:
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+
+    metrics["model_path"] = model_path
+    metrics["model_version"] = version
+    return metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrain the fight prediction model")
+    parser.add_argument("--version", required=True)
+    parser.add_argument("--cpus", type=int, default=None)
+    parser.add_argument("--result", default=None, help="Write the outcome as JSON to this path")
+    parser.add_argument("--full", action="store_true", help="Rebuild the dataset from scratch")
+    args = parser.parse_args()
+
+    cpus = args.cpus or get_cpu_cap()
+    _apply_cpu_cap(cpus)
+
+    try:
+        outcome = {"success": True, "metrics": _retrain(args.version, cpus, args.full)}
+        exit_code = 0
+    except Exception as e:
+        outcome = {"success": False, "error": str(e)}
+        exit_code = 1
+
+    if args.result:
+        with open(args.result, "w") as f:
+            json.dump(outcome, f)
+    sys.exit(exit_code)
+
+
+def run_retrain(cpus=None, timeout=None, full=False):
+    """
+    Retrain in a child process and wait for it. Returns the promoted model's
+    metrics; raises RuntimeError if training or validation failed (the served
+    model is left untouched in that case).
+    """
+    from src.ml.model_registry import new_model_version
+
+    cpus = cpus or get_cpu_cap()
+    timeout = timeout or int(os.getenv(TIMEOUT_ENV, DEFAULT_TIMEOUT_SECONDS))
+    version = new_model_version()
+
+    env = os.environ.copy()
+    # Thread pools size themselves at import, so the cap has to be in the environment
+    for name in THREAD_ENV_VARS:
+        env[name] = str(cpus)
+
+    fd, result_path = tempfile.mkstemp(prefix="retrain-", suffix=".json")
+    os.close(fd)
+    cmd = [sys.executable, "-m", "src.ml.retrain_worker",
+           "--version", version, "--cpus", str(cpus), "--result", result_path]
+    if full:
+        cmd.append("--full")
+
+    logger.info(f"Starting retrain subprocess for model version {version} (cpus={cpus})")
+    try:
+        completed = subprocess.run(cmd, cwd=BACKEND_DIR, env=env, timeout=timeout)
+        try:
+            with open(result_path, "r") as f:
+                outcome = json.load(f)
+        except (OSError, ValueError):
+            outcome = {"success": False, "error": f"Retrain subprocess exited with code {completed.returncode}"}
+    except subprocess.TimeoutExpired:
+        outcome = {"success": False, "error": f"Retrain subprocess timed out after {timeout}s"}
+    finally:
+        os.remove(result_path)
+
+    if not outcome.get("success"):
+        raise RuntimeError(outcome.get("error", "Retrain failed"))
+    logger.info(f"Model version {version} promoted")
+    return outcome["metrics"]
+
+
+if __name__ == "__main__":
+    main()
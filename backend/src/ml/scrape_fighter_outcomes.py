@@ -7,8 +7,11 @@ from src.db import (
     SessionLocal,
     Fighter,
     ModelPrediction,
-    upsert_fight_result,
+    make_pair_key,
+    upsert_fight_results,
+    ensure_db,
 )
+from src.model_performance import resolve_predictions
 from sqlalchemy import text
 import time
 import re
@@ -77,64 +80,34 @@ def save_outcomes(db: Session, outcomes):
         return
 
     fighter_name = outcomes[0]["fighter_name"]
-    
-    # Save to fight_results table (using existing schema)
-    for fight in outcomes:
-        try:
-            upsert_fight_result(
-                db,
-                fighter_name=fight["fighter_name"],
-                opponent_name=fight["opponent_name"],
-                result=fight["result"],
-                event=fight["event"],
-                event_date=fight["event_date"],
-                method=fight["method"],
-                round=fight["round"],
-                time=fight["time"],
-            )
-
-            inverse_result = None
-            if fight["result"] == "win":
-                inverse_result = "loss"
-            elif fight["result"] == "loss":
-                inverse_result = "win"
-            else:
-                inverse_result = fight["result"]
-
-            upsert_fight_result(
-                db,
-                fighter_name=fight["opponent_name"],
-                opponent_name=fight["fighter_name"],
-                result=inverse_result,
-                event=fight["event"],
-                event_date=fight["event_date"],
-                method=fight["method"],
-                round=fight["round"],
-                time=fight["time"],
-            )
-            
-            # Determine the actual winner for predictions
+
+    try:
+        # Save both sides of every bout to fight_results in batched upserts
+        upsert_fight_results(db, outcomes)
+
+        # Determine the actual winner for predictions; outcomes are newest first,
+        # so a rematch resolves to its latest result
+        winners = {}
+        for fight in outcomes:
             if fight["result"] == "win":
                 actual_winner = fighter_name
-            elif fight["result"] == "loss": 
+            elif fight["result"] == "loss":
                 actual_winner = fight["opponent_name"]
             else:
                 actual_winner = "Draw"
-            
-            # Update any matching predictions
-            predictions = db.query(ModelPrediction).filter(
-                ((ModelPrediction.fighter_a == fighter_name) & (ModelPrediction.fighter_b == fight["opponent_name"])) |
-                ((ModelPrediction.fighter_a == fight["opponent_name"]) & (ModelPrediction.fighter_b == fighter_name))
-            ).all()
-            
-            for pred in predictions:
-                pred.actual_winner = actual_winner
-                pred.correct = (pred.predicted_winner == actual_winner)
-
-            db.commit()
-        except Exception as e:
-            db.rollback()
-            print(f"Failed to save fight result for {fight['fighter_name']} vs {fight['opponent_name']}: {e}")
+            winners.setdefault(make_pair_key(fighter_name, fight["opponent_name"]), actual_winner)
+
+        # Update any matching predictions
+        predictions = db.query(ModelPrediction).filter(
+            ModelPrediction.pair_key.in_(list(winners))
+        ).all()
+
+        resolve_predictions(db, [(pred, winners[pred.pair_key]) for pred in predictions])
+
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Failed to save fight results for {fighter_name}: {e}")
 
 # Main loop to scrape all fighters
 def scrape_all_fighters():
@@ -156,4 +129,5 @@ def scrape_all_fighters():
     print("Finished scraping all fighters and updating predictions.")
 
 if __name__ == "__main__":
+    ensure_db()
     scrape_all_fighters()
@@ -1,39 +1,132 @@
 import pandas as pd
 import xgboost as xgb
-from sklearn.metrics import accuracy_score, classification_report
-from sklearn.model_selection import cross_val_score, RandomizedSearchCV
-from sklearn.calibration import CalibratedClassifierCV
+from sklearn.metrics import accuracy_score
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import HalvingGridSearchCV, ParameterSampler, StratifiedKFold, cross_val_predict
+from sklearn.isotonic import IsotonicRegression
 import joblib
 import os
 import warnings
-from src.azure_config import get_dataset_path, get_model_path
+from src.azure_config import get_dataset_dir, get_model_path
+from src.ml.calibration import OOFCalibratedClassifier
+from src.ml.dataset_store import load_dataset_frame
+from src.ml.trial_cache import TrialCache, dataset_fingerprint, params_key
 import numpy as np
 
 # Suppress XGBoost deprecation warnings
 warnings.filterwarnings('ignore', category=UserWarning, module='xgboost')
 
-def train_model(dataset_path=None, model_path=None, use_hyperparameter_tuning=True, n_iter=30):
+CV_FOLDS = 5
+
+# Hyperparameter search space
+PARAM_DISTRIBUTIONS = {
+    'n_estimators': [100, 200, 300],
+    'max_depth': [6, 8, 10, 12],
+    'learning_rate': [0.05, 0.1, 0.15],
+    'subsample': [0.7, 0.8, 0.9],
+    'colsample_bytree': [0.7, 0.8, 0.9],
+    'min_child_weight': [1, 3, 5],
+    'gamma': [0, 0.1, 0.2]
+}
+
+DEFAULT_PARAMS = {
+    'n_estimators': 200,
+    'max_depth': 10,
+    'learning_rate': 0.1,
+    'subsample': 0.8,
+    'colsample_bytree': 0.8,
+    'min_child_weight': 3
+}
+
+
+def _build_candidates(cache, fingerprint, n_iter):
+    """Warm-start candidates from previous searches followed by fresh random samples"""
+    candidates = cache.warm_start_candidates(limit=max(1, n_iter // 3), exclude=fingerprint) if cache else []
+    seen = {params_key(c) for c in candidates}
+    for params in ParameterSampler(PARAM_DISTRIBUTIONS, n_iter=n_iter * 2, random_state=42):
+        if len(candidates) >= n_iter:
+            break
+        params = {k: (v.item() if hasattr(v, 'item') else v) for k, v in params.items()}
+        if params_key(params) not in seen:
+            seen.add(params_key(params))
+            candidates.append(params)
+    return candidates
+
+
+def _search_hyperparameters(X, y, base_model, cv, cache, fingerprint, n_iter, n_jobs=-1):
+    """
+    Successive-halving search over PARAM_DISTRIBUTIONS.
+
+    Candidates are first scored on a small sample of rows and only the best third
+    advance to the next round with three times as many rows, so most of the
+    search runs on a fraction of the data. Returns (best_params, best_score, fits).
+    """
+    candidates = _build_candidates(cache, fingerprint, n_iter)
+    search = HalvingGridSearchCV(
+        base_model,
+        [{k: [v] for k, v in params.items()} for params in candidates],
+        factor=3,
+        cv=cv,
+        scoring='accuracy',
+        n_jobs=n_jobs,
+        refit=False,  # The final model is refit below, after out-of-fold calibration
+        random_state=42,
+        verbose=0
+    )
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        search.fit(X, y)
+
+    # Only scores measured on the full dataset are comparable across retrains
+    results = search.cv_results_
+    if cache is not None:
+        full_resources = max(results['n_resources'])
+        for params, score, n_resources in zip(results['params'], results['mean_test_score'], results['n_resources']):
+            if n_resources == full_resources and not np.isnan(score):
+                cache.record(fingerprint, params, score, len(y))
+        cache.save()
+
+    fits = len(results['params']) * cv.get_n_splits()
+    return search.best_params_, search.best_score_, fits
+
+
+def train_model(dataset_path=None, model_path=None, use_hyperparameter_tuning=True, n_iter=30, use_trial_cache=True,
+                n_jobs=-1):
     """
     Train the ML model using XGBoost with hyperparameter tuning and probability calibration
-    
+
+    Out-of-fold predictions from a single cross-validation pass are used both to fit
+    the isotonic calibrator and to report CV accuracy, so the calibrated model does
+    not need its own nested cross-validation.
+
     Args:
-        dataset_path: Path to training dataset
+        dataset_path: Columnar dataset directory, or a .csv export
         model_path: Path to save the trained model
         use_hyperparameter_tuning: Whether to perform hyperparameter tuning (default: True)
-        n_iter: Number of iterations for RandomizedSearchCV (default: 30)
+        n_iter: Number of candidate parameter sets for the successive-halving search (default: 30)
+        use_trial_cache: Reuse/persist search results keyed by dataset fingerprint (default: True)
+        n_jobs: Parallel fits for search and CV; -1 uses every core. A positive value caps
+            CPU use, and each XGBoost fit is then single-threaded (default: -1)
     """
     # Use Azure-compatible paths
     if dataset_path is None:
-        dataset_path = get_dataset_path()
+        dataset_path = get_dataset_dir()
     if model_path is None:
         model_path = get_model_path()
     
     print(f"Loading dataset from: {dataset_path}")
     print(f"Will save model to: {model_path}")
     
-    df = pd.read_csv(dataset_path)
-    X = df.drop(columns=["label"])
-    y = df["label"]
+    if dataset_path.endswith(".csv"):
+        df = pd.read_csv(dataset_path)
+        X = df.drop(columns=["label"])
+        y = df["label"]
+        fingerprint = dataset_fingerprint(df)
+    else:
+        # Memory-mapped float32 matrix; the manifest already carries the content hash
+        X, y, manifest = load_dataset_frame(dataset_path)
+        fingerprint = manifest["sha256"]
 
     # Calculate scale_pos_weight for class imbalance (similar to class_weight="balanced")
     # This is the ratio of negative to positive samples
@@ -41,100 +134,90 @@ def train_model(dataset_path=None, model_path=None, use_hyperparameter_tuning=Tr
     neg_count = np.sum(y == 0)
     scale_pos_weight = neg_count / pos_count if pos_count > 0 else 1.0
 
-    if use_hyperparameter_tuning and len(df) > 100:  # Only tune if we have enough data
+    fixed_params = {
+        'scale_pos_weight': scale_pos_weight,
+        'random_state': 42,
+        'eval_metric': 'logloss'
+    }
+    if n_jobs > 0:
+        # Parallelism comes from running fits side by side, not from threads inside each fit
+        fixed_params['n_jobs'] = 1
+    cv = StratifiedKFold(n_splits=CV_FOLDS, shuffle=True, random_state=42)
+    search_fits = 0
+    trial_cache_hit = False
+
+    tuned = use_hyperparameter_tuning and len(X) > 100  # Only tune if we have enough data
+    if tuned:
         print("Performing hyperparameter tuning...")
         
         # Suppress XGBoost warnings during hyperparameter tuning
         import logging
-        import os
         xgb_logger = logging.getLogger('xgboost')
         xgb_logger.setLevel(logging.ERROR)
         # Suppress XGBoost C++ warnings
         os.environ['PYTHONWARNINGS'] = 'ignore'
-        
-        # Define parameter grid for RandomizedSearchCV
-        param_distributions = {
-            'n_estimators': [100, 200, 300],
-            'max_depth': [6, 8, 10, 12],
-            'learning_rate': [0.05, 0.1, 0.15],
-            'subsample': [0.7, 0.8, 0.9],
-            'colsample_bytree': [0.7, 0.8, 0.9],
-            'min_child_weight': [1, 3, 5],
-            'gamma': [0, 0.1, 0.2]
-        }
-        
-        # Base model with fixed parameters
-        base_model = xgb.XGBClassifier(
-            scale_pos_weight=scale_pos_weight,
-            random_state=42,
-            eval_metric='logloss'
-        )
-        
-        # Randomized search with 5-fold CV
-        random_search = RandomizedSearchCV(
-            base_model,
-            param_distributions,
-            n_iter=n_iter,
-            cv=5,
-            scoring='accuracy',
-            n_jobs=-1,
-            random_state=42,
-            verbose=0  # Set to 0 to reduce output
-        )
-        
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            random_search.fit(X, y)
+
+        cache = TrialCache.load() if use_trial_cache else None
+        cached = cache.best_for(fingerprint) if cache else None
+        if cached:
+            best_params, best_score = cached
+            trial_cache_hit = True
+            print(f"Reusing cached search result for dataset {fingerprint[:12]}")
+        else:
+            best_params, best_score, search_fits = _search_hyperparameters(
+                X, y, xgb.XGBClassifier(**fixed_params), cv, cache, fingerprint, n_iter, n_jobs
+            )
         
         # Restore logging level
         xgb_logger.setLevel(logging.WARNING)
-        best_model = random_search.best_estimator_
         
-        print(f"Best parameters: {random_search.best_params_}")
-        print(f"Best CV score: {random_search.best_score_:.4f}")
+        print(f"Best parameters: {best_params}")
+        print(f"Best CV score: {best_score:.4f}")
         
     else:
         print("Using default hyperparameters...")
-        best_model = xgb.XGBClassifier(
-            n_estimators=200,
-            max_depth=10,
-            learning_rate=0.1,
-            subsample=0.8,
-            colsample_bytree=0.8,
-            min_child_weight=3,
-            scale_pos_weight=scale_pos_weight,
-            random_state=42,
-            eval_metric='logloss'
-        )
-        best_model.fit(X, y)
-
-    # Apply probability calibration
+        best_params = DEFAULT_PARAMS
+
+    best_model = xgb.XGBClassifier(**best_params, **fixed_params)
+
+    # Out-of-fold probabilities feed both calibration and the reported CV accuracy
     print("Calibrating probabilities...")
-    calibrated_model = CalibratedClassifierCV(
-        best_model,
-        method='isotonic',
-        cv=5
-    )
-    calibrated_model.fit(X, y)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        oof_prob = cross_val_predict(best_model, X, y, cv=cv, method='predict_proba', n_jobs=n_jobs)[:, 1]
+
+    calibrator = IsotonicRegression(out_of_bounds='clip', y_min=0.0, y_max=1.0)
+    calibrator.fit(oof_prob, y)
+
+    # Score what the saved model predicts: calibrated probabilities at 0.5
+    oof_pred = (calibrator.predict(oof_prob) >= 0.5).astype(int)
+    cv_scores = np.array([
+        accuracy_score(y.iloc[test_idx], oof_pred[test_idx]) for _, test_idx in cv.split(X, y)
+    ])
+    cv_accuracy = cv_scores.mean()
+
+    best_model.fit(X, y)
+    calibrated_model = OOFCalibratedClassifier(best_model, calibrator)
 
     # Calculate metrics
     train_accuracy = accuracy_score(y, calibrated_model.predict(X))
-    cv_scores = cross_val_score(calibrated_model, X, y, cv=5)
-    cv_accuracy = cv_scores.mean()
     
     # Save calibrated model
     os.makedirs(os.path.dirname(model_path), exist_ok=True)
     joblib.dump(calibrated_model, model_path)
     
     metrics = {
-        "training_samples": len(df),
+        "training_samples": len(X),
         "features": len(X.columns),
-        "train_accuracy": round(train_accuracy, 4),
-        "cv_accuracy": round(cv_accuracy, 4),
-        "cv_std": round(cv_scores.std(), 4),
+        "train_accuracy": round(float(train_accuracy), 4),
+        "cv_accuracy": round(float(cv_accuracy), 4),
+        "cv_std": round(float(cv_scores.std()), 4),
         "model_path": model_path,
         "dataset_path": dataset_path,
-        "hyperparameter_tuning": use_hyperparameter_tuning and len(df) > 100,
+        "dataset_fingerprint": fingerprint,
+        "hyperparameter_tuning": tuned,
+        "trial_cache_hit": trial_cache_hit,
+        "model_fits": search_fits + CV_FOLDS + 1,
         "calibrated": True
     }
     
@@ -143,9 +226,5 @@ def train_model(dataset_path=None, model_path=None, use_hyperparameter_tuning=Tr
     
     return metrics
 
-def retrain_model():
-    """Retrain the model and return metrics - used by scheduler"""
-    return train_model()
-
 if __name__ == "__main__":
     train_model()
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from src.azure_config import get_trial_cache_path
+
+# Keep the cache small - only the most recent datasets are useful for warm starts
+MAX_CACHED_DATASETS = 20
+
+
+def dataset_fingerprint(df):
+    """Stable hash of a training DataFrame (column names + cell values)"""
+    digest = hashlib.sha256()
+    digest.update(",".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def params_key(params):
+    """Canonical JSON key for a hyperparameter combination"""
+    return json.dumps(params, sort_keys=True)
+
+
+class TrialCache:
+    """
+    Persisted hyperparameter trial results.
+
+    Maps dataset fingerprint -> {params -> CV score}, so a retrain on an unchanged
+    dataset can skip the search entirely and a retrain on a changed dataset can
+    seed its candidate list with the best parameters found previously.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or get_trial_cache_path()
+        self.datasets = {}
+
+    @classmethod
+    def load(cls, path=None):
+        cache = cls(path)
+        if os.path.exists(cache.path):
+            try:
+                with open(cache.path, "r") as f:
+                    cache.datasets = json.load(f).get("datasets", {})
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable trial cache {cache.path}: {e}")
+                cache.datasets = {}
+        return cache
+
+    def save(self):
+        # Drop the oldest datasets beyond the cap
+        ordered = sorted(self.datasets.items(), key=lambda item: item[1].get("updated_at", ""))
+        self.datasets = dict(ordered[-MAX_CACHED_DATASETS:])
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": 1, "datasets": self.datasets}, f)
+        os.replace(tmp_path, self.path)
+
+    def record(self, fingerprint, params, score, n_samples):
+        entry = self.datasets.setdefault(fingerprint, {"n_samples": n_samples, "trials": {}})
+        entry["n_samples"] = n_samples
+        entry["updated_at"] = datetime.utcnow().isoformat()
+        entry["trials"][params_key(params)] = float(score)
+
+    def best_for(self, fingerprint):
+        """Return (params, score) of the best trial for this exact dataset, or None"""
+        trials = self.datasets.get(fingerprint, {}).get("trials")
+        if not trials:
+            return None
+        key, score = max(trials.items(), key=lambda item: item[1])
+        return json.loads(key), score
+
+    def warm_start_candidates(self, limit, exclude=None):
+        """Best parameters from previously searched datasets, most recent first"""
+        candidates = []
+        seen = set()
+        ordered = sorted(self.datasets.items(), key=lambda item: item[1].get("updated_at", ""), reverse=True)
+        for fingerprint, entry in ordered:
+            if fingerprint == exclude:
+                continue
+            ranked = sorted(entry.get("trials", {}).items(), key=lambda item: item[1], reverse=True)
+            for key, _ in ranked[:max(1, limit // 2)]:
+                if key not in seen:
+                    seen.add(key)
+                    candidates.append(json.loads(key))
+                if len(candidates) >= limit:
+                    return candidates
+        return candidates
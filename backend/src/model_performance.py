@@ -0,0 +1,145 @@
+"""
+Lifetime model performance counters (model_performance_stats).
+
+/model-performance used to load every prediction and count in Python. Resolved
+predictions are now counted once, when they are resolved: every code path that
+sets actual_winner goes through resolve_predictions(), which applies the change
+to the per-model counters in the same transaction. Counts taken at resolution
+time also survive archiving (src/prediction_archive.py).
+
+Pending predictions still change on every regeneration, so they are not
+counted; pending_stats_query() aggregates them in SQL, which only touches the
+few rows covered by the partial ix_predictions_pending index.
+
+rebuild_model_performance_stats() recomputes the counters from the table and
+the archive's counters (first deploy, or after fixing data by hand).
+"""
+from datetime import datetime
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from src.db import ArchivedPredictionStats, ModelPerformanceStats, ModelPrediction, _increment_counters
+
+_COUNTER_COLUMNS = ("resolved", "correct", "confidence_sum", "confidence_count")
+
+
+def _confidence():
+    """max(fighter_a_prob, fighter_b_prob) in SQL; NULL unless both are set"""
+    a, b = ModelPrediction.fighter_a_prob, ModelPrediction.fighter_b_prob
+    return case((a.is_(None) | b.is_(None), None), (a >= b, a), else_=b)
+
+
+def _count(counters, prediction, correct, sign, now):
+    c = counters.setdefault(prediction.model, {
+        "model": prediction.model, "resolved": 0, "correct": 0, "confidence_sum": 0.0,
+        "confidence_count": 0, "updated_at": now,
+    })
+    c["resolved"] += sign
+    if correct is True:
+        c["correct"] += sign
+    if prediction.fighter_a_prob is not None and prediction.fighter_b_prob is not None:
+        c["confidence_sum"] += sign * max(prediction.fighter_a_prob, prediction.fighter_b_prob)
+        c["confidence_count"] += sign
+
+
+def resolve_predictions(db, resolutions):
+    """
+    Record fight results on predictions and apply them to model_performance_stats.
+
+    Each prediction is updated with a compare-and-set on its previous result, so
+    two processes resolving the same prediction count it once. Re-resolving a
+    prediction to a different winner moves it between the counters.
+
+    Args:
+        db: Session the predictions were loaded in; the caller commits
+        resolutions: (prediction, actual_winner) pairs
+
+    Returns:
+        Number of predictions whose result changed
+    """
+    table = ModelPrediction.__table__
+    now = datetime.utcnow()
+    counters = {}
+    changed = 0
+    for prediction, actual_winner in resolutions:
+        correct = prediction.predicted_winner == actual_winner
+        previous_winner, previous_correct = prediction.actual_winner, prediction.correct
+        if previous_winner == actual_winner and previous_correct == correct:
+            continue
+        unchanged = table.c.actual_winner.is_(None) if previous_winner is None else table.c.actual_winner == previous_winner
+        result = db.execute(
+            update(table)
+            .where(table.c.id == prediction.id, unchanged)
+            .values(actual_winner=actual_winner, correct=correct)
+        )
+        if result.rowcount != 1:
+            continue
+        if previous_winner is not None:
+            _count(counters, prediction, previous_correct, -1, now)
+        _count(counters, prediction, correct, 1, now)
+        # Already written above; keep the ORM from issuing the same UPDATE again
+        set_committed_value(prediction, "actual_winner", actual_winner)
+        set_committed_value(prediction, "correct", correct)
+        changed += 1
+    if counters:
+        _increment_counters(db, ModelPerformanceStats, list(counters.values()), _COUNTER_COLUMNS)
+    return changed
+
+
+def rebuild_model_performance_stats(db):
+    """Recompute the counters from resolved predictions plus archived ones (session or connection; caller commits)"""
+    p = ModelPrediction
+    confidence = _confidence()
+    now = datetime.utcnow()
+    counters = {}
+    resolved = db.execute(
+        select(
+            p.model,
+            func.count().label("resolved"),
+            func.count(case((p.correct.is_(True), 1))).label("correct"),
+            func.coalesce(func.sum(confidence), 0.0).label("confidence_sum"),
+            func.count(confidence).label("confidence_count"),
+        )
+        .where(p.actual_winner.is_not(None))
+        .group_by(p.model)
+    )
+    archived = db.execute(select(*(ArchivedPredictionStats.__table__.c[c] for c in ("model",) + _COUNTER_COLUMNS)))
+    for row in list(resolved) + list(archived):
+        c = counters.setdefault(row.model, {
+            "model": row.model, "resolved": 0, "correct": 0, "confidence_sum": 0.0,
+            "confidence_count": 0, "updated_at": now,
+        })
+        for column in _COUNTER_COLUMNS:
+            c[column] += getattr(row, column)
+
+    db.execute(delete(ModelPerformanceStats))
+    if counters:
+        db.execute(insert(ModelPerformanceStats), list(counters.values()))
+    return counters
+
+
+def pending_stats_query():
+    """Per-model count and summed confidence of pending predictions"""
+    p = ModelPrediction
+    confidence = _confidence()
+    return (
+        select(
+            p.model,
+            func.count().label("total"),
+            func.coalesce(func.sum(confidence), 0.0).label("confidence_sum"),
+            func.count(confidence).label("confidence_count"),
+        )
+        .where(p.actual_winner.is_(None))
+        .group_by(p.model)
+    )
+
+
+def recent_results_query(limit=10):
+    """correct flags of the most recently logged resolved predictions"""
+    return (
+        select(ModelPrediction.correct)
+        .where(ModelPrediction.actual_winner.is_not(None))
+        .order_by(ModelPrediction.id.desc())
+        .limit(limit)
+    )
@@ -0,0 +1,39 @@
+"""
+Fighter name normalization shared by the scrapers and the DB layer.
+
+UFCStats, the UFC site and our own predictions spell the same fighter slightly
+differently (case, suffixes, quoted nicknames). Normalized names are stored in
+indexed columns so results can be matched with a lookup instead of normalizing
+every pending prediction in Python.
+"""
+
+NORM_PAIR_SEPARATOR = "|"
+
+
+def normalize_fighter_name(name: str) -> str:
+    """
+    Normalize fighter names for matching across different sources
+    Handles common variations in fighter name formatting
+    """
+    # Remove extra whitespace and convert to lowercase
+    name = name.strip().lower()
+    
+    # Remove common suffixes/prefixes
+    name = name.replace("jr.", "").replace("sr.", "").replace("iii", "").replace("ii", "")
+    
+    # Handle common nickname patterns
+    if '"' in name:
+        # Remove nicknames in quotes: John "The Hammer" Smith -> John Smith
+        parts = name.split('"')
+        name = (parts[0] + " " + parts[-1]).strip()
+    
+    # Remove extra spaces
+    name = " ".join(name.split())
+    
+    return name
+
+
+def make_norm_pair(fighter_a: str, fighter_b: str) -> str:
+    """Order-independent key of the two normalized names"""
+    first, second = sorted((normalize_fighter_name(fighter_a), normalize_fighter_name(fighter_b)))
+    return f"{first}{NORM_PAIR_SEPARATOR}{second}"
@@ -0,0 +1,46 @@
+"""
+Parsers for the physical attributes UFCStats shows as display strings.
+
+Fighter pages give height as `5' 11"`, weight as `155 lbs.` and reach as `72"`
+(or `--` when unknown). They are parsed once when a fighter is scraped and
+stored in numeric columns next to the original strings, so predictions and
+dataset builds read plain numbers instead of re-parsing text on every call.
+"""
+import re
+
+_HEIGHT_RE = re.compile(r"^\s*(\d+)'\s*(\d+(?:\.\d+)?)\s*\"?\s*$")
+_WEIGHT_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(?:lbs\.?)?\s*$")
+_REACH_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*\"?\s*$")
+
+
+def _match(pattern, value):
+    if value is None:
+        return None
+    return pattern.match(str(value))
+
+
+def parse_height(value):
+    """`5' 11"` -> 71.0 inches (None when missing or unparseable)"""
+    m = _match(_HEIGHT_RE, value)
+    return int(m.group(1)) * 12 + float(m.group(2)) if m else None
+
+
+def parse_weight(value):
+    """`155 lbs.` -> 155.0 lbs (None when missing or unparseable)"""
+    m = _match(_WEIGHT_RE, value)
+    return float(m.group(1)) if m else None
+
+
+def parse_reach(value):
+    """`72"` -> 72.0 inches (None for `--` or unparseable)"""
+    m = _match(_REACH_RE, value)
+    return float(m.group(1)) if m else None
+
+
+def parse_physical(height, weight, reach):
+    """Numeric column values for a fighter's height/weight/reach strings"""
+    return {
+        "height_in": parse_height(height),
+        "weight_lbs": parse_weight(weight),
+        "reach_in": parse_reach(reach),
+    }
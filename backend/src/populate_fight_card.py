@@ -1,7 +1,7 @@
 import sys
 from ufc_scraper import get_fight_card
 from fighter_scraper import scrape_fighter_stats, save_fighter_to_db
-from src.db import SessionLocal, Fighter
+from src.db import SessionLocal, Fighter, ensure_db
 
 
 def populate_fighters_from_event(event_url):
@@ -34,4 +34,5 @@ if __name__ == "__main__":
         event_url = "http://ufcstats.com/event-details/7b03d9df5910917d"  # fallback default
         print(f"ℹ️ No event URL provided. Using default:\n{event_url}\n")
 
+    ensure_db()
     populate_fighters_from_event(event_url)
@@ -0,0 +1,176 @@
+"""
+Hot/cold separation for model_predictions.
+
+The table only needs to hold what the API and scheduler jobs actually read:
+pending predictions and recently resolved ones. archive_predictions() moves
+resolved predictions older than PREDICTION_ARCHIVE_DAYS, and pending ones that
+never got a result within PENDING_EXPIRY_DAYS, into prediction_archive_batches
+(zlib-compressed columnar JSON, one row per batch) instead of deleting them.
+The pair_key migrations archive the duplicate predictions they drop the same
+way, with reason "duplicate" and no counter updates.
+
+Per-model counters in archived_prediction_stats are updated in the same
+transaction as each batch, so what was archived can be accounted for without
+reading the archive (lifetime stats are counted at resolution time, see
+src/model_performance.py).
+"""
+import json
+import os
+import zlib
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from src.db import ArchivedPredictionStats, ModelPrediction, PredictionArchiveBatch, _increment_counters
+
+ARCHIVE_DAYS_ENV = "PREDICTION_ARCHIVE_DAYS"
+DEFAULT_ARCHIVE_DAYS = 180
+PENDING_EXPIRY_DAYS_ENV = "PREDICTION_PENDING_EXPIRY_DAYS"
+DEFAULT_PENDING_EXPIRY_DAYS = 120
+ARCHIVE_BATCH_SIZE = 2000
+ARCHIVE_ENCODING = "json+zlib"
+
+_COUNTER_COLUMNS = ("resolved", "correct", "confidence_sum", "confidence_count", "expired")
+
+
+def archive_cutoffs(now=None):
+    """(resolved_before, pending_before) from the configured retention windows"""
+    now = now or datetime.utcnow()
+    archive_days = int(os.getenv(ARCHIVE_DAYS_ENV, DEFAULT_ARCHIVE_DAYS))
+    pending_days = int(os.getenv(PENDING_EXPIRY_DAYS_ENV, DEFAULT_PENDING_EXPIRY_DAYS))
+    return now - timedelta(days=archive_days), now - timedelta(days=pending_days)
+
+
+def _encode_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _encode_batch(rows, columns):
+    """Columnar JSON ({column: [values]}) compresses far better than one object per row"""
+    data = {column: [_encode_value(row[column]) for row in rows] for column in columns}
+    return zlib.compress(json.dumps(data, separators=(",", ":")).encode("utf-8"), 9)
+
+
+def _batch_values(rows, columns, reason, now):
+    """Column values of the PredictionArchiveBatch holding rows"""
+    timestamps = [row["timestamp"] for row in rows if row["timestamp"] is not None]
+    return {
+        "archived_at": now,
+        "reason": reason,
+        "first_timestamp": min(timestamps) if timestamps else None,
+        "last_timestamp": max(timestamps) if timestamps else None,
+        "row_count": len(rows),
+        "encoding": ARCHIVE_ENCODING,
+        "payload": _encode_batch(rows, columns),
+    }
+
+
+def load_archive_batch(batch):
+    """Rows of one PredictionArchiveBatch as dicts with model_predictions' columns"""
+    if batch.encoding != ARCHIVE_ENCODING:
+        raise ValueError(f"Unknown archive encoding: {batch.encoding}")
+    data = json.loads(zlib.decompress(batch.payload).decode("utf-8"))
+    if data.get("timestamp"):
+        data["timestamp"] = [datetime.fromisoformat(v) if v else None for v in data["timestamp"]]
+    columns = list(data)
+    return [dict(zip(columns, values)) for values in zip(*(data[c] for c in columns))]
+
+
+def iter_archived_predictions(db, reason=None):
+    """All archived predictions, oldest batch first (for audits and re-training)"""
+    query = select(PredictionArchiveBatch).order_by(PredictionArchiveBatch.id)
+    if reason is not None:
+        query = query.where(PredictionArchiveBatch.reason == reason)
+    for batch in db.execute(query).scalars():
+        yield from load_archive_batch(batch)
+
+
+def _batch_counters(rows, reason, now):
+    counters = {}
+    for row in rows:
+        c = counters.setdefault(row["model"], {
+            "model": row["model"], "resolved": 0, "correct": 0, "confidence_sum": 0.0,
+            "confidence_count": 0, "expired": 0, "updated_at": now,
+        })
+        if reason == "expired":
+            c["expired"] += 1
+            continue
+        c["resolved"] += 1
+        if row["correct"] is True:
+            c["correct"] += 1
+        if row["fighter_a_prob"] is not None and row["fighter_b_prob"] is not None:
+            c["confidence_sum"] += max(row["fighter_a_prob"], row["fighter_b_prob"])
+            c["confidence_count"] += 1
+    return list(counters.values())
+
+
+def _archive_where(db, reason, condition, batch_size):
+    """Move rows matching condition in batches of batch_size; one transaction per batch"""
+    table = ModelPrediction.__table__
+    columns = [column.name for column in table.columns]
+    moved = batches = 0
+    last_id = 0
+    while True:
+        rows = db.execute(
+            select(table).where(condition, table.c.id > last_id).order_by(table.c.id).limit(batch_size)
+        ).mappings().all()
+        if not rows:
+            break
+        now = datetime.utcnow()
+        ids = [row["id"] for row in rows]
+        try:
+            db.add(PredictionArchiveBatch(**_batch_values(rows, columns, reason, now)))
+            _increment_counters(db, ArchivedPredictionStats, _batch_counters(rows, reason, now), _COUNTER_COLUMNS)
+            db.execute(delete(ModelPrediction).where(ModelPrediction.id.in_(ids)))
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        moved += len(rows)
+        batches += 1
+        last_id = ids[-1]
+    return moved, batches
+
+
+def archive_predictions(db, resolved_before=None, pending_before=None, batch_size=ARCHIVE_BATCH_SIZE):
+    """
+    Move cold predictions out of model_predictions.
+
+    Args:
+        db: Session; each batch is committed on it
+        resolved_before: Archive resolved predictions made before this (default: PREDICTION_ARCHIVE_DAYS ago)
+        pending_before: Archive still-pending predictions made before this (default: PENDING_EXPIRY_DAYS ago)
+        batch_size: Rows per archive batch and transaction
+
+    Returns:
+        Dict with archived_resolved, expired_pending and archive_batches
+    """
+    default_resolved, default_pending = archive_cutoffs()
+    resolved_before = resolved_before or default_resolved
+    pending_before = pending_before or default_pending
+
+    archived_resolved, resolved_batches = _archive_where(
+        db, "resolved",
+        (ModelPrediction.actual_winner.is_not(None)) & (ModelPrediction.timestamp < resolved_before),
+        batch_size,
+    )
+    expired_pending, expired_batches = _archive_where(
+        db, "expired",
+        (ModelPrediction.actual_winner.is_(None)) & (ModelPrediction.timestamp < pending_before),
+        batch_size,
+    )
+    return {
+        "archived_resolved": archived_resolved,
+        "expired_pending": expired_pending,
+        "archive_batches": resolved_batches + expired_batches,
+        "resolved_before": resolved_before.isoformat(),
+        "pending_before": pending_before.isoformat(),
+    }
+
+
+def archived_stats(db):
+    """{model: counters} of everything archived so far"""
+    return {
+        stats.model: {column: getattr(stats, column) for column in _COUNTER_COLUMNS}
+        for stats in db.execute(select(ArchivedPredictionStats)).scalars()
+    }
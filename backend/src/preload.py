@@ -0,0 +1,63 @@
+"""
+Hooks for running under gunicorn with preload_app (see gunicorn.conf.py).
+
+warm() runs once in the master after the app is imported: it loads the heavy,
+read-only state every worker needs so forked workers share those pages
+copy-on-write instead of each building their own. after_fork() runs in every
+worker and drops anything that must not be shared across processes.
+"""
+import gc
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def warm():
+    """Initialize the database and load the ML stack, the served model, the fighter snapshot and search index in this process"""
+    from src import startup_timeline
+    from src.db import ensure_db
+
+    with startup_timeline.step("init_db"):
+        ensure_db()
+    with startup_timeline.step("import_ml_stack"):
+        import pandas  # noqa: F401
+        import sklearn  # noqa: F401
+        import xgboost  # noqa: F401
+    from src.fighter_store import get_fighter_store
+    from src.ml.model_registry import get_registry
+
+    try:
+        with startup_timeline.step("load_model"):
+            get_registry().get_model()
+    except Exception as e:
+        logger.warning(f"Could not preload ML model: {e}")
+    try:
+        with startup_timeline.step("load_fighter_snapshot"):
+            get_fighter_store().refresh(force=True)
+    except Exception as e:
+        logger.warning(f"Could not preload fighter snapshot: {e}")
+    try:
+        from src.fighter_search import get_fighter_search
+
+        with startup_timeline.step("load_fighter_search"):
+            get_fighter_search().refresh(force=True)
+    except Exception as e:
+        logger.warning(f"Could not preload fighter search index: {e}")
+    startup_timeline.stop_import_timing()
+
+    # Move everything loaded so far out of the collector's reach: a GC pass in a
+    # worker would otherwise write to these objects' headers and un-share the pages
+    gc.collect()
+    gc.freeze()
+
+
+def after_fork():
+    """Per-worker setup: connections must never be shared between processes"""
+    from src import startup_timeline
+    from src.db_async import dispose_after_fork as dispose_async_after_fork
+    from src.db_engine import dispose_after_fork
+
+    startup_timeline.mark("worker_forked")
+    # Forget the master's pooled connections without closing them under its feet
+    dispose_after_fork()
+    dispose_async_after_fork()
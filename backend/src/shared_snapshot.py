@@ -0,0 +1,176 @@
+"""
+A JSON value that is expensive to build (e.g. scraped from ufcstats.com), cached
+for every worker at once.
+
+The value is kept in memory and in scheduler_metadata, so all gunicorn workers
+(and instances) share one copy. It is rebuilt at most once per ttl: a per-process
+lock stops threads from building it together and a lease row in the same table
+stops workers from doing so. Once the value is older than ttl, the cached copy
+keeps being served (for up to `stale` more seconds) while one background thread
+rebuilds it; only a missing or too-old value makes a request wait for a build.
+"""
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import Float, cast, select
+
+logger = logging.getLogger(__name__)
+
+# How often a worker looks for a value another worker stored
+SHARED_CHECK_SECONDS = 5
+
+
+class SharedSnapshot:
+    def __init__(self, key, build, ttl, stale, lease_seconds=120):
+        self.key = key
+        self.lease_key = f"{key}_refresh_lease"
+        self.build = build
+        self.ttl = ttl
+        self.stale = stale
+        self.lease_seconds = lease_seconds
+        self._value = None
+        self._built_at = 0.0
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def _age(self, now):
+        return now - self._built_at if self._value is not None else None
+
+    def get(self):
+        """The cached value, rebuilding it (in the background when a stale copy can be served) as needed"""
+        now = time.time()
+        age = self._age(now)
+        if age is not None and age < self.ttl:
+            return self._value
+        if now >= self._next_check:
+            self._next_check = now + SHARED_CHECK_SECONDS
+            self._adopt_shared()
+            age = self._age(now)
+            if age is not None and age < self.ttl:
+                return self._value
+        if age is not None and age < self.ttl + self.stale:
+            self._refresh_in_background()
+            return self._value
+        return self.refresh()
+
+    def refresh(self, force=False):
+        """Build and publish the value now (unless another thread just did)"""
+        with self._lock:
+            age = self._age(time.time())
+            if not force and age is not None and age < self.ttl:
+                return self._value
+            leased = self._claim_lease()
+            if not leased and age is not None:
+                # Another worker is rebuilding; keep serving what we have
+                return self._value
+            try:
+                value = self.build()
+                built_at = time.time()
+                self._store_shared(value, built_at)
+                self._value, self._built_at = value, built_at
+                return value
+            finally:
+                if leased:
+                    self._release_lease()
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning(f"Background refresh of {self.key} failed, serving the cached copy: {e}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=run, name=f"refresh-{self.key}", daemon=True).start()
+
+    def invalidate(self):
+        """Make the next get() rebuild (stale copy still served meanwhile)"""
+        self._built_at = 0.0
+        self._next_check = 0.0
+
+    def _adopt_shared(self):
+        from src.db import SessionLocal, SchedulerMetadata
+
+        try:
+            db = SessionLocal()
+            try:
+                stored = db.execute(
+                    select(SchedulerMetadata.value).where(SchedulerMetadata.key == self.key)
+                ).scalar_one_or_none()
+            finally:
+                db.close()
+            if stored:
+                payload = json.loads(stored)
+                if payload["built_at"] > self._built_at:
+                    self._value, self._built_at = payload["value"], payload["built_at"]
+        except Exception as e:
+            logger.warning(f"Could not read shared {self.key}: {e}")
+
+    def _upsert_metadata(self, db, key, value, where=None):
+        from src.db import SchedulerMetadata, _dialect_insert
+
+        insert = _dialect_insert(db.get_bind(), SchedulerMetadata).values(
+            key=key, value=value, updated_at=datetime.utcnow()
+        )
+        return db.execute(insert.on_conflict_do_update(
+            index_elements=["key"],
+            set_={"value": insert.excluded.value, "updated_at": insert.excluded.updated_at},
+            where=where,
+        ))
+
+    def _store_shared(self, value, built_at):
+        from src.db import SessionLocal
+
+        try:
+            db = SessionLocal()
+            try:
+                self._upsert_metadata(db, self.key, json.dumps({"built_at": built_at, "value": value}))
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Could not share {self.key}: {e}")
+
+    def _claim_lease(self):
+        """True when this process may rebuild (no other worker holds an unexpired lease)"""
+        from src.db import SessionLocal, SchedulerMetadata
+
+        now = time.time()
+        try:
+            db = SessionLocal()
+            try:
+                result = self._upsert_metadata(
+                    db, self.lease_key, str(now + self.lease_seconds),
+                    where=cast(SchedulerMetadata.value, Float) < now,
+                )
+                db.commit()
+                return result.rowcount == 1
+            finally:
+                db.close()
+        except Exception as e:
+            # Without the shared table, fall back to building per process
+            logger.warning(f"Could not claim {self.lease_key}: {e}")
+            return True
+
+    def _release_lease(self):
+        from src.db import SessionLocal
+
+        try:
+            db = SessionLocal()
+            try:
+                self._upsert_metadata(db, self.lease_key, "0")
+                db.commit()
+            finally:
+                db.close()
+        except Exception as e:
+            logger.warning(f"Could not release {self.lease_key}: {e}")
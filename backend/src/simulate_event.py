@@ -2,19 +2,23 @@ import sys
 from ufc_scraper import get_fight_card
 from fight_model import calculate_exchange_probabilities
 from simulate_fight import simulate_fight
-from src.db import SessionLocal, Fighter
+from src.db import SessionLocal
+from src.fighter_stats import load_fighter_stats
 
 def simulate_event(event_url):
     print(f"\nSimulating fights for event: {event_url}\n")
     card = get_fight_card(event_url)
     db = SessionLocal()
+    # Every fighter on the card in one query
+    fighters = load_fighter_stats(db, {name for fight in card for name in (fight['fighter_a'], fight['fighter_b'])})
+    db.close()
 
     for fight in card:
         name_a = fight['fighter_a']
         name_b = fight['fighter_b']
 
-        fighter_a = db.query(Fighter).filter(Fighter.name == name_a).first()
-        fighter_b = db.query(Fighter).filter(Fighter.name == name_b).first()
+        fighter_a = fighters.get(name_a)
+        fighter_b = fighters.get(name_b)
 
         if not fighter_a or not fighter_b:
             print(f"Missing stats for {name_a} or {name_b}, skipping...\n")
@@ -35,8 +39,6 @@ def simulate_event(event_url):
         print(f"Draw rate: {results['Draw']:.1f}%")
         print("-" * 50)
 
-    db.close()
-
 if __name__ == "__main__":
     if len(sys.argv) > 1:
         event_url = sys.argv[1]
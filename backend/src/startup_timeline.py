@@ -0,0 +1,160 @@
+"""
+Where a cold start's time goes (served at /debug/startup).
+
+main imports this module first. The startup code records named steps
+(database init, model load, scheduler start) and one-off marks (app imported,
+first request served). With STARTUP_IMPORT_TIMING=1, every module import from
+then until stop_import_timing() is also timed (cumulative, and self time
+excluding nested imports); this wraps the import system's loaders, so it is
+off unless asked for.
+Offsets are seconds since this module was imported; with gunicorn preload the
+master's imports and steps are inherited by every forked worker, which then
+adds its own marks.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+IMPORT_TIMING_ENV = "STARTUP_IMPORT_TIMING"
+
+_started = time.perf_counter()
+_started_at = datetime.utcnow()
+
+_marks = {}
+_steps = []
+_imports = {}
+_local = threading.local()
+_patched = []
+
+
+def _process_age():
+    """Seconds since the OS started this process (Linux only; None elsewhere)"""
+    try:
+        with open("/proc/self/stat") as f:
+            # The command name may contain spaces; fields after it are fixed
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+# Interpreter startup plus whatever the server imported before the app
+_before_timeline = _process_age()
+
+
+def _timed_exec_module(exec_module):
+    def exec_module_timed(loader, module):
+        stack = _local.__dict__.setdefault("stack", [])
+        start = time.perf_counter()
+        stack.append(0.0)
+        try:
+            return exec_module(loader, module)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            _imports[module.__name__] = (elapsed, elapsed - nested)
+
+    exec_module_timed.__wrapped__ = exec_module
+    return exec_module_timed
+
+
+def start_import_timing():
+    """Time source and extension module imports from now on"""
+    if _patched:
+        return
+    from importlib import _bootstrap_external
+
+    for loader_class in (_bootstrap_external._LoaderBasics, _bootstrap_external.ExtensionFileLoader):
+        original = loader_class.__dict__.get("exec_module")
+        if original is not None:
+            loader_class.exec_module = _timed_exec_module(original)
+            _patched.append((loader_class, original))
+
+
+def stop_import_timing():
+    """Restore the import system once startup is over"""
+    while _patched:
+        loader_class, original = _patched.pop()
+        loader_class.exec_module = original
+
+
+def _offset():
+    return round(time.perf_counter() - _started, 4)
+
+
+def mark(name):
+    """Record the first time name happens in this process; True if this was it"""
+    if name in _marks:
+        return False
+    _marks[name] = _offset()
+    return True
+
+
+@contextmanager
+def step(name):
+    """Time a startup step"""
+    start = _offset()
+    try:
+        yield
+    finally:
+        _steps.append({"name": name, "pid": os.getpid(), "start": start, "seconds": round(_offset() - start, 4)})
+
+
+class FirstRequestMiddleware:
+    """Pure ASGI middleware marking the first request and response; a pass-through afterwards"""
+
+    def __init__(self, app):
+        self.app = app
+        self.seen = False
+
+    async def __call__(self, scope, receive, send):
+        if self.seen or scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        self.seen = True
+        mark("first_request")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            mark("first_response")
+
+
+def report(top=25):
+    """Timeline of this process: marks, steps and the slowest imports"""
+    imports = sorted(_imports.items(), key=lambda item: item[1][1], reverse=True)
+    app_modules = sorted(
+        ((name, times) for name, times in _imports.items() if name.startswith("src.")),
+        key=lambda item: item[1][0],
+        reverse=True,
+    )
+
+    def timing(name, times):
+        return {"module": name, "cumulative": round(times[0], 4), "self": round(times[1], 4)}
+
+    return {
+        "pid": os.getpid(),
+        "started_at": _started_at.isoformat(),
+        "process_started_at": (
+            (_started_at - timedelta(seconds=_before_timeline)).isoformat() if _before_timeline is not None else None
+        ),
+        "before_app_import_seconds": round(_before_timeline, 4) if _before_timeline is not None else None,
+        "uptime_seconds": _offset(),
+        "marks": dict(sorted(_marks.items(), key=lambda item: item[1])),
+        "steps": list(_steps),
+        "imports": {
+            "timing": bool(_patched),
+            "count": len(_imports),
+            "total_seconds": round(sum(times[1] for times in _imports.values()), 4),
+            "slowest": [timing(name, times) for name, times in imports[:top]],
+            "app_modules": [timing(name, times) for name, times in app_modules],
+        },
+    }
+
+
+if os.getenv(IMPORT_TIMING_ENV, "").lower() in ("1", "true", "yes"):
+    start_import_timing()
@@ -6,8 +6,9 @@ Handles automated data updates for UFC events, fighter profiles, and results.
 
 import logging
 import traceback
+from collections import defaultdict
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from sqlalchemy import or_, and_
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
@@ -19,11 +20,18 @@ from src.db import (
     Fighter,
     SchedulerMetadata,
     FightResult,
-    upsert_fight_result,
+    log_predictions_bulk,
+    make_pair_key,
+    upsert_fight_results,
 )
+from src.db_engine import get_database_url, get_engine, pool_stats, statement_timeout
 from src.ufc_scraper import get_upcoming_event_links, get_fight_card
-from src.ensemble_predict import get_ensemble_prediction
+from src.names import make_norm_pair, normalize_fighter_name
+from src.ensemble_predict import get_ensemble_prediction, get_all_predictions, prediction_row
 from src.fighter_scraper import scrape_fighter_stats, save_fighter_to_db
+from src.fighter_store import get_fighter_store
+from src.model_performance import resolve_predictions
+from src.prediction_archive import archive_predictions
 from src.ml.scrape_fighter_outcomes import scrape_all_fighters
 import os
 
@@ -38,11 +46,12 @@ class UFCScheduler:
         # Azure-friendly configuration
         self.database_url = database_url
         
-        # Configure job store to use the same database
+        # Configure job store to use the same database (and connection pool) as the app
         # Wrap in try-except to handle serialization errors from corrupted jobs
         try:
+            engine = get_engine() if database_url == get_database_url() else None
             jobstores = {
-                'default': SQLAlchemyJobStore(url=database_url, tablename='scheduled_jobs')
+                'default': SQLAlchemyJobStore(url=database_url, engine=engine, tablename='scheduled_jobs')
             }
         except Exception as e:
             logger.warning(f"Failed to initialize job store, using memory store: {e}")
@@ -190,6 +199,7 @@ class UFCScheduler:
                         continue
                     
                     # Generate predictions for each fight
+                    card_rows = []
                     for fight in fight_card:
                         fighter_a = fight["fighter_a"]
                         fighter_b = fight["fighter_b"]
@@ -199,8 +209,7 @@ class UFCScheduler:
                         # Check if predictions already exist
                         db = SessionLocal()
                         existing = db.query(ModelPrediction).filter(
-                            ModelPrediction.fighter_a == fighter_a,
-                            ModelPrediction.fighter_b == fighter_b
+                            ModelPrediction.pair_key == make_pair_key(fighter_a, fighter_b)
                         ).first()
                         
                         if existing:
@@ -211,7 +220,7 @@ class UFCScheduler:
                         from src.fighter_scraper import scrape_fighter_stats
                         from src.ufc_image_scraper import get_fighter_image_url
                         
-                        f1 = db.query(Fighter).filter(Fighter.name == fighter_a).first()
+                        f1 = get_fighter_store().get(fighter_a)
                         if not f1 and url_a:
                             logger.info(f"Fighter {fighter_a} not found in database, scraping data...")
                             try:
@@ -221,12 +230,12 @@ class UFCScheduler:
                                     if image_url:
                                         stats["image_url"] = image_url
                                     save_fighter_to_db(stats)
-                                    f1 = db.query(Fighter).filter(Fighter.name == fighter_a).first()
+                                    f1 = get_fighter_store().get(fighter_a)
                                     logger.info(f"Successfully scraped and saved data for {fighter_a}")
                             except Exception as scrape_error:
                                 logger.error(f"Failed to scrape data for {fighter_a}: {scrape_error}")
                         
-                        f2 = db.query(Fighter).filter(Fighter.name == fighter_b).first()
+                        f2 = get_fighter_store().get(fighter_b)
                         if not f2 and url_b:
                             logger.info(f"Fighter {fighter_b} not found in database, scraping data...")
                             try:
@@ -236,7 +245,7 @@ class UFCScheduler:
                                     if image_url:
                                         stats["image_url"] = image_url
                                     save_fighter_to_db(stats)
-                                    f2 = db.query(Fighter).filter(Fighter.name == fighter_b).first()
+                                    f2 = get_fighter_store().get(fighter_b)
                                     logger.info(f"Successfully scraped and saved data for {fighter_b}")
                             except Exception as scrape_error:
                                 logger.error(f"Failed to scrape data for {fighter_b}: {scrape_error}")
@@ -250,12 +259,17 @@ class UFCScheduler:
                         
                         # Generate predictions for all three models
                         try:
-                            result = get_ensemble_prediction(fighter_a, fighter_b)
-                            if result and not result.get('error'):
-                                new_predictions += 3  # ML, Ensemble, Sim
+                            results = get_all_predictions(fighter_a, fighter_b, log_to_db=False)
+                            if results:
+                                card_rows.extend(prediction_row(r) for r in results.values())
+                                new_predictions += len(results)  # ML, Ensemble, Sim
                                 logger.info(f"Generated predictions for {fighter_a} vs {fighter_b}")
                         except Exception as e:
                             logger.error(f"Failed to generate prediction for {fighter_a} vs {fighter_b}: {e}")
+                    
+                    # Write the whole card in one transaction
+                    if card_rows:
+                        log_predictions_bulk(card_rows)
                 
                 except Exception as e:
                     logger.error(f"Error processing event {event.get('title', 'Unknown')}: {e}")
@@ -327,7 +341,9 @@ class UFCScheduler:
         """Manual trigger for checking completed events (called from API)"""
         try:
             logger.info("Manual trigger: Checking completed events...")
-            result = job_check_completed_events()  # This now returns a dict with results
+            # Runs in the request thread; batch work must not get the API statement timeout
+            with statement_timeout(None):
+                result = job_check_completed_events()  # This now returns a dict with results
             
             if "error" in result:
                 return {"error": result["error"]}
@@ -355,7 +371,8 @@ class UFCScheduler:
         """Manual trigger for checking new events (called from API)"""
         try:
             logger.info("Manual trigger: Checking new events...")
-            job_check_new_events()  # Call the module-level function
+            with statement_timeout(None):
+                job_check_new_events()  # Call the module-level function
             return {
                 "message": "Manual event check completed",
                 "timestamp": datetime.utcnow().isoformat()
@@ -398,30 +415,23 @@ class UFCScheduler:
             return {"error": str(e)}
     
     def _cleanup_old_predictions(self):
-        """Clean up predictions older than 120 days but keep lifetime records"""
+        """Archive old resolved and stale pending predictions, keeping lifetime stats"""
         try:
             logger.info("Starting prediction cleanup...")
             self.last_cleanup = datetime.utcnow()
             
-            # Calculate cutoff date (120 days ago)
-            cutoff_date = datetime.utcnow() - timedelta(days=120)
-            
+            # Move old resolved and stale pending predictions to the archive (counters keep lifetime stats)
             db = SessionLocal()
+            try:
+                archived = archive_predictions(db)
+            finally:
+                db.close()
             
-            # Delete old predictions (keep results for statistics)
-            # We might want to archive rather than delete, or only delete pending predictions
-            old_pending = db.query(ModelPrediction).filter(
-                ModelPrediction.timestamp < cutoff_date,
-                ModelPrediction.actual_winner.is_(None)  # Only delete pending predictions
+            logger.info(
+                f"Cleanup completed. Archived {archived['archived_resolved']} resolved and "
+                f"{archived['expired_pending']} stale pending predictions"
             )
             
-            count = old_pending.count()
-            old_pending.delete()
-            db.commit()
-            db.close()
-            
-            logger.info(f"Cleanup completed. Removed {count} old pending predictions")
-            
         except Exception as e:
             logger.error(f"Error during cleanup: {e}")
             logger.error(traceback.format_exc())
@@ -512,7 +522,8 @@ class UFCScheduler:
             'last_profile_update': self.last_profile_update.isoformat() if self.last_profile_update else None,
             'last_result_check': self.last_result_check.isoformat() if self.last_result_check else None,
             'last_cleanup': self.last_cleanup.isoformat() if self.last_cleanup else None,
-            'last_ml_retrain': self.last_ml_retrain.isoformat() if self.last_ml_retrain else None
+            'last_ml_retrain': self.last_ml_retrain.isoformat() if self.last_ml_retrain else None,
+            'db_pool': pool_stats()
         }
     
     def _job_executed(self, event):
@@ -563,14 +574,10 @@ class UFCScheduler:
             # Trigger retraining process
             logger.info(f"Retraining ML model with {new_results_count} new results...")
             
-            # Step 1: Rebuild dataset
-            from src.ml.prepare_ml_dataset import build_dataset
-            build_dataset()
-            logger.info("Dataset rebuilt with latest results")
-            
-            # Step 2: Retrain model
-            from src.ml.train_model import retrain_model
-            model_metrics = retrain_model()
+            # Steps 1-2: Rebuild dataset and retrain in a CPU-capped subprocess; the
+            # new model is validated and promoted there before this returns
+            from src.ml.retrain_worker import run_retrain
+            model_metrics = run_retrain()
             logger.info(f"Model retrained successfully: {model_metrics}")
             
             # Step 3: Update timestamp
@@ -609,7 +616,8 @@ class UFCScheduler:
         """Manual trigger for ML model retraining (called from API)"""
         try:
             logger.info(f"Manual trigger: ML model retraining (min_new_results={min_new_results}, force={force})...")
-            result = self._retrain_ml_model(min_new_results, force=force)
+            with statement_timeout(None):
+                result = self._retrain_ml_model(min_new_results, force=force)
             return result
         except Exception as e:
             logger.error(f"Manual ML retraining failed: {e}")
@@ -620,7 +628,8 @@ class UFCScheduler:
         """Manual trigger for cleaning up old predictions (called from API)"""
         try:
             logger.info("Manual trigger: Cleaning up old predictions...")
-            result = job_cleanup_old_predictions()
+            with statement_timeout(None):
+                result = job_cleanup_old_predictions()
             if not result:
                 return {"message": "Cleanup completed", "deleted_predictions": 0}
             return result
@@ -656,6 +665,7 @@ def job_check_new_events():
                     continue
                 
                 # Generate predictions for each fight
+                card_rows = []
                 for fight in fight_card:
                     fighter_a = fight["fighter_a"]
                     fighter_b = fight["fighter_b"]
@@ -665,8 +675,7 @@ def job_check_new_events():
                     # Check if predictions already exist
                     db = SessionLocal()
                     existing = db.query(ModelPrediction).filter(
-                        ModelPrediction.fighter_a == fighter_a,
-                        ModelPrediction.fighter_b == fighter_b
+                        ModelPrediction.pair_key == make_pair_key(fighter_a, fighter_b)
                     ).first()
                     
                     if existing:
@@ -676,7 +685,7 @@ def job_check_new_events():
                     # Check if fighters exist in database, scrape if missing (like simulate event endpoint)
                     from src.ufc_image_scraper import get_fighter_image_url
                     
-                    f1 = db.query(Fighter).filter(Fighter.name == fighter_a).first()
+                    f1 = get_fighter_store().get(fighter_a)
                     if not f1 and url_a:
                         logger.info(f"Fighter {fighter_a} not found in database, scraping data...")
                         try:
@@ -686,12 +695,12 @@ def job_check_new_events():
                                 if image_url:
                                     stats["image_url"] = image_url
                                 save_fighter_to_db(stats)
-                                f1 = db.query(Fighter).filter(Fighter.name == fighter_a).first()
+                                f1 = get_fighter_store().get(fighter_a)
                                 logger.info(f"Successfully scraped and saved data for {fighter_a}")
                         except Exception as scrape_error:
                             logger.error(f"Failed to scrape data for {fighter_a}: {scrape_error}")
                     
-                    f2 = db.query(Fighter).filter(Fighter.name == fighter_b).first()
+                    f2 = get_fighter_store().get(fighter_b)
                     if not f2 and url_b:
                         logger.info(f"Fighter {fighter_b} not found in database, scraping data...")
                         try:
@@ -701,7 +710,7 @@ def job_check_new_events():
                                 if image_url:
                                     stats["image_url"] = image_url
                                 save_fighter_to_db(stats)
-                                f2 = db.query(Fighter).filter(Fighter.name == fighter_b).first()
+                                f2 = get_fighter_store().get(fighter_b)
                                 logger.info(f"Successfully scraped and saved data for {fighter_b}")
                         except Exception as scrape_error:
                             logger.error(f"Failed to scrape data for {fighter_b}: {scrape_error}")
@@ -717,23 +726,14 @@ def job_check_new_events():
                     try:
                         predictions_created = 0
                         
-                        # Generate ML prediction
-                        ml_result = get_ensemble_prediction(fighter_a, fighter_b, model_type="ml", log_to_db=True)
-                        if ml_result and not ml_result.get('error'):
-                            predictions_created += 1
-                            logger.info(f"Generated ML prediction for {fighter_a} vs {fighter_b}")
-                        
-                        # Generate Ensemble prediction  
-                        ensemble_result = get_ensemble_prediction(fighter_a, fighter_b, model_type="ensemble", log_to_db=True)
-                        if ensemble_result and not ensemble_result.get('error'):
-                            predictions_created += 1
-                            logger.info(f"Generated Ensemble prediction for {fighter_a} vs {fighter_b}")
-                        
-                        # Generate Simulation prediction
-                        sim_result = get_ensemble_prediction(fighter_a, fighter_b, model_type="sim", log_to_db=True)
-                        if sim_result and not sim_result.get('error'):
-                            predictions_created += 1
-                            logger.info(f"Generated Simulation prediction for {fighter_a} vs {fighter_b}")
+                        # ML and simulation run once; all three model outputs are derived from them
+                        results = get_all_predictions(fighter_a, fighter_b, log_to_db=False)
+                        for model_type, label in (("ml", "ML"), ("ensemble", "Ensemble"), ("sim", "Simulation")):
+                            result = results.get(model_type)
+                            if result and not result.get('error'):
+                                card_rows.append(prediction_row(result))
+                                predictions_created += 1
+                                logger.info(f"Generated {label} prediction for {fighter_a} vs {fighter_b}")
                         
                         new_predictions += predictions_created
                         
@@ -744,6 +744,11 @@ def job_check_new_events():
                             
                     except Exception as e:
                         logger.error(f"Failed to generate predictions for {fighter_a} vs {fighter_b}: {e}")
+                
+                # Write the whole card in one transaction
+                if card_rows:
+                    written = log_predictions_bulk(card_rows)
+                    logger.info(f"Logged {written} predictions for {event_title}")
             
             except Exception as e:
                 logger.error(f"Error processing event {event.get('title', 'Unknown')}: {e}")
@@ -827,7 +832,7 @@ def job_check_completed_events():
     try:
         logger.info("Checking for completed events and updating results...")
         
-        from src.ufc_scraper import get_completed_event_links, get_fight_results, normalize_fighter_name
+        from src.ufc_scraper import get_completed_event_links, get_fight_results
         
         # Get completed events from the last 7 days
         completed_events = get_completed_event_links(days_back=7)
@@ -844,6 +849,7 @@ def job_check_completed_events():
         
         db = SessionLocal()
         total_updated = 0
+        total_results_written = 0
         total_fight_results_found = 0
         detailed_results = []
         
@@ -857,7 +863,19 @@ def job_check_completed_events():
                     total_fight_results_found += len(fight_results)
                     logger.info(f"Found {len(fight_results)} fight results for {event['title']}")
                     
+                    # One indexed lookup for every bout on the card
+                    card_pairs = {make_norm_pair(r['fighter_a'], r['fighter_b']) for r in fight_results}
+                    pending_by_pair = defaultdict(list)
+                    if card_pairs:
+                        for prediction in db.query(ModelPrediction).filter(
+                            ModelPrediction.actual_winner.is_(None),
+                            ModelPrediction.pair_norm.in_(card_pairs)
+                        ):
+                            pending_by_pair[prediction.pair_norm].append(prediction)
+                    
                     event_matches = 0
+                    event_results = []
+                    event_resolutions = []
                     for result in fight_results:
                         try:
                             fighter_a_norm = normalize_fighter_name(result['fighter_a'])
@@ -867,10 +885,8 @@ def job_check_completed_events():
                             fighter_b_raw = result['fighter_b']
                             winner_raw = result['winner']
                             
-                            # Find matching predictions in database
-                            predictions = db.query(ModelPrediction).filter(
-                                ModelPrediction.actual_winner.is_(None)
-                            ).all()
+                            # Pending predictions for this bout (either fighter order)
+                            predictions = pending_by_pair.get(make_norm_pair(fighter_a_raw, fighter_b_raw), [])
                             
                             fight_matched = False
                             for prediction in predictions:
@@ -890,11 +906,10 @@ def job_check_completed_events():
                                         logger.warning(f"Winner {result['winner']} doesn't match either fighter in prediction")
                                         continue
                                     
-                                    # Update the prediction with actual result
-                                    prediction.actual_winner = actual_winner
-                                    prediction.correct = (prediction.predicted_winner == actual_winner)
+                                    # Update the prediction with actual result (with the event's other results below)
+                                    event_resolutions.append((prediction, actual_winner))
                                     
-                                    logger.info(f"Updated prediction: {prediction.fighter_a} vs {prediction.fighter_b} - Winner: {actual_winner}, Correct: {prediction.correct}")
+                                    logger.info(f"Updated prediction: {prediction.fighter_a} vs {prediction.fighter_b} - Winner: {actual_winner}, Correct: {prediction.predicted_winner == actual_winner}")
                                     total_updated += 1
                                     event_matches += 1
                                     fight_matched = True
@@ -907,22 +922,14 @@ def job_check_completed_events():
                                 loser_raw = fighter_a_raw
 
                             if loser_raw:
-                                upsert_fight_result(
-                                    db,
-                                    fighter_name=winner_raw,
-                                    opponent_name=loser_raw,
-                                    result="win",
-                                    event=event['title'],
-                                    event_date=event.get('date') or event.get('date_text'),
-                                )
-                                upsert_fight_result(
-                                    db,
-                                    fighter_name=loser_raw,
-                                    opponent_name=winner_raw,
-                                    result="loss",
-                                    event=event['title'],
-                                    event_date=event.get('date') or event.get('date_text'),
-                                )
+                                # Written (both sides) in one batch per event below
+                                event_results.append({
+                                    "fighter_name": winner_raw,
+                                    "opponent_name": loser_raw,
+                                    "result": "win",
+                                    "event": event['title'],
+                                    "event_date": event.get('date') or event.get('date_text'),
+                                })
                             else:
                                 logger.warning(f"Could not determine loser for fight result: {result}")
 
@@ -940,15 +947,21 @@ def job_check_completed_events():
                             logger.error(f"Error processing fight result {result}: {e}")
                             continue
                     
+                    if event_resolutions:
+                        resolve_predictions(db, event_resolutions)
+                    if event_results:
+                        total_results_written += upsert_fight_results(db, event_results)
+                    
                     logger.info(f"Event {event['title']}: {event_matches} fights matched out of {len(fight_results)} results found")
                             
                 except Exception as e:
                     logger.error(f"Error getting results for event {event['title']}: {e}")
                     continue
             
-            # Commit all updates
-            if total_updated > 0:
+            # Commit all updates (fight results are kept even when no prediction matched)
+            if total_updated > 0 or total_results_written > 0:
                 db.commit()
+            if total_updated > 0:
                 logger.info(f"Successfully updated {total_updated} predictions with fight results")
                 logger.info(f"Total fight results found across all events: {total_fight_results_found}")
                 logger.info(f"Unmatched fights: {len(detailed_results)}")
@@ -985,29 +998,23 @@ def job_check_completed_events():
         return {"error": str(e)}
 
 def job_cleanup_old_predictions():
-    """Job function for cleaning up old predictions"""
+    """Job function for archiving old predictions out of the hot table"""
     try:
         logger.info("Starting prediction cleanup job...")
         
-        # Calculate cutoff date (120 days ago)
-        cutoff_date = datetime.utcnow() - timedelta(days=120)
-        
+        # Move old resolved and stale pending predictions to the archive (counters keep lifetime stats)
         db = SessionLocal()
+        try:
+            archived = archive_predictions(db)
+        finally:
+            db.close()
+        count = archived["archived_resolved"] + archived["expired_pending"]
         
-        # Delete old predictions (keep results for statistics)
-        # We might want to archive rather than delete, or only delete pending predictions
-        old_pending = db.query(ModelPrediction).filter(
-            ModelPrediction.timestamp < cutoff_date,
-            ModelPrediction.actual_winner.is_(None)  # Only delete pending predictions
+        logger.info(
+            f"Cleanup completed. Archived {archived['archived_resolved']} resolved and "
+            f"{archived['expired_pending']} stale pending predictions"
         )
         
-        count = old_pending.count()
-        old_pending.delete()
-        db.commit()
-        db.close()
-        
-        logger.info(f"Cleanup completed. Removed {count} old pending predictions")
-        
         # Update the global scheduler instance's timestamp
         scheduler = get_scheduler()
         timestamp = datetime.utcnow()
@@ -1016,8 +1023,12 @@ def job_cleanup_old_predictions():
         
         return {
             "message": "Cleanup completed",
-            "deleted_predictions": count,
-            "cutoff_date": cutoff_date.isoformat(),
+            "deleted_predictions": count,  # Rows moved out of model_predictions
+            "archived_resolved": archived["archived_resolved"],
+            "expired_pending": archived["expired_pending"],
+            "archive_batches": archived["archive_batches"],
+            "cutoff_date": archived["pending_before"],
+            "archive_cutoff_date": archived["resolved_before"],
             "timestamp": timestamp.isoformat()
         }
         
@@ -1062,6 +1073,7 @@ def _regenerate_future_predictions(db):
         regenerated_count = 0
         skipped_count = 0
         error_count = 0
+        regenerated_rows = []
         
         for idx, prediction in enumerate(pending_predictions, 1):
             fight_key = f"{prediction.fighter_a} vs {prediction.fighter_b}"
@@ -1126,31 +1138,10 @@ def _regenerate_future_predictions(db):
                     error_count += 1
                     continue
                 
-                # Update existing prediction with new values
-                prediction.predicted_winner = prediction.fighter_a if result["fighter_a_win_prob"] > 50 else prediction.fighter_b
-                prediction.fighter_a_prob = result["fighter_a_win_prob"]
-                prediction.fighter_b_prob = result["fighter_b_win_prob"]
-                prediction.draw_prob = 100.0 - result["fighter_a_win_prob"] - result["fighter_b_win_prob"]
-                prediction.timestamp = datetime.utcnow()  # Update timestamp to reflect regeneration
-                
-                # Update penalty score and diffs if available
-                if "penalty_score" in result and result["penalty_score"] is not None:
-                    prediction.penalty_score = float(result["penalty_score"])
-                if "diffs" in result:
-                    diffs = result["diffs"]
-                    if "weight_diff" in diffs:
-                        prediction.weight_diff = int(diffs["weight_diff"]) if diffs["weight_diff"] is not None else None
-                    if "height_diff" in diffs:
-                        prediction.height_diff = int(diffs["height_diff"]) if diffs["height_diff"] is not None else None
-                    if "reach_diff" in diffs:
-                        prediction.reach_diff = int(diffs["reach_diff"]) if diffs["reach_diff"] is not None else None
-                    if "age_diff" in diffs:
-                        prediction.age_diff = int(diffs["age_diff"]) if diffs["age_diff"] is not None else None
-                
-                # Flush to ensure changes are in the session before commit
-                db.flush()
+                # Queue the new values; every regenerated row is upserted in one statement below
+                regenerated_rows.append(prediction_row(result))
                 regenerated_count += 1
-                logger.info(f"✅ Successfully regenerated prediction for {prediction.fighter_a} vs {prediction.fighter_b} (ID: {prediction.id}, new timestamp: {prediction.timestamp})")
+                logger.info(f"✅ Successfully regenerated prediction for {prediction.fighter_a} vs {prediction.fighter_b} (ID: {prediction.id})")
                 
             except Exception as e:
                 logger.warning(f"Failed to regenerate prediction for {prediction.fighter_a} vs {prediction.fighter_b} ({prediction.model}, ID: {prediction.id}): {e}")
@@ -1161,6 +1152,7 @@ def _regenerate_future_predictions(db):
                 continue
         
         try:
+            log_predictions_bulk(regenerated_rows, overwrite=True, db=db)
             db.commit()
             logger.info(f"✅ Successfully regenerated {regenerated_count} pending predictions for future events")
             if skipped_count > 0:
@@ -1215,20 +1207,11 @@ def job_retrain_ml_model():
         # Trigger retraining process
         logger.info(f"Retraining ML model with {new_results_count} new results...")
         
-        # Step 1: Rebuild dataset
-        from src.ml.prepare_ml_dataset import build_dataset
-        build_dataset()
-        logger.info("Dataset rebuilt with latest results")
-        
-        # Step 2: Retrain model
+        # Steps 1-2: Rebuild dataset and retrain in a CPU-capped subprocess
         try:
-            from src.ml.train_model import retrain_model
-            model_metrics = retrain_model()
+            from src.ml.retrain_worker import run_retrain
+            model_metrics = run_retrain()
             logger.info(f"Model retrained successfully: {model_metrics}")
-        except ImportError as e:
-            logger.error(f"Missing ML dependencies for retraining: {e}")
-            logger.error("Please install required packages: pip install scikit-learn pandas joblib")
-            return
         except Exception as e:
             logger.error(f"Error during model retraining: {e}")
             return
@@ -2,10 +2,19 @@ import requests
 from bs4 import BeautifulSoup
 from datetime import datetime, timedelta
 import logging
+import os
+import threading
+import time
+from src.names import normalize_fighter_name
 
 logger = logging.getLogger(__name__)
 
 BASE_URL = "http://ufcstats.com"
+EVENT_PAGE_CACHE_SECONDS_ENV = "EVENT_PAGE_CACHE_SECONDS"
+DEFAULT_EVENT_PAGE_CACHE_SECONDS = 300
+
+_event_pages = {}  # event_url -> (fetched_at, page)
+_event_pages_lock = threading.Lock()
 
 def _parse_event_date(date_text: str | None):
     if not date_text:
@@ -207,9 +216,40 @@ def check_event_completion_status(event_url: str) -> tuple[bool, bool, int]:
         return (False, False, 0)
 
 def get_fight_card(event_url: str):
-    response = requests.get(event_url, timeout=30)  # Only add timeout
+    return get_event_page(event_url)["fights"]
+
+def get_event_page(event_url: str):
+    """
+    Title and fight card of an event from one fetch of its page
+    Returns: {"title": str or None, "fights": [{"fighter_a", "url_a", "fighter_b", "url_b"}]}
+    """
+    response = requests.get(event_url, timeout=30)
     soup = BeautifulSoup(response.text, "html.parser")
+    title_tag = soup.find("h2", class_="b-content__title")
+    return {
+        "title": title_tag.get_text(strip=True) if title_tag else None,
+        "fights": _parse_fight_card(soup),
+    }
+
+def get_cached_event_page(event_url: str):
+    """
+    get_event_page() reused for EVENT_PAGE_CACHE_SECONDS, so showing a card (and
+    validating a cached copy of it) doesn't refetch the page every time
+    """
+    max_age = float(os.getenv(EVENT_PAGE_CACHE_SECONDS_ENV, DEFAULT_EVENT_PAGE_CACHE_SECONDS))
+    now = time.monotonic()
+    cached = _event_pages.get(event_url)
+    if cached and now - cached[0] < max_age:
+        return cached[1]
+    page = get_event_page(event_url)
+    with _event_pages_lock:
+        # Drop expired pages so the cache only holds recently viewed events
+        for url in [url for url, (fetched_at, _) in _event_pages.items() if now - fetched_at >= max_age]:
+            del _event_pages[url]
+        _event_pages[event_url] = (now, page)
+    return page
 
+def _parse_fight_card(soup):
     fight_rows = soup.select("tbody.b-fight-details__table-body tr")
     fights = []
 
@@ -382,25 +422,3 @@ def get_winner_from_fight_details(fight_url: str, fighter_a: str, fighter_b: str
         logger.error(f"Error getting winner from fight details: {e}")
         return None
 
-def normalize_fighter_name(name: str) -> str:
-    """
-    Normalize fighter names for matching across different sources
-    Handles common variations in fighter name formatting
-    """
-    # Remove extra whitespace and convert to lowercase
-    name = name.strip().lower()
-    
-    # Remove common suffixes/prefixes
-    name = name.replace("jr.", "").replace("sr.", "").replace("iii", "").replace("ii", "")
-    
-    # Handle common nickname patterns
-    if '"' in name:
-        # Remove nicknames in quotes: John "The Hammer" Smith -> John Smith
-        parts = name.split('"')
-        name = (parts[0] + " " + parts[-1]).strip()
-    
-    # Remove extra spaces
-    name = " ".join(name.split())
-    
-    return name
-
@@ -1,6 +1,6 @@
 # backend/src/ml/update_fighter_profiles.py
 
-from src.db import SessionLocal, Fighter
+from src.db import SessionLocal, Fighter, ensure_db
 from src.fighter_scraper import scrape_fighter_stats, save_fighter_to_db
 import time
 
@@ -21,4 +21,5 @@ def update_all_fighters():
     print("Finished updating fighter profiles.")
 
 if __name__ == "__main__":
+    ensure_db()
     update_all_fighters()
@@ -1,5 +1,5 @@
-import { useEffect, useState } from "react";
-import { simulateCustomFight, getFighters } from "../services/api";
+import { useEffect, useRef, useState } from "react";
+import { simulateCustomFight, searchFighters } from "../services/api";
 import Spinner from "../components/Spinner";
 import ModelSelector from "../components/ModelSelector";
 import FighterCard from "../components/FighterCard";
@@ -14,6 +14,7 @@ const FALLBACK_IMAGE =
 const winnerColor = "#015a3c";
 const loserColor = "#ca2320";
 const neutralColor = "#d65500";
+const SEARCH_DEBOUNCE_MS = 150;
 
 type Fighter = { name: string; image?: string };
 
@@ -39,16 +40,34 @@ export default function CustomSimPage() {
   const [fighterA, setFighterA] = useState("");
   const [fighterB, setFighterB] = useState("");
   const [suggestions, setSuggestions] = useState<Fighter[]>([]);
-  const [fighters, setFighters] = useState<Fighter[]>([]);
+  const [searchQuery, setSearchQuery] = useState("");
   const [loading, setLoading] = useState(false);
   const [result, setResult] = useState<SimulationResult | null>(null);
   const [error, setError] = useState("");
   const [activeField, setActiveField] = useState<"A" | "B" | null>(null);
   const [model, setModel] = useState("ensemble");
 
+  const searchAbort = useRef<AbortController | null>(null);
+
   useEffect(() => {
-    getFighters().then(setFighters).catch(console.error);
-  }, []);
+    // Search as the user types; only the latest query's results are kept
+    const query = searchQuery.trim();
+    searchAbort.current?.abort();
+    if (!query) {
+      setSuggestions([]);
+      return;
+    }
+    const timer = setTimeout(() => {
+      const controller = new AbortController();
+      searchAbort.current = controller;
+      searchFighters(query, 5, controller.signal)
+        .then((found) => setSuggestions(found.map((f) => ({ name: f.name, image: f.image ?? undefined }))))
+        .catch((err) => {
+          if (err.name !== "AbortError") console.error(err);
+        });
+    }, SEARCH_DEBOUNCE_MS);
+    return () => clearTimeout(timer);
+  }, [searchQuery]);
 
   useEffect(() => {
     // Only re-simulate when model changes and we already have a result
@@ -63,10 +82,7 @@ export default function CustomSimPage() {
     else setFighterB(value);
 
     setActiveField(which);
-    const filtered = fighters.filter(f =>
-      f.name.toLowerCase().includes(value.toLowerCase())
-    );
-    setSuggestions(filtered.slice(0, 5));
+    setSearchQuery(value);
   };
 
   const handleSelectSuggestion = (name: string) => {
@@ -1,7 +1,7 @@
 import { Link } from "react-router-dom";
 import { useEffect, useState } from "react";
 import MMA_Math from "../assets/mma_math.svg";
-import { getEvents, simulateEvent, getModelPerformance, getFighters } from "../services/api";
+import { getEvents, simulateEvent, getModelPerformance, getFighterCount } from "../services/api";
 import { 
   SportsKabaddiOutlined, 
   PsychologyOutlined, 
@@ -73,10 +73,10 @@ export default function HomePage() {
     // Load performance data and stats
     Promise.all([
       getModelPerformance(),
-      getFighters()
-    ]).then(([performance, fighters]) => {
+      getFighterCount()
+    ]).then(([performance, fighterCount]) => {
       console.log('Performance data:', performance);
-      console.log('Fighters data:', fighters);
+      console.log('Fighter count:', fighterCount);
       
       // Calculate stats from performance data
       let totalPredictions = 0;
@@ -94,13 +94,13 @@ export default function HomePage() {
       }
       
       setStats({
-        totalFighters: fighters.length,
+        totalFighters: fighterCount,
         totalPredictions: totalPredictions,
         accuracy: Math.round(accuracy)
       });
       
       console.log('Calculated stats:', {
-        totalFighters: fighters.length,
+        totalFighters: fighterCount,
         totalPredictions: totalPredictions,
         accuracy: Math.round(accuracy)
       });
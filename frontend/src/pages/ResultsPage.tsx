@@ -60,15 +60,21 @@ interface DetailedPerformance {
         timestamp: string | null;
         has_result: boolean;
     }>;
-    total_count: number;
+    total_count: number | null;
+    next_cursor: string | null;
+    has_more: boolean;
 }
 
+// Predictions fetched per request; older ones are loaded on demand
+const PREDICTIONS_PAGE_SIZE = 200;
+
 export default function ResultsPage() {
     const [performance, setPerformance] = useState<ModelPerformance | null>(null);
     const [detailedData, setDetailedData] = useState<DetailedPerformance | null>(null);
     const [loading, setLoading] = useState(true);
     const [error, setError] = useState<string | null>(null);
     const [refreshing, setRefreshing] = useState(false);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     const fetchData = async (showRefreshing = false) => {
         try {
@@ -77,7 +83,7 @@ export default function ResultsPage() {
             
             const [performanceData, detailedData] = await Promise.all([
                 getModelPerformance(),
-                getDetailedPerformance()
+                getDetailedPerformance({ limit: PREDICTIONS_PAGE_SIZE })
             ]);
             
             setPerformance(performanceData);
@@ -99,6 +105,27 @@ export default function ResultsPage() {
         fetchData(true);
     };
 
+    const loadMorePredictions = async () => {
+        if (!detailedData?.next_cursor) return;
+        try {
+            setLoadingMore(true);
+            const page: DetailedPerformance = await getDetailedPerformance({
+                limit: PREDICTIONS_PAGE_SIZE,
+                cursor: detailedData.next_cursor,
+            });
+            setDetailedData({
+                predictions: [...detailedData.predictions, ...page.predictions],
+                total_count: detailedData.total_count,
+                next_cursor: page.next_cursor,
+                has_more: page.has_more,
+            });
+        } catch (err) {
+            setError(err instanceof Error ? err.message : 'Failed to load more predictions');
+        } finally {
+            setLoadingMore(false);
+        }
+    };
+
     if (loading) {
         return (
             <PageLayout title="Model Performance Results">
@@ -298,7 +325,24 @@ export default function ResultsPage() {
                         Detailed Predictions
                     </h3>
                     {detailedData && (
-                        <PredictionsTable predictions={detailedData.predictions} />
+                        <>
+                            <PredictionsTable predictions={detailedData.predictions} />
+                            {detailedData.has_more && (
+                                <div className="flex flex-col items-center gap-2 mt-4">
+                                    <p className="text-sm text-gray-600 dark:text-gray-400">
+                                        Loaded {detailedData.predictions.length}
+                                        {detailedData.total_count !== null && ` of ${detailedData.total_count}`} predictions
+                                    </p>
+                                    <button
+                                        onClick={loadMorePredictions}
+                                        disabled={loadingMore}
+                                        className="px-4 py-2 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors disabled:opacity-50 disabled:cursor-not-allowed"
+                                    >
+                                        {loadingMore ? 'Loading...' : 'Load older predictions'}
+                                    </button>
+                                </div>
+                            )}
+                        </>
                     )}
                 </div>
 
@@ -28,14 +28,57 @@ export async function getFighters(): Promise<{ name: string; image?: string }[]>
   return await res.json();
 }
 
+export async function getFighterCount(): Promise<number> {
+  // One-item page; the total comes along with it
+  const res = await fetch(`${BASE_URL}/fighters?limit=1`);
+  if (!res.ok) throw new Error("Failed to load fighter count");
+  const data = await res.json();
+  return data.total;
+}
+
+export interface FighterSuggestion {
+  name: string;
+  image?: string | null;
+  nickname?: string | null;
+}
+
+export async function searchFighters(
+  query: string,
+  limit: number = 5,
+  signal?: AbortSignal
+): Promise<FighterSuggestion[]> {
+  const params = new URLSearchParams({ q: query, limit: String(limit) });
+  const res = await fetch(`${BASE_URL}/fighters/search?${params}`, { signal });
+  if (!res.ok) throw new Error("Failed to search fighters");
+  return res.json();
+}
+
 export async function getModelPerformance() {
   const res = await fetch(`${BASE_URL}/model-performance`);
   if (!res.ok) throw new Error("Failed to load model performance");
   return res.json();
 }
 
-export async function getDetailedPerformance() {
-  const res = await fetch(`${BASE_URL}/model-performance/detailed`);
+export interface DetailedPerformanceQuery {
+  limit?: number;
+  cursor?: string | null;
+  model?: "ml" | "ensemble" | "sim";
+  resolved?: boolean;
+  dateFrom?: string; // YYYY-MM-DD
+  dateTo?: string; // YYYY-MM-DD
+}
+
+// One page of predictions, newest first; pass next_cursor back to get the following page
+export async function getDetailedPerformance(query: DetailedPerformanceQuery = {}) {
+  const params = new URLSearchParams();
+  if (query.limit) params.set("limit", String(query.limit));
+  if (query.cursor) params.set("cursor", query.cursor);
+  if (query.model) params.set("model", query.model);
+  if (query.resolved !== undefined) params.set("resolved", String(query.resolved));
+  if (query.dateFrom) params.set("date_from", query.dateFrom);
+  if (query.dateTo) params.set("date_to", query.dateTo);
+
+  const res = await fetch(`${BASE_URL}/model-performance/detailed?${params}`);
   if (!res.ok) throw new Error("Failed to load detailed performance");
   return res.json();
 }